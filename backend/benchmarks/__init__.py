@@ -0,0 +1,35 @@
+"""
+Micro-benchmarks for the tutor hot paths.
+
+Benchmark modules are named bench_*.py and register functions with the
+@benchmark decorator. Run them with scripts/run_benchmarks.py.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+REGISTRY: List[Dict[str, Any]] = []
+
+
+def benchmark(name: Optional[str] = None, setup: Optional[Callable[[], Any]] = None):
+    """
+    Register a benchmark function.
+
+    Args:
+        name: Benchmark name (defaults to module.function)
+        setup: Called once before timing; its return value is passed to the
+            benchmark function on every call. Without setup the function takes
+            no arguments.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        module = func.__module__.rsplit(".", 1)[-1].removeprefix("bench_")
+        REGISTRY.append(
+            {
+                "name": name or f"{module}.{func.__name__}",
+                "func": func,
+                "setup": setup,
+            }
+        )
+        return func
+
+    return decorator
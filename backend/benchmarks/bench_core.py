@@ -0,0 +1,60 @@
+"""
+Benchmarks for state creation and fact-list handling.
+"""
+
+from types import SimpleNamespace
+
+from src.geometry_tutor.core import create_initial_state, format_facts_list, intern_shared_strings
+from src.geometry_tutor.agents import merge_ai_discoveries
+from src.geometry_tutor.context_budget import compact_facts, dedupe_facts
+
+from . import benchmark
+from .fixtures import QUESTION, make_facts, make_reasoning_chain
+
+
+def _facts():
+    facts = make_facts(500)
+    # Half the discoveries restate known facts with different formatting
+    discoveries = [fact.replace(" = ", "=") + "." for fact in facts[:50]] + make_facts(550)[500:]
+    return SimpleNamespace(facts=facts, discoveries=discoveries)
+
+
+@benchmark()
+def create_state():
+    create_initial_state("Cho tam giác ABC vuông tại A có AB=3, AC=4. a) Tính BC.")
+
+
+@benchmark(setup=_facts)
+def format_facts_500(ctx):
+    format_facts_list(ctx.facts)
+
+
+@benchmark(setup=_facts)
+def merge_ai_discoveries_500(ctx):
+    merge_ai_discoveries(
+        {"known_facts": list(ctx.facts), "ai_discovered_facts": ctx.discoveries}
+    )
+
+
+@benchmark(setup=_facts)
+def dedupe_facts_550(ctx):
+    dedupe_facts(ctx.facts + ctx.discoveries)
+
+
+@benchmark(setup=_facts)
+def compact_facts_500(ctx):
+    compact_facts(ctx.facts, QUESTION, 800)
+
+
+def _state():
+    state = create_initial_state(QUESTION)
+    state["known_facts"] = make_facts(200)
+    state["illustration_steps"] = make_facts(50)
+    state["reasoning_chain"] = make_reasoning_chain(10)
+    return state
+
+
+@benchmark(setup=_state)
+def intern_shared_strings_200(state):
+    # Runs after every session mutation
+    intern_shared_strings(state)
@@ -0,0 +1,18 @@
+"""
+Benchmarks for parsing LLM output.
+"""
+
+from src.geometry_tutor.llm_utils import safe_json_parse
+
+from . import benchmark
+from .fixtures import make_llm_output
+
+
+@benchmark(setup=lambda: make_llm_output(50))
+def safe_json_parse_small(text):
+    safe_json_parse(text)
+
+
+@benchmark(setup=lambda: make_llm_output(2000))
+def safe_json_parse_large(text):
+    safe_json_parse(text)
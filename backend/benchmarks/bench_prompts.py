@@ -0,0 +1,49 @@
+"""
+Benchmarks for prompt construction with large fact lists and reasoning chains.
+"""
+
+from types import SimpleNamespace
+
+from src.geometry_tutor.core import format_facts_list
+from src.geometry_tutor.prompts import prompt_templates, hint_builder
+
+from . import benchmark
+from .fixtures import QUESTION, make_facts, make_reasoning_chain
+
+
+def _context():
+    return SimpleNamespace(
+        facts=make_facts(300),
+        chain=make_reasoning_chain(10),
+        user_input="Ta có tam giác ABH đồng dạng tam giác CBA (g.g) nên AH^2 = BH * HC. Vậy AH = 2,4.",
+    )
+
+
+@benchmark(setup=_context)
+def solver_prompt(ctx):
+    prompt_templates.get_solver_prompt_template(QUESTION, ctx.facts, ctx.chain, format_facts_list)
+
+
+@benchmark(setup=_context)
+def validation_prompt(ctx):
+    prompt_templates.get_validation_prompt_template(ctx.chain, QUESTION, ctx.user_input)
+
+
+@benchmark(setup=_context)
+def combined_validation_prompt(ctx):
+    prompt_templates.get_combined_validation_prompt_template(
+        QUESTION, ctx.user_input, ctx.facts, ctx.chain, format_facts_list
+    )
+
+
+@benchmark(setup=_context)
+def classification_prompt(ctx):
+    prompt_templates.get_input_classification_prompt(
+        QUESTION, ctx.user_input, ctx.facts, format_facts_list
+    )
+
+
+@benchmark(setup=_context)
+def hint_prompts_all_levels(ctx):
+    for level in (1, 2, 3):
+        hint_builder.build_hint_prompt(level, QUESTION, ctx.facts, ctx.chain, format_facts_list)
@@ -0,0 +1,53 @@
+"""
+Benchmarks for API response serialization: FastAPI's default path
+(re-validation against response_model, jsonable_encoder, json.dumps) against
+FastJSONResponse rendering a model directly.
+"""
+
+import base64
+import random
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.api.models.responses import IllustrationResponse, SessionStatus
+from src.api.serialization import FastJSONResponse
+
+from . import benchmark
+from .fixtures import make_session_status
+
+
+def _illustration():
+    # A rendered diagram is a few hundred KB of PNG
+    image = random.Random(0).randbytes(300_000)
+    return IllustrationResponse(
+        success=True,
+        message="Illustration generated successfully",
+        b64_string_viz=base64.b64encode(image).decode("ascii"),
+    )
+
+
+def _fastapi_default(model_class, model):
+    # What FastAPI does with a model returned from a route with response_model
+    validated = model_class.model_validate(model.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+@benchmark(setup=make_session_status)
+def status_fastapi_default(status):
+    _fastapi_default(SessionStatus, status)
+
+
+@benchmark(setup=make_session_status)
+def status_fast_response(status):
+    FastJSONResponse(status).body
+
+
+@benchmark(setup=_illustration)
+def illustration_fastapi_default(illustration):
+    _fastapi_default(IllustrationResponse, illustration)
+
+
+@benchmark(setup=_illustration)
+def illustration_fast_response(illustration):
+    FastJSONResponse(illustration).body
@@ -0,0 +1,58 @@
+"""
+Benchmarks for session storage and status serialization.
+"""
+
+import uuid
+import random
+from types import SimpleNamespace
+
+from src.services.session_service import InMemorySessionRepository
+from src.api.models.responses import SessionStatus
+
+from . import benchmark
+from .fixtures import make_session_status
+
+SESSION_COUNT = 10_000
+
+
+def _repository():
+    repository = InMemorySessionRepository()
+    session_ids = [str(uuid.uuid4()) for _ in range(SESSION_COUNT)]
+    for session_id in session_ids:
+        # Repository operations never touch the tutor, so a placeholder suffices
+        repository.create_session(session_id, object())
+    return SimpleNamespace(
+        repository=repository, session_ids=session_ids, rng=random.Random(0)
+    )
+
+
+@benchmark(name="sessions.get_session_10k", setup=_repository)
+def get_session(ctx):
+    ctx.repository.get_session(ctx.rng.choice(ctx.session_ids))
+
+
+@benchmark(name="sessions.create_delete_10k", setup=_repository)
+def create_delete(ctx):
+    session_id = str(uuid.uuid4())
+    ctx.repository.create_session(session_id, object())
+    ctx.repository.delete_session(session_id)
+
+
+@benchmark(name="sessions.cleanup_scan_10k", setup=_repository)
+def cleanup_scan(ctx):
+    ctx.repository.cleanup_expired_sessions()
+
+
+@benchmark(name="sessions.list_active_10k", setup=_repository)
+def list_active(ctx):
+    ctx.repository.list_active_sessions()
+
+
+@benchmark(setup=make_session_status)
+def status_model_dump_json(status):
+    status.model_dump_json()
+
+
+@benchmark(setup=lambda: make_session_status().model_dump())
+def status_model_validate(data):
+    SessionStatus.model_validate(data)
@@ -0,0 +1,81 @@
+"""
+Synthetic data shared by the benchmark modules.
+"""
+
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+from src.api.models.responses import SessionStatus
+
+QUESTION = "Chứng minh tam giác ABH đồng dạng với tam giác CBA và tính độ dài AH."
+
+
+def make_facts(count: int) -> List[str]:
+    """Generate geometry facts in the style produced by the parser and solver."""
+    templates = [
+        "Tam giác A{i}B{i}C{i} vuông tại A{i}",
+        "M{i} là trung điểm của đoạn thẳng AB",
+        "Góc A{i}BC = {i} độ",
+        "AH{i} vuông góc với BC tại H{i}",
+        "Đoạn thẳng D{i}E{i} song song với BC",
+        "AB = {i}, AC = {j}",
+    ]
+    return [
+        templates[i % len(templates)].format(i=i, j=i + 1)
+        for i in range(count)
+    ]
+
+
+def make_reasoning_chain(steps: int) -> List[Dict[str, str]]:
+    """Generate a solver reasoning chain with the given number of steps."""
+    return [
+        {
+            "thought": f"Bước {i}: xét tam giác ABH và tam giác CBA có chung góc B, "
+            f"áp dụng trường hợp đồng dạng góc-góc với các sự kiện đã biết.",
+            "conclusion": f"Kết luận trung gian số {i}: AH^2 = BH * HC",
+        }
+        for i in range(steps)
+    ]
+
+
+def make_llm_output(facts: int) -> str:
+    """Generate a large fenced JSON response like the parser chain receives."""
+    payload = {
+        "problem_statement_only": "Cho tam giác ABC vuông tại A. " * 20,
+        "points": [f"P{i}" for i in range(facts)],
+        "lines": [f"P{i}P{i + 1}" for i in range(facts)],
+        "shapes": ["tam giác", "đường tròn"],
+        "given_facts": make_facts(facts),
+        "questions": [QUESTION] * 5,
+        "illustration_steps": [f"Vẽ điểm P{i}" for i in range(facts)],
+    }
+    return "Đây là kết quả phân tích:\n```json\n" + json.dumps(
+        payload, ensure_ascii=False, indent=2
+    ) + "\n```\nHy vọng hữu ích!"
+
+
+def make_session_status() -> SessionStatus:
+    """A /status response for a session deep into a long problem."""
+    now = datetime.now()
+    return SessionStatus(
+        session_id=str(uuid.uuid4()),
+        success=True,
+        current_question_index=3,
+        total_questions=5,
+        current_question=QUESTION,
+        hint_level=2,
+        hints_used=2,
+        is_validated=False,
+        session_complete=False,
+        known_facts=make_facts(200),
+        original_problem="Cho tam giác ABC vuông tại A có AB=3, AC=4. " * 5,
+        previously_solved_questions=[
+            {"question": QUESTION, "solution": "AH = 2,4 " * 40} for _ in range(3)
+        ],
+        current_question_solution=None,
+        illustration_steps=[f"Vẽ điểm P{i}" for i in range(50)],
+        created_at=now,
+        last_activity=now,
+    )
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Measure what response compression saves on realistic API payloads.
+
+Builds a /status response with a long fact list, a Markdown solution and an
+/illustration response carrying a base64 PNG diagram, compresses each with
+gzip and brotli at several levels (the same code path as the compression
+middleware), and reports compressed size, compression time and the estimated
+time to deliver the response over slow links (compression + transfer).
+"""
+
+import io
+import base64
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from datetime import datetime
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.fixtures import QUESTION, make_reasoning_chain, make_session_status
+from src.api.middleware.compression import brotli, compress_body
+from src.api.models.responses import IllustrationResponse
+from src.api.serialization import FastJSONResponse
+
+
+def _diagram_png() -> bytes:
+    """Render a triangle diagram like the Asymptote illustrations."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    points = {"A": (0, 0), "B": (0, 3), "C": (4, 0), "H": (1.44, 1.92)}
+    ax.plot([0, 0, 4, 0], [0, 3, 0, 0], color="black")
+    ax.plot([0, 1.44], [0, 1.92], color="blue", linestyle="--")
+    for name, (x, y) in points.items():
+        ax.annotate(name, (x, y), textcoords="offset points", xytext=(-12, 6), fontsize=14)
+    ax.set_aspect("equal")
+    ax.axis("off")
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def build_payloads():
+    """Serialized response bodies, as the API sends them."""
+    chain = make_reasoning_chain(10)
+    solution = "## Lời giải\n\n" + "\n\n".join(
+        f"**{step['thought']}**\n\n$$ {step['conclusion']} $$" for step in chain
+    ) + f"\n\n### Kết luận\n\n{QUESTION}"
+
+    illustration = IllustrationResponse(
+        success=True,
+        message="Illustration generated successfully",
+        b64_string_viz=base64.b64encode(_diagram_png()).decode("ascii"),
+    )
+    return {
+        "status": FastJSONResponse(make_session_status()).body,
+        "solution": FastJSONResponse({"success": True, "solution_text": solution}).body,
+        "illustration": FastJSONResponse(illustration).body,
+    }
+
+
+def measure(body, encoding, level, repeat):
+    """Compressed size and median compression time of one body."""
+    options = {"gzip_level": level} if encoding == "gzip" else {"brotli_quality": level}
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = compress_body(body, encoding, **options)
+        times.append(time.perf_counter() - start)
+    return len(compressed), statistics.median(times)
+
+
+def main():
+    """Main entry point for the compression benchmark."""
+    parser = argparse.ArgumentParser(description="Measure response compression savings")
+    parser.add_argument("--gzip-levels", nargs="+", type=int, default=[1, 6, 9])
+    parser.add_argument("--brotli-qualities", nargs="+", type=int, default=[1, 5, 9])
+    parser.add_argument("--bandwidth-mbps", nargs="+", type=float, default=[1.0, 5.0, 20.0],
+                        help="Link speeds for the delivery time estimate")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions per measurement")
+    parser.add_argument("--output", type=str, help="Write the results as JSON")
+
+    args = parser.parse_args()
+
+    candidates = [("gzip", level) for level in args.gzip_levels]
+    if brotli is not None:
+        candidates += [("br", quality) for quality in args.brotli_qualities]
+    else:
+        print("⚠️ brotli is not installed; measuring gzip only (pip install brotli)")
+
+    results = []
+    for name, body in build_payloads().items():
+        print(f"📦 {name}: {len(body):,} bytes uncompressed")
+        header = "".join(f" {f'@{mbps:g}Mbps':>12}" for mbps in args.bandwidth_mbps)
+        print(f"   {'encoding':<10} {'bytes':>10} {'ratio':>7} {'compress':>10}{header}")
+        baseline = [len(body) * 8 / (mbps * 1_000_000) for mbps in args.bandwidth_mbps]
+        row = " ".join(f"{seconds * 1000:>10.1f}ms" for seconds in baseline)
+        print(f"   {'identity':<10} {len(body):>10,} {1.0:>7.2f} {0.0:>8.2f}ms {row}")
+
+        for encoding, level in candidates:
+            size, seconds = measure(body, encoding, level, args.repeat)
+            delivery = [seconds + size * 8 / (mbps * 1_000_000) for mbps in args.bandwidth_mbps]
+            row = " ".join(f"{total * 1000:>10.1f}ms" for total in delivery)
+            label = f"{encoding}-{level}"
+            print(f"   {label:<10} {size:>10,} {size / len(body):>7.2f} {seconds * 1000:>8.2f}ms {row}")
+            results.append({
+                "payload": name,
+                "encoding": encoding,
+                "level": level,
+                "original_bytes": len(body),
+                "compressed_bytes": size,
+                "ratio": round(size / len(body), 4),
+                "compress_ms": round(seconds * 1000, 3),
+                "delivery_ms": {
+                    f"{mbps:g}": {
+                        "identity": round(plain * 1000, 2),
+                        "compressed": round(total * 1000, 2),
+                    }
+                    for mbps, plain, total in zip(args.bandwidth_mbps, baseline, delivery)
+                },
+            })
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "results": results}, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
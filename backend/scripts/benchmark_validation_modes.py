@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark the two-call and combined validation modes against each other.
+
+Solves one problem once, then runs every student input through validate_solution
+in both modes and reports latency and agreement (input type, verdict, score).
+The local classification fast path is disabled so both modes hit the LLM.
+"""
+
+import os
+import sys
+import json
+import time
+import copy
+import argparse
+import statistics
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Benchmark the LLM paths only
+os.environ["LOCAL_CLASSIFIER_ENABLED"] = "false"
+
+from src.geometry_tutor.core import create_initial_state
+from src.geometry_tutor.llm_utils import setup_environment
+from src.geometry_tutor.agents import (
+    parse_problem,
+    extract_question_facts_and_steps,
+    reason_and_solve,
+    validate_solution,
+)
+
+from stats_utils import percentile
+
+DEFAULT_PROBLEM = (
+    "Cho tam giác ABC vuông tại A có AB=3, AC=4. Gọi AH là đường cao của tam giác ABC "
+    "(H là chân đường cao). a) Tính diện tích và chu vi của tam giác này."
+)
+
+DEFAULT_INPUTS = [
+    "Diện tích tam giác vuông tính như thế nào ạ?",
+    "Tại sao cần dùng định lý Pytago ở đây?",
+    "S = 1/2 * AB * AC = 1/2 * 3 * 4 = 6. BC = căn(9+16) = 5 nên chu vi là 3+4+5 = 12.",
+    "Ta có BC = 5 theo định lý Pytago.",
+    "Diện tích bằng 12",
+    "em không biết",
+]
+
+MODES = ["two_call", "combined"]
+
+
+def load_inputs(path):
+    """Load student inputs from a JSONL file with an "input" field per line."""
+    if not path:
+        return DEFAULT_INPUTS
+    inputs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                inputs.append(json.loads(line)["input"])
+    return inputs
+
+
+def prepare_state(problem_text):
+    """Parse the problem and solve its first question."""
+    state = parse_problem(create_initial_state(problem_text))
+    if state.get("error_message"):
+        raise RuntimeError(state["error_message"])
+    state = extract_question_facts_and_steps(state)
+    return reason_and_solve(state)
+
+
+def main():
+    """Main entry point for the validation mode benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Compare two-call and combined validation modes"
+    )
+    parser.add_argument("--problem", type=str, default=DEFAULT_PROBLEM, help="Problem text")
+    parser.add_argument("--inputs", type=str, help="JSONL file of {\"input\": ...} lines")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per input and mode")
+    parser.add_argument("--output", type=str, help="Write the raw results as JSON")
+
+    args = parser.parse_args()
+
+    if not setup_environment():
+        print("❌ Environment setup failed. Please check your API key configuration.")
+        sys.exit(1)
+
+    inputs = load_inputs(args.inputs)
+    print("🔍 Solving benchmark problem...")
+    solved_state = prepare_state(args.problem)
+
+    results = []
+    for user_input in inputs:
+        for _ in range(args.repeat):
+            row = {"input": user_input}
+            for mode in MODES:
+                state = copy.deepcopy(solved_state)
+                state["user_solution_attempt"] = user_input
+
+                start = time.perf_counter()
+                state = validate_solution(state, mode=mode)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+
+                row[mode] = {
+                    "latency_ms": elapsed_ms,
+                    "input_type": state.get("user_input_type"),
+                    "is_validated": state.get("is_validated"),
+                    "score": state.get("validation_score"),
+                    "error": state.get("error_message") or None,
+                }
+            results.append(row)
+            print(
+                f"  {row['two_call']['latency_ms']:8.0f} ms | {row['combined']['latency_ms']:8.0f} ms | "
+                f"{row['two_call']['input_type']} / {row['combined']['input_type']} | {user_input[:50]}"
+            )
+
+    print("=" * 60)
+    for mode in MODES:
+        latencies = [r[mode]["latency_ms"] for r in results]
+        errors = sum(1 for r in results if r[mode]["error"])
+        print(
+            f"{mode:>9}: mean {statistics.mean(latencies):.0f} ms, "
+            f"p50 {percentile(latencies, 50):.0f} ms, p95 {percentile(latencies, 95):.0f} ms, "
+            f"errors {errors}/{len(results)}"
+        )
+
+    type_agreement = sum(
+        1 for r in results if r["two_call"]["input_type"] == r["combined"]["input_type"]
+    )
+    verdict_agreement = sum(
+        1 for r in results if r["two_call"]["is_validated"] == r["combined"]["is_validated"]
+    )
+    score_diffs = [
+        abs((r["two_call"]["score"] or 0) - (r["combined"]["score"] or 0)) for r in results
+    ]
+    print(f"input_type agreement: {type_agreement}/{len(results)}")
+    print(f"verdict agreement:    {verdict_agreement}/{len(results)}")
+    print(f"mean |score diff|:    {statistics.mean(score_diffs):.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Evaluate solver accuracy against latency and token cost across configurations.
+
+Every problem in a labeled dataset is parsed once, then each question is
+solved with reason_and_solve under every configuration (model, temperature,
+max iterations, prompt fact budget). Configurations run in parallel worker
+processes, each solving its questions on a thread pool. A question counts as
+correct when the solver's final conclusion states every quantity of the
+expected answer with the same value (e.g. "BC = 10", "AH = 24/5"), or, for
+answers without values, contains the answer as whole words. The report is a
+table with the configurations on the accuracy / latency Pareto front marked.
+
+Dataset (JSONL), one problem per line:
+    {"id": "vd1", "problem_text": "...", "expected": ["BC = 5", "AH = 2,4"]}
+"expected" holds one answer per question; an entry may itself be a list of
+accepted answers, or null to skip that question.
+"""
+
+import os
+import re
+import sys
+import copy
+import json
+import math
+import time
+import argparse
+import itertools
+import statistics
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Evaluate the solver alone: no hint ladders, no reuse across problems
+os.environ["HINT_LADDER_MODE"] = "off"
+os.environ["PROBLEM_INDEX_ENABLED"] = "false"
+
+from src.geometry_tutor.context_budget import normalize_fact
+from src.geometry_tutor.llm_utils import setup_environment
+
+DEFAULT_DATASET = [
+    {
+        "id": "right_triangle_area",
+        "problem_text": (
+            "Cho tam giác ABC vuông tại A có AB=3, AC=4. Gọi AH là đường cao của tam giác ABC "
+            "(H là chân đường cao). a) Tính diện tích và chu vi của tam giác này."
+        ),
+        "expected": ["S = 6, chu vi = 12"],
+    },
+    {
+        "id": "right_triangle_altitude",
+        "problem_text": (
+            "Cho tam giác ABC vuông tại A có AB = 6 cm, AC = 8 cm, đường cao AH. "
+            "a) Tính BC. b) Tính AH."
+        ),
+        "expected": ["BC = 10", ["AH = 4,8", "AH = 24/5"]],
+    },
+]
+
+_CLAUSE_SPLIT = re.compile(r"[;\n]|,(?!\d)|\bvà\b")
+_EQUALS = re.compile(r"≈|\bbằng\b")
+_VALUE = re.compile(r"\s*(\d+(?:[.,]\d+)?)(?:\s*/\s*(\d+(?:[.,]\d+)?))?(?![\d/]|[.,]\d)")
+_QUANTITY_TOKEN = re.compile(r"[^\W_]+")
+
+
+def _quantities(text):
+    """
+    (quantity tokens, value) pairs stated in text, e.g. "Vậy BC = √(AB² + AC²)
+    = 10 cm" gives (["vậy", "bc"], 10.0). Commas followed by a digit are
+    decimal commas; fractions such as 24/5 are evaluated.
+    """
+    pairs = []
+    for clause in _CLAUSE_SPLIT.split(_EQUALS.sub("=", text.casefold())):
+        parts = clause.split("=")
+        tokens = _QUANTITY_TOKEN.findall(parts[0])
+        for part in parts[1:]:
+            match = _VALUE.match(part)
+            if not match or not tokens:
+                continue
+            value = float(match.group(1).replace(",", "."))
+            if match.group(2):
+                denominator = float(match.group(2).replace(",", "."))
+                if not denominator:
+                    continue
+                value /= denominator
+            pairs.append((tokens, value))
+    return pairs
+
+
+def _names(tokens, quantity):
+    """Whether a conclusion's left-hand side names the quantity (e.g. "vậy bc" names "bc")."""
+    size = len(quantity)
+    return any(tokens[i : i + size] == quantity for i in range(len(tokens) - size + 1))
+
+
+def is_correct(conclusion, expected):
+    """
+    Check a final conclusion against one or more accepted answers. Every
+    quantity an answer states must appear in the conclusion with the same
+    value; answers without values (proofs) must appear as whole words.
+    """
+    answers = expected if isinstance(expected, list) else [expected]
+    normalized = normalize_fact(conclusion)
+    found = _quantities(conclusion)
+    for answer in answers:
+        wanted = _quantities(answer)
+        if wanted:
+            if all(
+                any(_names(tokens, quantity) and math.isclose(value, target, rel_tol=1e-6) for tokens, value in found)
+                for quantity, target in wanted
+            ):
+                return True
+        elif re.search(rf"(?<!\w){re.escape(normalize_fact(answer))}(?!\w)", normalized):
+            return True
+    return False
+
+
+def load_dataset(path):
+    if not path:
+        return DEFAULT_DATASET
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def prepare_tasks(dataset):
+    """Parse each problem once and build one solver input state per labeled question."""
+    from src.geometry_tutor.core import create_initial_state
+    from src.geometry_tutor.agents import extract_question_facts_and_steps, move_to_next_question, parse_problem
+
+    tasks = []
+    for problem in dataset:
+        state = parse_problem(create_initial_state(problem["problem_text"]))
+        if state.get("error_message") or not state["questions"]:
+            print(f"⚠️ Skipping {problem['id']}: {state.get('error_message') or 'no questions found'}")
+            continue
+        state = extract_question_facts_and_steps(state)
+        expected = problem["expected"]
+        for question_index in range(len(state["questions"])):
+            if question_index > 0:
+                state = move_to_next_question(copy.deepcopy(state))
+            if question_index < len(expected) and expected[question_index] is not None:
+                tasks.append({
+                    "problem_id": problem["id"],
+                    "question_index": question_index,
+                    "expected": expected[question_index],
+                    "state": copy.deepcopy(state),
+                })
+    return tasks
+
+
+def build_configs(args):
+    """Cartesian product of the configuration options."""
+    configs = []
+    for model, temperature, max_iterations, budget in itertools.product(
+        args.models, args.temperatures, args.max_iterations, args.fact_budgets
+    ):
+        configs.append({
+            "name": f"{model} t={temperature} it={max_iterations} facts={budget}",
+            "model": model,
+            "temperature": temperature,
+            "max_iterations": max_iterations,
+            "prompt_fact_token_budget": budget,
+        })
+    return configs
+
+
+def _solve_task(task, max_iterations):
+    from src.geometry_tutor.agents import reason_and_solve
+    from src.shared.tracing import SessionLedger, bind_session
+
+    # Charge this question's LLM usage to its own ledger
+    ledger = SessionLedger()
+    bind_session(f"eval-{task['problem_id']}-{task['question_index']}", ledger)
+
+    start = time.perf_counter()
+    state = reason_and_solve(copy.deepcopy(task["state"]), max_iterations=max_iterations)
+    wall = time.perf_counter() - start
+
+    chain = state.get("reasoning_chain", [])
+    conclusion = chain[-1]["conclusion"] if chain else ""
+    cost = ledger.to_dict()
+    return {
+        "problem_id": task["problem_id"],
+        "question_index": task["question_index"],
+        "correct": bool(conclusion) and is_correct(conclusion, task["expected"]),
+        "conclusion": conclusion,
+        "iterations": len(chain),
+        "prompt_tokens": cost["prompt_tokens"],
+        "completion_tokens": cost["completion_tokens"],
+        "llm_calls": cost["llm_calls"],
+        "wall_s": wall,
+        "error": state.get("error_message") or None,
+    }
+
+
+def run_config(config, tasks, threads):
+    """Solve every task under one configuration (runs in a worker process)."""
+    from src.shared.config import get_settings
+
+    os.environ["LLM_MODEL"] = config["model"]
+    os.environ["LLM_TEMPERATURE"] = str(config["temperature"])
+    os.environ["PROMPT_FACT_TOKEN_BUDGET"] = str(config["prompt_fact_token_budget"])
+    get_settings.cache_clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda task: _solve_task(task, config["max_iterations"]), tasks))
+    return config, results, time.perf_counter() - start
+
+
+def summarize(config, results, wall):
+    walls = sorted(result["wall_s"] for result in results)
+    return {
+        "config": config,
+        "questions": len(results),
+        "accuracy": sum(result["correct"] for result in results) / len(results),
+        "mean_iterations": statistics.mean(result["iterations"] for result in results),
+        "mean_tokens": statistics.mean(result["prompt_tokens"] + result["completion_tokens"] for result in results),
+        "p50_s": walls[len(walls) // 2],
+        "p95_s": walls[min(len(walls) - 1, int(0.95 * len(walls)))],
+        "errors": sum(1 for result in results if result["error"]),
+        "wall_s": wall,
+    }
+
+
+def mark_pareto(summaries):
+    """Flag configurations no other configuration beats on both accuracy and p50 latency."""
+    for summary in summaries:
+        summary["pareto"] = not any(
+            other["accuracy"] >= summary["accuracy"]
+            and other["p50_s"] <= summary["p50_s"]
+            and (other["accuracy"] > summary["accuracy"] or other["p50_s"] < summary["p50_s"])
+            for other in summaries
+        )
+
+
+def print_table(summaries):
+    print("=" * 100)
+    print(f"   {'configuration':<45} {'acc':>6} {'iter':>5} {'tokens':>8} {'p50':>8} {'p95':>8} {'err':>4}")
+    for summary in sorted(summaries, key=lambda item: item["p50_s"]):
+        marker = "★" if summary["pareto"] else " "
+        print(
+            f" {marker} {summary['config']['name']:<45} {summary['accuracy']:>6.1%} "
+            f"{summary['mean_iterations']:>5.1f} {summary['mean_tokens']:>8.0f} "
+            f"{summary['p50_s']:>7.2f}s {summary['p95_s']:>7.2f}s {summary['errors']:>4}"
+        )
+    print("★ = on the accuracy / p50 latency Pareto front")
+
+
+def main():
+    """Main entry point for the solver evaluation."""
+    from src.shared.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Evaluate solver accuracy vs. latency across configurations")
+    parser.add_argument("--dataset", type=str, help="Labeled JSONL dataset (built-in sample if omitted)")
+    parser.add_argument("--models", nargs="+", default=[settings.llm_model], help="Model names")
+    parser.add_argument("--temperatures", nargs="+", type=float, default=[settings.llm_temperature])
+    parser.add_argument("--max-iterations", nargs="+", type=int, default=[settings.solver_max_iterations])
+    parser.add_argument("--fact-budgets", nargs="+", type=int, default=[settings.prompt_fact_token_budget])
+    parser.add_argument("--workers", type=int, default=4, help="Configurations evaluated in parallel")
+    parser.add_argument("--threads", type=int, default=4, help="Questions solved in parallel per configuration")
+    parser.add_argument("--output", type=str, help="Write summaries and per-question results as JSON")
+
+    args = parser.parse_args()
+
+    if not setup_environment():
+        print("❌ Environment setup failed. Please check your API key configuration.")
+        sys.exit(1)
+
+    configs = build_configs(args)
+    print(f"🔍 Parsing dataset with {settings.llm_model}...")
+    tasks = prepare_tasks(load_dataset(args.dataset))
+    if not tasks:
+        print("❌ No labeled questions to evaluate")
+        sys.exit(1)
+    print(f"🧪 {len(tasks)} questions x {len(configs)} configurations")
+
+    summaries, details = [], {}
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(configs))) as executor:
+        futures = [executor.submit(run_config, config, tasks, args.threads) for config in configs]
+        for future in futures:
+            config, results, wall = future.result()
+            summary = summarize(config, results, wall)
+            summaries.append(summary)
+            details[config["name"]] = results
+            print(f"  ✅ {config['name']}: {summary['accuracy']:.1%} in {wall:.1f}s")
+
+    mark_pareto(summaries)
+    print_table(summaries)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"timestamp": datetime.now().isoformat(), "summaries": summaries, "results": details},
+                f, ensure_ascii=False, indent=2,
+            )
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the tutoring API.
+
+Runs concurrent virtual users that replay tutoring flows (create session, hints,
+validate, solution, illustration...) described by a small JSON scenario DSL and
+reports per-endpoint latency percentiles, throughput, error rates and server
+memory. Intended to run against a local server with LLM_MODEL=stub; pass
+--spawn-server to start one.
+
+Scenario format:
+    {
+      "problems": ["Cho tam giác ABC ..."],
+      "flows": [
+        {"name": "guided", "weight": 3, "steps": [
+          {"action": "create_session"},
+          {"action": "hint", "repeat": 2, "think_ms": 500},
+          {"action": "validate", "inputs": ["Ta có BC = 5", "Tại sao?"]},
+          {"action": "status"},
+          {"action": "delete_session"}
+        ]}
+      ]
+    }
+
+Actions: create_session, status, hint, validate, solution, illustration,
+delete_session, list_sessions, health. Steps accept "repeat" and "think_ms".
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from stats_utils import percentile
+
+project_root = Path(__file__).parent.parent
+
+DEFAULT_SCENARIO = {
+    "problems": [
+        "Cho tam giác ABC vuông tại A có AB=3, AC=4. Gọi AH là đường cao của tam giác ABC "
+        "(H là chân đường cao). a) Tính diện tích và chu vi của tam giác này. "
+        "b) Chứng minh góc C < góc B. c) Tính độ dài đường trung tuyến AM của tam giác ABC.",
+        "Cho hình vuông ABCD cạnh 4. Gọi M là trung điểm của AB. "
+        "a) Tính độ dài DM. b) Tính diện tích tam giác DMC.",
+    ],
+    "flows": [
+        {
+            "name": "guided_student",
+            "weight": 3,
+            "steps": [
+                {"action": "create_session"},
+                {"action": "status"},
+                {"action": "hint", "repeat": 2, "think_ms": 200},
+                {
+                    "action": "validate",
+                    "inputs": [
+                        "Diện tích tam giác vuông tính như thế nào ạ?",
+                        "Ta có BC = 5 theo định lý Pytago.",
+                    ],
+                    "think_ms": 200,
+                },
+                {"action": "solution"},
+                {"action": "delete_session"},
+            ],
+        },
+        {
+            "name": "solver",
+            "weight": 2,
+            "steps": [
+                {"action": "create_session"},
+                {
+                    "action": "validate",
+                    "inputs": [
+                        "S = 1/2 * AB * AC = 6. BC = 5 nên chu vi là 12. Vậy S = 6, chu vi 12."
+                    ],
+                },
+                {"action": "status"},
+                {"action": "delete_session"},
+            ],
+        },
+        {
+            "name": "visual",
+            "weight": 1,
+            "steps": [
+                {"action": "create_session"},
+                {"action": "illustration"},
+                {"action": "hint"},
+                {"action": "delete_session"},
+            ],
+        },
+    ],
+}
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MB (Linux /proc), None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class Recorder:
+    """Collects per-endpoint latencies and errors."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.flows_completed = 0
+        self.flows_failed = 0
+
+    def record(self, endpoint: str, latency_ms: float, error: Optional[str]) -> None:
+        self.latencies.setdefault(endpoint, []).append(latency_ms)
+        if error:
+            by_kind = self.errors.setdefault(endpoint, {})
+            by_kind[error] = by_kind.get(error, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            errors = sum(self.errors.get(endpoint, {}).values())
+            endpoints[endpoint] = {
+                "count": len(latencies),
+                "errors": errors,
+                "error_rate": errors / len(latencies),
+                "error_kinds": self.errors.get(endpoint, {}),
+                "mean_ms": statistics.mean(latencies),
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+                "max_ms": max(latencies),
+            }
+        return endpoints
+
+
+class VirtualUser:
+    """Replays scenario flows against the API, one session at a time."""
+
+    def __init__(self, client: httpx.AsyncClient, scenario: Dict[str, Any], recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.scenario = scenario
+        self.recorder = recorder
+        self.rng = rng
+        self.session_id: Optional[str] = None
+
+    async def _call(self, endpoint: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.recorder.record(endpoint, (time.perf_counter() - start) * 1000, error)
+        return None if error else response
+
+    async def _step(self, step: Dict[str, Any]) -> bool:
+        """Execute one scenario action. Returns False when the flow cannot continue."""
+        action = step["action"]
+        params = {"session_id": self.session_id}
+
+        if action == "create_session":
+            problem = self.rng.choice(self.scenario["problems"])
+            response = await self._call(
+                "POST /sessions", "POST", "/sessions", json={"problem_text": problem}
+            )
+            self.session_id = response.json()["session_id"] if response else None
+            return self.session_id is not None
+        if action == "health":
+            await self._call("GET /health", "GET", "/health")
+            return True
+        if action == "list_sessions":
+            await self._call("GET /sessions", "GET", "/sessions")
+            return True
+        if self.session_id is None:
+            return False
+
+        if action == "status":
+            await self._call("GET /status", "GET", "/status", params=params)
+        elif action == "hint":
+            await self._call("GET /hint", "GET", "/hint", params=params)
+        elif action == "validate":
+            user_input = self.rng.choice(step.get("inputs") or ["Ta có BC = 5"])
+            await self._call(
+                "POST /validate",
+                "POST",
+                "/validate",
+                json={"session_id": self.session_id, "user_input": user_input},
+            )
+        elif action == "solution":
+            await self._call("GET /solution", "GET", "/solution", params=params)
+        elif action == "illustration":
+            await self._call("GET /illustration", "GET", "/illustration", params=params)
+        elif action == "delete_session":
+            await self._call(
+                "DELETE /sessions/{id}", "DELETE", f"/sessions/{self.session_id}"
+            )
+            self.session_id = None
+        else:
+            raise ValueError(f"Unknown scenario action: {action}")
+        return True
+
+    async def run_flow(self, flow: Dict[str, Any]) -> None:
+        self.session_id = None
+        for step in flow["steps"]:
+            for _ in range(step.get("repeat", 1)):
+                if not await self._step(step):
+                    self.recorder.flows_failed += 1
+                    return
+                if step.get("think_ms"):
+                    await asyncio.sleep(step["think_ms"] / 1000)
+        self.recorder.flows_completed += 1
+
+
+def pick_flow(flows: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
+    return rng.choices(flows, weights=[flow.get("weight", 1) for flow in flows])[0]
+
+
+async def run_load(args, scenario: Dict[str, Any], server_pid: Optional[int]) -> Dict[str, Any]:
+    """Run the virtual users until the duration or flow budget is exhausted."""
+    recorder = Recorder()
+    rss_samples: List[float] = []
+    deadline = time.perf_counter() + args.duration
+    flows_started = 0
+
+    def next_flow_allowed() -> bool:
+        nonlocal flows_started
+        if time.perf_counter() >= deadline:
+            return False
+        if args.flows and flows_started >= args.flows:
+            return False
+        flows_started += 1
+        return True
+
+    async def user_loop(user_id: int, client: httpx.AsyncClient) -> None:
+        rng = random.Random(args.seed * 1000 + user_id)
+        user = VirtualUser(client, scenario, recorder, rng)
+        # Stagger start-up so users do not all create sessions at once
+        await asyncio.sleep(rng.uniform(0, args.ramp_up))
+        while next_flow_allowed():
+            await user.run_flow(pick_flow(scenario["flows"], rng))
+
+    async def sample_rss() -> None:
+        while True:
+            rss = read_rss_mb(server_pid)
+            if rss is not None:
+                rss_samples.append(rss)
+            await asyncio.sleep(0.5)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+        sampler = asyncio.create_task(sample_rss()) if server_pid else None
+        await asyncio.gather(*(user_loop(i, client) for i in range(args.concurrency)))
+        if sampler:
+            sampler.cancel()
+    elapsed = time.perf_counter() - start
+
+    endpoints = recorder.summary()
+    total_requests = sum(e["count"] for e in endpoints.values())
+    total_errors = sum(e["errors"] for e in endpoints.values())
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "config": {
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "flows": args.flows,
+            "seed": args.seed,
+            "scenario": args.scenario or "default",
+        },
+        "elapsed_s": elapsed,
+        "total_requests": total_requests,
+        "throughput_rps": total_requests / elapsed if elapsed else 0.0,
+        "error_rate": total_errors / total_requests if total_requests else 0.0,
+        "flows_completed": recorder.flows_completed,
+        "flows_failed": recorder.flows_failed,
+        "server_rss_mb": {
+            "start": rss_samples[0] if rss_samples else None,
+            "peak": max(rss_samples) if rss_samples else None,
+            "end": rss_samples[-1] if rss_samples else None,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print("=" * 92)
+    print(f"{'endpoint':<24}{'count':>8}{'err%':>8}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}{'max ms':>12}")
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"{endpoint:<24}{stats['count']:>8}{stats['error_rate'] * 100:>7.1f}%"
+            f"{stats['p50_ms']:>12.1f}{stats['p95_ms']:>12.1f}{stats['p99_ms']:>12.1f}{stats['max_ms']:>12.1f}"
+        )
+    print("=" * 92)
+    print(
+        f"requests: {result['total_requests']} in {result['elapsed_s']:.1f}s "
+        f"({result['throughput_rps']:.1f} req/s), error rate {result['error_rate'] * 100:.2f}%"
+    )
+    print(f"flows: {result['flows_completed']} completed, {result['flows_failed']} failed")
+    rss = result["server_rss_mb"]
+    if rss["peak"] is not None:
+        print(f"server RSS: start {rss['start']:.1f} MB, peak {rss['peak']:.1f} MB, end {rss['end']:.1f} MB")
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List regressions beyond threshold (relative) against a previous result."""
+    regressions = []
+    print(f"📊 Comparison with baseline from {baseline.get('timestamp', '?')}:")
+    for endpoint, stats in result["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(endpoint)
+        if not base:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[key] > 0:
+                change = (stats[key] - base[key]) / base[key]
+                if change > threshold:
+                    regressions.append(f"{endpoint} {key}: {base[key]:.1f} -> {stats[key]:.1f} ({change:+.0%})")
+        if stats["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(
+                f"{endpoint} error rate: {base['error_rate']:.1%} -> {stats['error_rate']:.1%}"
+            )
+
+    base_rps = baseline.get("throughput_rps") or 0
+    if base_rps:
+        change = (result["throughput_rps"] - base_rps) / base_rps
+        print(f"  throughput: {base_rps:.1f} -> {result['throughput_rps']:.1f} req/s ({change:+.0%})")
+        if change < -threshold:
+            regressions.append(f"throughput: {base_rps:.1f} -> {result['throughput_rps']:.1f} req/s")
+
+    base_peak = (baseline.get("server_rss_mb") or {}).get("peak")
+    peak = result["server_rss_mb"]["peak"]
+    if base_peak and peak:
+        change = (peak - base_peak) / base_peak
+        print(f"  peak RSS: {base_peak:.1f} -> {peak:.1f} MB ({change:+.0%})")
+        if change > threshold:
+            regressions.append(f"peak RSS: {base_peak:.1f} -> {peak:.1f} MB")
+
+    for regression in regressions:
+        print(f"  ❌ {regression}")
+    if not regressions:
+        print("  ✅ No regressions beyond threshold")
+    return regressions
+
+
+def spawn_server(port: int) -> subprocess.Popen:
+    """Start a local API server with the stub LLM unless LLM_MODEL is already set."""
+    env = dict(os.environ)
+    env.setdefault("LLM_MODEL", "stub")
+    process = subprocess.Popen(
+        [sys.executable, str(project_root / "scripts" / "run_api_server.py"), "--port", str(port)],
+        env=env,
+        cwd=str(project_root),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during start-up")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError("API server did not become healthy within 30s")
+
+
+def main():
+    """Main entry point for the load test."""
+    parser = argparse.ArgumentParser(description="Load test the tutoring API")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--scenario", type=str, help="Scenario JSON file (default: built-in flows)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Test duration in seconds")
+    parser.add_argument("--flows", type=int, default=0, help="Stop after this many flows (0 = no limit)")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds over which users start")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for flow and input selection")
+    parser.add_argument("--server-pid", type=int, help="PID of the server process to sample RSS from")
+    parser.add_argument("--spawn-server", action="store_true", help="Start a local stub-LLM server on the --url port")
+    parser.add_argument("--output", type=str, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=str, help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative regression threshold")
+
+    args = parser.parse_args()
+
+    scenario = DEFAULT_SCENARIO
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as f:
+            scenario = json.load(f)
+
+    server = None
+    server_pid = args.server_pid
+    if args.spawn_server:
+        port = httpx.URL(args.url).port or 8000
+        print(f"🚀 Starting stub-LLM API server on port {port}...")
+        server = spawn_server(port)
+        server_pid = server.pid
+
+    try:
+        print(f"🔍 Running load test: {args.concurrency} users, {args.duration:.0f}s against {args.url}")
+        result = asyncio.run(run_load(args, scenario, server_pid))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print_report(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_with_baseline(result, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
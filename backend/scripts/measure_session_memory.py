@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measure how much memory an idle tutoring session holds.
+
+Creates sessions through SessionService with the offline stub LLM (so the
+numbers do not depend on the network), asks one hint in each, and reports the
+resident set size and the Python heap (tracemalloc) added per session, plus
+the allocation sites holding the most memory. Sessions cycle over a few
+problems the way real traffic repeats the same homework, so string sharing
+across sessions on the same problem shows up in the numbers.
+"""
+
+import os
+import gc
+import sys
+import json
+import argparse
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Deterministic and offline: stub model, hint ladders built inline, nothing captured
+os.environ["LLM_MODEL"] = "stub"
+os.environ["HINT_LADDER_MODE"] = "eager"
+os.environ["SESSION_CAPTURE_PATH"] = ""
+
+PROBLEMS = [
+    "Cho tam giác ABC vuông tại A có AB=3, AC=4. Gọi AH là đường cao của tam giác ABC "
+    "(H là chân đường cao). a) Tính diện tích và chu vi của tam giác này. "
+    "b) Chứng minh góc C < góc B. c) Tính độ dài đường trung tuyến AM của tam giác ABC.",
+    "Cho hình vuông ABCD cạnh 4. Gọi M là trung điểm của AB. "
+    "a) Tính độ dài DM. b) Tính diện tích tam giác DMC.",
+    "Cho đường tròn (O; R) và điểm A nằm ngoài đường tròn. Kẻ các tiếp tuyến AB, AC với "
+    "đường tròn (B, C là các tiếp điểm). a) Chứng minh tứ giác ABOC nội tiếp. "
+    "b) Chứng minh OA vuông góc với BC.",
+]
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (Linux), else the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main():
+    """Main entry point for the session memory measurement."""
+    parser = argparse.ArgumentParser(description="Measure memory held per idle tutoring session")
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions to create")
+    parser.add_argument("--problems", type=int, default=len(PROBLEMS),
+                        help=f"Distinct problems the sessions cycle over (1-{len(PROBLEMS)})")
+    parser.add_argument("--no-problem-index", action="store_true",
+                        help="Parse and solve every session instead of reusing earlier sessions' work")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to list")
+    parser.add_argument("--output", type=str, help="Write the results as JSON")
+
+    args = parser.parse_args()
+    if args.no_problem_index:
+        os.environ["PROBLEM_INDEX_ENABLED"] = "false"
+
+    from src.services.session_service import InMemorySessionRepository, SessionService
+
+    problems = PROBLEMS[:max(1, min(args.problems, len(PROBLEMS)))]
+    service = SessionService(InMemorySessionRepository())
+
+    # Warm-up session: module imports, compiled graph, LLM client and caches
+    warm_up = service.create_session(problems[0])
+    if not warm_up["success"]:
+        print(f"❌ Could not create a session: {warm_up['error']}")
+        sys.exit(1)
+    service.delete_session(warm_up["session_id"])
+
+    gc.collect()
+    tracemalloc.start(10)
+    heap_before = tracemalloc.get_traced_memory()[0]
+    rss_before = rss_bytes()
+
+    print(f"🧪 Creating {args.sessions} sessions over {len(problems)} problems...")
+    for i in range(args.sessions):
+        result = service.create_session(problems[i % len(problems)])
+        if not result["success"]:
+            print(f"❌ Session {i} failed: {result['error']}")
+            sys.exit(1)
+        service.get_session(result["session_id"]).request_hint()
+
+    gc.collect()
+    heap_per_session = (tracemalloc.get_traced_memory()[0] - heap_before) / args.sessions
+    rss_per_session = (rss_bytes() - rss_before) / args.sessions
+    top_sites = tracemalloc.take_snapshot().statistics("lineno")[:args.top]
+    tracemalloc.stop()
+
+    print(f"📦 Python heap per session: {heap_per_session / 1024:,.1f} KB")
+    print(f"📦 RSS per session:         {rss_per_session / 1024:,.1f} KB")
+    if rss_per_session > 0:
+        print(f"📈 Idle sessions per GB:    {int(2**30 / rss_per_session):,}")
+    print(f"🔍 Top {len(top_sites)} allocation sites:")
+    for stat in top_sites:
+        frame = stat.traceback[0]
+        print(f"   {stat.size / 1024:>10,.1f} KB {stat.count:>8,} blocks  {frame.filename}:{frame.lineno}")
+
+    if args.output:
+        results = {
+            "timestamp": datetime.now().isoformat(),
+            "sessions": args.sessions,
+            "problems": len(problems),
+            "problem_index": not args.no_problem_index,
+            "heap_bytes_per_session": round(heap_per_session),
+            "rss_bytes_per_session": round(rss_per_session),
+            "top_allocations": [
+                {
+                    "file": stat.traceback[0].filename,
+                    "line": stat.traceback[0].lineno,
+                    "bytes": stat.size,
+                    "blocks": stat.count,
+                }
+                for stat in top_sites
+            ],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
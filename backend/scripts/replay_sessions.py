@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Replay captured tutoring sessions against the current code.
+
+Sessions recorded with SESSION_CAPTURE_PATH are re-executed through
+ApiGeometryTutor with every LLM call answered from the recording, so the
+measured time is the tutor's own overhead (parsing, prompt building, state
+handling). Each action's result and resulting state are compared with the
+recording to catch behaviour changes. Sessions are spread over worker
+processes.
+
+Sessions that reused a near-duplicate problem from the problem index are
+skipped: their recording lacks the LLM calls a fresh solve needs. The problem
+index is disabled during replay and background hint ladders are built inline
+(HINT_LADDER_MODE=eager) so every session replays deterministically. Hints the
+captured session generated live because its ladder was not ready yet are
+replayed live as well.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Replay never needs a real model, and must not capture itself
+os.environ["LLM_MODEL"] = "stub"
+os.environ["SESSION_CAPTURE_PATH"] = ""
+os.environ["PROBLEM_INDEX_ENABLED"] = "false"
+
+from src.geometry_tutor.session_capture import load_captured_sessions
+from stats_utils import percentile
+
+ACTIONS = {
+    "start": "start_problem",
+    "hint": "request_hint",
+    "validate": "validate_user_solution",
+    "solution": "get_complete_solution",
+    "next": "move_to_next_question",
+}
+
+
+def _normalize(value):
+    """Round-trip through JSON so replayed results compare like recorded ones."""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def _apply_settings(settings):
+    """Reapply the settings a session was captured with."""
+    from src.shared.config import get_settings
+
+    for name, value in settings.items():
+        if name == "hint_ladder_mode" and value == "background":
+            value = "eager"
+        os.environ[name.upper()] = str(value)
+    get_settings.cache_clear()
+
+
+def replay_session(session):
+    """Replay one captured session in this process. Returns timings and mismatches."""
+    from src.api.api_tutor import ApiGeometryTutor
+    from src.geometry_tutor.llm_utils import override_llm
+    from src.geometry_tutor.session_capture import ReplayChatModel, state_summary
+
+    start_action = session["actions"][0]
+    outcome = {
+        "session_id": session["session_id"],
+        "status": "ok",
+        "timings": [],
+        "mismatches": [],
+        "prompt_mismatches": 0,
+        "unused_responses": 0,
+    }
+    if start_action.get("problem_index_hit"):
+        outcome["status"] = "skipped"
+        return outcome
+
+    _apply_settings(start_action.get("settings", {}))
+    model = ReplayChatModel.from_records(session["llm"])
+
+    try:
+        with override_llm(model):
+            created = time.perf_counter()
+            tutor = ApiGeometryTutor()
+            outcome["timings"].append(("init", time.perf_counter() - created))
+
+            for step, recorded in enumerate(session["actions"]):
+                method = getattr(tutor, ACTIONS[recorded["action"]])
+                # The background ladder was still running: take the live hint path
+                ladder = None
+                if recorded.get("hint_from_ladder") is False and tutor.current_state:
+                    ladder = tutor.current_state["precomputed_hints"]
+                    tutor.current_state["precomputed_hints"] = []
+                started = time.perf_counter()
+                try:
+                    result = method(*recorded["args"])
+                finally:
+                    if ladder is not None:
+                        tutor.current_state["precomputed_hints"] = ladder
+                outcome["timings"].append((recorded["action"], time.perf_counter() - started))
+
+                replayed = {"result": _normalize(result), "state": _normalize(state_summary(tutor.current_state))}
+                for key, value in replayed.items():
+                    if value != recorded[key]:
+                        outcome["status"] = "mismatch"
+                        outcome["mismatches"].append({
+                            "step": step,
+                            "action": recorded["action"],
+                            "field": key,
+                            "recorded": recorded[key],
+                            "replayed": value,
+                        })
+                if outcome["mismatches"]:
+                    # Later steps start from a diverged state
+                    break
+    except Exception as e:
+        outcome["status"] = "error"
+        outcome["error"] = f"{type(e).__name__}: {e}"
+
+    outcome["prompt_mismatches"] = model.prompt_mismatches()
+    outcome["unused_responses"] = model.unused_responses()
+    return outcome
+
+
+def summarize(outcomes, wall):
+    """Aggregate per-action overhead and replay statuses."""
+    timings = {}
+    for outcome in outcomes:
+        for action, seconds in outcome["timings"]:
+            timings.setdefault(action, []).append(seconds)
+
+    statuses = {}
+    for outcome in outcomes:
+        statuses[outcome["status"]] = statuses.get(outcome["status"], 0) + 1
+
+    return {
+        "sessions": len(outcomes),
+        "statuses": statuses,
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(len(outcomes) / wall, 1) if wall else 0.0,
+        "prompt_mismatches": sum(outcome["prompt_mismatches"] for outcome in outcomes),
+        "unused_responses": sum(outcome["unused_responses"] for outcome in outcomes),
+        "actions": {
+            action: {
+                "count": len(values),
+                "mean_ms": round(statistics.mean(values) * 1000, 3),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+            }
+            for action, values in sorted(timings.items())
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=str(project_root), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(summary, outcomes, show):
+    print(f"⏱️ Replayed {summary['sessions']} sessions in {summary['wall_s']}s ({summary['sessions_per_s']} sessions/s)")
+    print("📋 Status: " + ", ".join(f"{status}={count}" for status, count in sorted(summary["statuses"].items())))
+    if summary["prompt_mismatches"]:
+        print(f"⚠️ {summary['prompt_mismatches']} LLM calls had a different prompt than recorded")
+    print("📊 Local overhead per action:")
+    for action, stats in summary["actions"].items():
+        print(f"  {action:<10} n={stats['count']:<6} p50={stats['p50_ms']:>9.3f} ms  p95={stats['p95_ms']:>9.3f} ms")
+
+    shown = 0
+    for outcome in outcomes:
+        if outcome["status"] not in ("mismatch", "error") or shown >= show:
+            continue
+        shown += 1
+        if outcome["status"] == "error":
+            print(f"❌ {outcome['session_id']}: {outcome['error']}")
+        else:
+            first = outcome["mismatches"][0]
+            print(f"❌ {outcome['session_id']}: step {first['step']} ({first['action']}) {first['field']} differs")
+            print(f"     recorded: {json.dumps(first['recorded'], ensure_ascii=False)[:300]}")
+            print(f"     replayed: {json.dumps(first['replayed'], ensure_ascii=False)[:300]}")
+
+
+def compare(summary, baseline, threshold):
+    """Print the overhead change against the baseline. Returns the regressed actions."""
+    regressions = []
+    print(f"📊 Comparison with baseline ({baseline.get('commit') or '?'}, {baseline.get('timestamp', '?')}):")
+    for action, stats in summary["actions"].items():
+        base = baseline.get("summary", {}).get("actions", {}).get(action)
+        if not base or not base["p95_ms"]:
+            print(f"  {action:<10} new")
+            continue
+        ratio = stats["p95_ms"] / base["p95_ms"]
+        marker = "❌" if ratio > 1 + threshold else ("✅" if ratio < 1 - threshold else "  ")
+        print(f"  {marker} {action:<8} p95 {base['p95_ms']:.3f} ms -> {stats['p95_ms']:.3f} ms ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(action)
+    return regressions
+
+
+def main():
+    """Main entry point for the session replay tool."""
+    parser = argparse.ArgumentParser(description="Replay captured tutoring sessions")
+    parser.add_argument("capture", type=str, help="JSONL file written with SESSION_CAPTURE_PATH")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Replay processes")
+    parser.add_argument("--limit", type=int, help="Replay at most this many sessions")
+    parser.add_argument("--show", type=int, default=5, help="Mismatching sessions to print")
+    parser.add_argument("--output", type=str, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=str, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative p95 slowdown counted as a regression")
+
+    args = parser.parse_args()
+
+    sessions = load_captured_sessions(args.capture)[: args.limit]
+    if not sessions:
+        print(f"❌ No complete sessions in {args.capture}")
+        sys.exit(1)
+    print(f"🔁 Replaying {len(sessions)} sessions with {args.workers} workers")
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            outcomes = list(executor.map(replay_session, sessions, chunksize=8))
+    else:
+        outcomes = [replay_session(session) for session in sessions]
+    summary = summarize(outcomes, time.perf_counter() - start)
+    print_report(summary, outcomes, args.show)
+
+    if args.output:
+        output = {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "capture": args.capture,
+            "summary": summary,
+            "failures": [outcome for outcome in outcomes if outcome["status"] in ("mismatch", "error")],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        print(f"📄 Results written to {args.output}")
+
+    failed = summary["statuses"].get("mismatch", 0) + summary["statuses"].get("error", 0)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(summary, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+
+    if failed:
+        print(f"❌ {failed} session(s) diverged from the recording")
+    if failed or regressions:
+        sys.exit(1)
+    print("✅ All replayed sessions match the recording")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,11 @@ Startup script for the AI Geometry Tutor API server.
 
 import os
 import sys
+import time
+import signal
 import argparse
+import threading
+import subprocess
 from pathlib import Path
 
 # Add the project root to Python path
@@ -16,6 +20,60 @@ from src.api.main import run_server
 from src.geometry_tutor.llm_utils import setup_environment
 
 
+def start_worker(index: int, count: int, port: int) -> subprocess.Popen:
+    """Start one API worker on a local port, telling it its place on the affinity ring."""
+    env = dict(os.environ, AFFINITY_WORKER_COUNT=str(count), AFFINITY_WORKER_INDEX=str(index))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "info"],
+        cwd=str(project_root),
+        env=env,
+    )
+
+
+def supervise_workers(workers: list, ports: list, stop: threading.Event) -> None:
+    """Restart workers that exit; the router serves their sessions elsewhere meanwhile."""
+    while not stop.wait(1.0):
+        for index, process in enumerate(workers):
+            if process.poll() is not None:
+                print(f"⚠️ Worker {index} exited with code {process.returncode}, restarting")
+                workers[index] = start_worker(index, len(workers), ports[index])
+
+
+def exit_on_signal(signum: int, frame) -> None:
+    """Turn SIGTERM into SystemExit so the workers are stopped on the way out."""
+    raise SystemExit(128 + signum)
+
+
+def run_with_affinity(host: str, port: int, workers: int, base_port: int) -> None:
+    """Run the workers on their own ports behind the session-affinity router."""
+    from src.api.affinity_router import run_router
+
+    # uvicorn shuts the router down on SIGTERM and then re-raises the signal to
+    # the handler installed before it; the default one would kill this process
+    # without running the cleanup below and leave the workers running
+    signal.signal(signal.SIGTERM, exit_on_signal)
+
+    ports = [base_port + index for index in range(workers)]
+    processes = [start_worker(index, workers, worker_port) for index, worker_port in enumerate(ports)]
+    stop = threading.Event()
+    supervisor = threading.Thread(target=supervise_workers, args=(processes, ports, stop), daemon=True)
+    supervisor.start()
+    try:
+        run_router([f"http://127.0.0.1:{worker_port}" for worker_port in ports], host=host, port=port)
+    finally:
+        stop.set()
+        supervisor.join()
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + 10
+        for process in processes:
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
 def main():
     """Main entry point for the API server."""
     parser = argparse.ArgumentParser(
@@ -42,11 +100,25 @@ def main():
         "--workers", 
         type=int, 
         default=1, 
-        help="Number of worker processes (default: 1)"
+        help="Number of worker processes, 0 for one per CPU core (default: 1)"
+    )
+    parser.add_argument(
+        "--session-store",
+        type=str,
+        help="SQLite file shared by the workers for sessions (sets SESSION_STORE_PATH)"
+    )
+    parser.add_argument(
+        "--worker-base-port",
+        type=int,
+        help="First local port of the workers behind the router (default: port + 1)"
     )
 
     args = parser.parse_args()
 
+    # Workers are separate processes: they read the settings from the environment
+    if args.session_store:
+        os.environ["SESSION_STORE_PATH"] = args.session_store
+
     # Check environment setup
     print("🔧 Checking environment setup...")
     if not setup_environment():
@@ -57,6 +129,17 @@ def main():
         sys.exit(1)
 
     print("✅ Environment setup complete!")
+
+    # .env has been loaded into the environment by setup_environment()
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1 and not args.debug:
+        if not os.environ.get("SESSION_STORE_PATH"):
+            print("❌ Several workers need a shared session store.")
+            print("Pass --session-store sessions.db or set SESSION_STORE_PATH")
+            sys.exit(1)
+        if not os.environ.get("PROBLEM_INDEX_PATH"):
+            print("⚠️ PROBLEM_INDEX_PATH is unset: each worker keeps its own problem index")
+
     print(f"🚀 Starting AI Geometry Tutor API Server...")
     print(f"📡 Server will be available at: http://{args.host}:{args.port}")
     print(f"📚 API Documentation: http://{args.host}:{args.port}/docs")
@@ -64,15 +147,24 @@ def main():
     
     if args.debug:
         print("🔧 Running in DEBUG mode with auto-reload")
+    elif workers > 1:
+        print(f"⚙️ {workers} worker processes sharing sessions in {os.environ['SESSION_STORE_PATH']}")
+        print(f"🧭 Session-affinity router stats: http://{args.host}:{args.port}/router/stats")
     
     print("=" * 60)
 
     try:
-        run_server(
-            host=args.host,
-            port=args.port,
-            debug=args.debug
-        )
+        # Jobs, idempotency keys and warm tutors live in one worker's memory,
+        # so several workers always run behind the session-affinity router
+        if workers > 1 and not args.debug:
+            run_with_affinity(args.host, args.port, workers, args.worker_base_port or args.port + 1)
+        else:
+            run_server(
+                host=args.host,
+                port=args.port,
+                debug=args.debug,
+                workers=workers,
+            )
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
     except Exception as e:
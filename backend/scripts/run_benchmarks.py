@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Run the micro-benchmark suite in benchmarks/ and compare with a baseline.
+
+Each benchmark is timed with timeit: the loop count is calibrated so one
+measurement takes at least --min-time seconds, then --repeat measurements are
+taken and the fastest per-call time is reported (the least noisy estimate).
+With --baseline, benchmarks slower than the baseline by more than --threshold
+are reported as regressions and the script exits non-zero.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import timeit
+import platform
+import argparse
+import importlib
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Keep benchmarks offline and independent of local configuration
+os.environ.setdefault("LLM_MODEL", "stub")
+
+from benchmarks import REGISTRY
+
+
+def load_benchmarks(pattern):
+    """Import all benchmark modules and return the registered benchmarks matching pattern."""
+    for path in sorted((project_root / "benchmarks").glob("bench_*.py")):
+        importlib.import_module(f"benchmarks.{path.stem}")
+    regex = re.compile(pattern) if pattern else None
+    return [bench for bench in REGISTRY if not regex or regex.search(bench["name"])]
+
+
+def time_benchmark(bench, repeat, min_time):
+    """Time one benchmark. Returns per-call times in seconds for each repeat."""
+    if bench["setup"]:
+        context = bench["setup"]()
+        func = bench["func"]
+        call = lambda: func(context)  # noqa: E731
+    else:
+        call = bench["func"]
+
+    timer = timeit.Timer(call)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time:
+            break
+        loops *= 10 if loops < 1000 else 2
+    return loops, [elapsed / loops for elapsed in timer.repeat(repeat, loops)]
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=str(project_root), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline. Returns the list of regressions."""
+    regressions = []
+    print(f"📊 Comparison with baseline ({baseline.get('commit') or '?'}, {baseline.get('timestamp', '?')}):")
+    for name, result in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            print(f"  {name:<45} new")
+            continue
+        ratio = result["min_s"] / base["min_s"]
+        marker = "❌" if ratio > 1 + threshold else ("✅" if ratio < 1 - threshold else "  ")
+        print(f"  {marker} {name:<42} {format_time(base['min_s']):>10} -> {format_time(result['min_s']):>10} ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    """Main entry point for the benchmark runner."""
+    parser = argparse.ArgumentParser(description="Run the tutor micro-benchmarks")
+    parser.add_argument("-k", "--filter", type=str, help="Regex selecting benchmark names")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per measurement")
+    parser.add_argument("--output", type=str, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=str, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown counted as a regression")
+
+    args = parser.parse_args()
+
+    benchmarks = load_benchmarks(args.filter)
+    if not benchmarks:
+        print("❌ No benchmarks matched")
+        sys.exit(1)
+
+    results = {}
+    start = time.perf_counter()
+    for bench in benchmarks:
+        loops, times = time_benchmark(bench, args.repeat, args.min_time)
+        results[bench["name"]] = {
+            "min_s": min(times),
+            "median_s": statistics.median(times),
+            "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "loops": loops,
+        }
+        print(f"  {bench['name']:<45} {format_time(min(times)):>10}  (median {format_time(statistics.median(times))}, {loops} loops)")
+    print(f"⏱️ {len(results)} benchmarks in {time.perf_counter() - start:.1f}s")
+
+    output = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ No regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
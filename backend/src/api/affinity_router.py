@@ -0,0 +1,177 @@
+"""
+Front router for multi-worker deployments with session affinity.
+
+A plain ASGI app proxying to the API workers: requests naming a session or job,
+or carrying an Idempotency-Key, go to the worker owning the ID or key on the
+consistent-hash ring (see src/shared/affinity.py), other requests go
+round-robin. A worker that refuses connections is skipped for a few seconds and
+its sessions are served by the next worker on the ring from the shared session
+store. Routing counters are
+served at /router/stats.
+"""
+
+import time
+import itertools
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+import orjson
+import uvicorn
+from starlette.datastructures import Headers
+from starlette.types import Message, Receive, Scope, Send
+
+from src.shared.affinity import affinity_key, get_ring
+
+# Headers that apply to one connection only
+_HOP_BY_HOP = {
+    b"connection",
+    b"keep-alive",
+    b"proxy-connection",
+    b"transfer-encoding",
+    b"te",
+    b"trailer",
+    b"upgrade",
+    b"host",
+    b"content-length",
+}
+
+
+class AffinityRouter:
+    """ASGI reverse proxy routing requests to workers by session ID."""
+
+    def __init__(self, worker_urls: List[str], down_seconds: float = 5.0, timeout: float = 300.0):
+        self.worker_urls = worker_urls
+        self.down_seconds = down_seconds
+        self.ring = get_ring(len(worker_urls))
+        self._round_robin = itertools.cycle(range(len(worker_urls)))
+        self._down_until: Dict[int, float] = {}
+        # Solving can take minutes and job event streams stay open
+        self._timeout = httpx.Timeout(timeout, connect=2.0)
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.requests = [0] * len(worker_urls)
+        self.stats = {"routed": 0, "unrouted": 0, "failovers": 0, "unavailable": 0}
+
+    def _down(self) -> Set[int]:
+        now = time.monotonic()
+        return {node for node, until in self._down_until.items() if until > now}
+
+    def _pick(self, key: Optional[str], skip: Set[int]) -> Optional[int]:
+        if key is not None:
+            return self.ring.node_for(key, down=skip)
+        for _ in range(len(self.worker_urls)):
+            node = next(self._round_robin)
+            if node not in skip:
+                return node
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if scope["path"] == "/router/stats":
+            await self._send_json(send, 200, self.get_stats())
+            return
+
+        body = await self._read_body(receive)
+        query_string = scope["query_string"].decode("latin-1")
+        idempotency_key = Headers(scope=scope).get("idempotency-key")
+        key = affinity_key(scope["path"], query_string, body, idempotency_key)
+        self.stats["routed" if key is not None else "unrouted"] += 1
+
+        headers = [(name, value) for name, value in scope["headers"] if name not in _HOP_BY_HOP]
+        if scope.get("client"):
+            headers.append((b"x-forwarded-for", scope["client"][0].encode("latin-1")))
+
+        skip = self._down()
+        while True:
+            node = self._pick(key, skip)
+            if node is None:
+                self.stats["unavailable"] += 1
+                await self._send_json(send, 503, {"detail": "No API worker available"})
+                return
+
+            url = self.worker_urls[node] + scope.get("raw_path", scope["path"].encode()).decode("latin-1")
+            if query_string:
+                url += "?" + query_string
+            request = self._client.build_request(scope["method"], url, headers=headers, content=body)
+            try:
+                upstream = await self._client.send(request, stream=True)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nothing reached the worker, so the request is safe to resend
+                self._down_until[node] = time.monotonic() + self.down_seconds
+                self.stats["failovers"] += 1
+                skip.add(node)
+                continue
+            break
+
+        self.requests[node] += 1
+        try:
+            response_headers = [
+                (name, value) for name, value in upstream.headers.raw if name.lower() not in _HOP_BY_HOP
+            ]
+            if "content-length" in upstream.headers:
+                response_headers.append((b"content-length", upstream.headers["content-length"].encode()))
+            response_headers.append((b"x-served-by", f"worker-{node}".encode()))
+            await send({"type": "http.response.start", "status": upstream.status_code, "headers": response_headers})
+            # Raw chunks: compressed bodies and event streams pass through untouched
+            async for chunk in upstream.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await upstream.aclose()
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message: Message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _send_json(self, send: Send, status: int, content: Any) -> None:
+        body = orjson.dumps(content)
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._client = httpx.AsyncClient(
+                    timeout=self._timeout,
+                    limits=httpx.Limits(max_connections=None, max_keepalive_connections=100),
+                    # Replaces httpx's default Accept-Encoding, so a client that sent
+                    # none gets an uncompressed body; the client's own header wins
+                    headers={"accept-encoding": "identity"},
+                )
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client is not None:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Routing counters: requests per worker, affinity-routed share and failovers."""
+        total = self.stats["routed"] + self.stats["unrouted"]
+        down = self._down()
+        return {
+            "workers": [
+                {"worker": node, "url": url, "requests": self.requests[node], "down": node in down}
+                for node, url in enumerate(self.worker_urls)
+            ],
+            **self.stats,
+            "routed_share": round(self.stats["routed"] / total, 4) if total else 0.0,
+        }
+
+
+def run_router(worker_urls: List[str], host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Run the affinity router in front of already started workers."""
+    uvicorn.run(AffinityRouter(worker_urls), host=host, port=port, log_level="info")
@@ -3,18 +3,68 @@ API GeometryTutor for non-interactive programmatic access.
 Provides REST API compatible methods for tutoring interactions.
 """
 
-from typing import Dict, Any, Optional, List
-
+import sys
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, List
+
+from src.shared.config import get_settings
+from src.shared.logging import get_logger
+from src.shared.tracing import (
+    SessionLedger,
+    detached_context,
+    record_cache,
+    record_queue_wait,
+    report_progress,
+    trace_span,
+)
 from src.geometry_tutor.base_tutor import BaseGeometryTutor
-from src.geometry_tutor.core import GraphState, create_initial_state
+from src.geometry_tutor.core import GraphState, create_initial_state, intern_shared_strings
 from src.geometry_tutor.agents import (
+    REASONING_FAILED_CONCLUSION,
     parse_problem,
     reason_and_solve,
     generate_hint,
     validate_solution,
     generate_solution,
     move_to_next_question,
+    build_hint_ladder,
 )
+from src.geometry_tutor.llm_utils import initialize_llm
+from src.geometry_tutor.session_capture import captured
+from src.geometry_tutor.problem_index import ProblemMatch, get_problem_index
+
+logger = get_logger("api_tutor")
+
+# Shared pool for generating hint ladders in the background after solving
+_hint_ladder_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hint-ladder")
+
+# Applies results of background work to their session: publisher(tutor, apply)
+# calls apply() while holding the session. Without one (CLI, scripts) apply()
+# runs directly.
+_background_publisher: Optional[Callable[["ApiGeometryTutor", Callable[[], None]], None]] = None
+
+
+def set_background_publisher(
+    publisher: Optional[Callable[["ApiGeometryTutor", Callable[[], None]], None]]
+) -> None:
+    """Route background updates (precomputed hint ladders) through publisher."""
+    global _background_publisher
+    _background_publisher = publisher
+
+
+def _publishes_status(method: Callable) -> Callable:
+    """Refresh the tutor's status snapshot once a mutating method returns."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.publish_status()
+
+    return wrapper
 
 
 class ApiGeometryTutor(BaseGeometryTutor):
@@ -23,10 +73,110 @@ class ApiGeometryTutor(BaseGeometryTutor):
     Provides non-interactive methods for programmatic access.
     """
 
+    # Many idle sessions are held at once; no per-instance __dict__
+    __slots__ = ("problem_text", "problem_match", "ledger", "status_snapshot", "status_cache", "state_version")
+
     def __init__(self):
         # Use strict environment (raise error on setup failure)
         super().__init__(strict_environment=True)
+        self.problem_text: str = ""
+        self.problem_match: Optional[ProblemMatch] = None
+        # Running LLM/cache/render cost of this session (filled in by tracing)
+        self.ledger = SessionLedger()
+        # Status as of the last completed mutation (see publish_status)
+        self.status_snapshot: Optional[Dict[str, Any]] = None
+        self.status_cache: Optional[Dict[str, Any]] = None
+        # Incremented on every published change; used as the /status ETag
+        self.state_version = 0
+
+    def _solve_current_question(self, state: GraphState) -> GraphState:
+        """
+        Run the solver for the current question, reusing the reasoning of a
+        near-duplicate problem from the problem index when one is available.
+        """
+        question_index = state["current_question_index"]
+        reused = bool(self.problem_match) and self.problem_match.apply_solution(state, question_index)
+        if self.problem_match:
+            record_cache("problem_index_solution", reused)
+        if reused:
+            self._schedule_hint_ladder(state)
+            return state
+
+        solved_state = reason_and_solve(state)
+
+        reasoning_chain = solved_state.get("reasoning_chain", [])
+        if (
+            reasoning_chain
+            and reasoning_chain[-1].get("conclusion") != REASONING_FAILED_CONCLUSION
+            and not solved_state.get("error_message")
+        ):
+            index = get_problem_index()
+            if index:
+                index.record_solution(self.problem_text, question_index, solved_state)
+            self._schedule_hint_ladder(solved_state)
+
+        return solved_state
+
+    def _schedule_hint_ladder(self, state: GraphState) -> None:
+        """
+        Generate the hint ladder for the current question in the background
+        (HINT_LADDER_MODE=background) so that /hint becomes a memory lookup.
+        """
+        if get_settings().hint_ladder_mode != "background":
+            return
+        if state.get("precomputed_hints") or not state.get("reasoning_chain"):
+            return
+
+        question_index = state["current_question_index"]
+        current_question = state["questions"][question_index]
+        known_facts = list(state["known_facts"])
+        reasoning_chain = state["reasoning_chain"]
+        ai_discovered_facts = list(state["ai_discovered_facts"])
+        problem_text = self.problem_text
+        submitted_at = time.perf_counter()
+
+        def _build() -> None:
+            record_queue_wait("hint_ladder", time.perf_counter() - submitted_at)
+            llm = initialize_llm()
+            if not llm:
+                return
+            try:
+                with trace_span("hint_ladder"):
+                    hints = build_hint_ladder(llm, current_question, known_facts, reasoning_chain)
+            except Exception as e:
+                logger.warning("Failed to precompute hints: %s", e)
+                return
+
+            def _apply() -> None:
+                # Publish only if the session is still on the same solve; moving to
+                # the next question replaces the reasoning chain list
+                if state["reasoning_chain"] is reasoning_chain:
+                    state["precomputed_hints"] = hints
+                    self.publish_status()
+
+            publisher = _background_publisher
+            if publisher is None:
+                _apply()
+            else:
+                publisher(self, _apply)
+
+            index = get_problem_index()
+            if index:
+                index.record_solution(
+                    problem_text,
+                    question_index,
+                    {
+                        "reasoning_chain": reasoning_chain,
+                        "ai_discovered_facts": ai_discovered_facts,
+                        "precomputed_hints": hints,
+                    },
+                )
+
+        # Keep the session tag for metrics, but not the (finished) request trace
+        _hint_ladder_executor.submit(detached_context().run, _build)
 
+    @captured("start")
+    @_publishes_status
     def start_problem(self, problem_text: str) -> Dict[str, Any]:
         """
         Start a new geometry problem session (non-interactive).
@@ -42,22 +192,42 @@ class ApiGeometryTutor(BaseGeometryTutor):
 
         # Generate a unique thread ID for this session
         self.thread_id = self._create_thread_id("api_session")
+        self.problem_text = sys.intern(problem_text)
 
         try:
-            # Parse the problem
-            parsed_state = parse_problem(initial_state)
+            # Reuse the parse of a near-duplicate problem seen in earlier sessions
+            index = get_problem_index()
+            self.problem_match = index.lookup(problem_text) if index else None
+            if index:
+                record_cache("problem_index", self.problem_match is not None)
+
+            if self.problem_match:
+                parsed_state = self.problem_match.apply_parsed(initial_state)
+            else:
+                # Parse the problem
+                report_progress("parsing")
+                parsed_state = parse_problem(initial_state)
 
-            if parsed_state.get("error_message"):
-                return {"success": False, "error": parsed_state["error_message"]}
+                if parsed_state.get("error_message"):
+                    return {"success": False, "error": parsed_state["error_message"]}
 
-            # Reason and solve for the first question
-            if parsed_state["questions"]:
-                # Extract facts and steps from the first question
-                from src.geometry_tutor.agents import extract_question_facts_and_steps
+                if parsed_state["questions"]:
+                    # Extract facts and steps from the first question
+                    from src.geometry_tutor.agents import extract_question_facts_and_steps
 
-                parsed_state = extract_question_facts_and_steps(parsed_state)
+                    report_progress("extracting")
+                    parsed_state = extract_question_facts_and_steps(parsed_state)
 
-                solved_state = reason_and_solve(parsed_state)
+            if index and parsed_state["questions"]:
+                index.record_parse(problem_text, parsed_state)
+
+            # Reason and solve for the first question
+            if parsed_state["questions"]:
+                # The questions can be shown (/status, /illustration) while solving
+                self.current_state = parsed_state
+                self.publish_status()
+                report_progress("solving")
+                solved_state = self._solve_current_question(parsed_state)
                 self.current_state = solved_state
             else:
                 self.current_state = parsed_state
@@ -79,6 +249,11 @@ class ApiGeometryTutor(BaseGeometryTutor):
 
     def get_status(self) -> Dict[str, Any]:
         """Get the current status of the tutoring session."""
+        if self.status_cache is not None:
+            return dict(self.status_cache)
+        return self._build_status()
+
+    def _build_status(self) -> Dict[str, Any]:
         basic_status = self.get_basic_status()
         if not basic_status["success"]:
             return basic_status
@@ -108,6 +283,8 @@ class ApiGeometryTutor(BaseGeometryTutor):
         except Exception as e:
             return {"success": False, "error": f"Error getting status: {str(e)}"}
 
+    @captured("hint")
+    @_publishes_status
     def request_hint(self) -> Dict[str, Any]:
         """Request a hint for the current question."""
         if not self.current_state:
@@ -145,6 +322,8 @@ class ApiGeometryTutor(BaseGeometryTutor):
         except Exception as e:
             return {"success": False, "error": f"Error generating hint: {str(e)}"}
 
+    @captured("validate")
+    @_publishes_status
     def validate_user_solution(self, user_input: str) -> Dict[str, Any]:
         """Validate a user's solution for the current question."""
         if not self.current_state:
@@ -201,6 +380,8 @@ class ApiGeometryTutor(BaseGeometryTutor):
         except Exception as e:
             return {"success": False, "error": f"Error validating solution: {str(e)}"}
 
+    @captured("solution")
+    @_publishes_status
     def get_complete_solution(self) -> Dict[str, Any]:
         """Get the complete solution for the current question."""
         if not self.current_state:
@@ -224,6 +405,8 @@ class ApiGeometryTutor(BaseGeometryTutor):
         except Exception as e:
             return {"success": False, "error": f"Error generating solution: {str(e)}"}
 
+    @captured("next")
+    @_publishes_status
     def move_to_next_question(self) -> Dict[str, Any]:
         """Move to the next question in the problem."""
         if not self.current_state:
@@ -236,7 +419,7 @@ class ApiGeometryTutor(BaseGeometryTutor):
             # If not complete, prepare the next question
             if not next_state["session_complete"]:
                 # Reason and solve for the new question
-                solved_state = reason_and_solve(next_state)
+                solved_state = self._solve_current_question(next_state)
                 self.current_state = solved_state
             else:
                 self.current_state = next_state
@@ -287,8 +470,67 @@ class ApiGeometryTutor(BaseGeometryTutor):
                 "error": f"Error getting current question: {str(e)}",
             }
 
+    def publish_status(self) -> None:
+        """
+        Rebuild the status snapshots from the current state and bump the state
+        version. Called after every mutation, so status reads never see a
+        half-updated state and never rebuild anything themselves.
+        """
+        self._refresh_status()
+        self.state_version += 1
+
+    def _refresh_status(self) -> None:
+        if self.current_state is not None:
+            intern_shared_strings(self.current_state)
+        self.status_snapshot = self._build_enhanced_status()
+        self.status_cache = self._build_status()
+        if self.status_snapshot["success"] and self.status_cache["success"]:
+            # Both views share the snapshot's immutable copies of the growing lists;
+            # a new copy is only made by the next mutation
+            self.status_cache["known_facts"] = self.status_snapshot["known_facts"]
+            self.status_cache["illustration_steps"] = self.status_snapshot["illustration_steps"]
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        JSON-serializable copy of the session (state, version, problem-index
+        match and cost ledger), used by the shared session store to hand
+        sessions between workers.
+        """
+        return {
+            "problem_text": self.problem_text,
+            "thread_id": self.thread_id,
+            "state_version": self.state_version,
+            "current_state": self.current_state,
+            "problem_match": self.problem_match.to_dict() if self.problem_match else None,
+            "ledger": self.ledger.to_dict(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "ApiGeometryTutor":
+        """Rebuild a tutor from to_snapshot() output without re-running any LLM step."""
+        tutor = cls()
+        tutor.problem_text = sys.intern(snapshot["problem_text"])
+        tutor.thread_id = snapshot["thread_id"]
+        tutor.current_state = snapshot["current_state"]
+        tutor.ledger = SessionLedger.from_dict(snapshot["ledger"])
+        tutor.state_version = snapshot["state_version"]
+
+        # The near-duplicate match only feeds later questions; it is a reference
+        # into the index, so no new lookup is needed
+        index = get_problem_index()
+        if index and snapshot.get("problem_match"):
+            tutor.problem_match = ProblemMatch.from_dict(index, snapshot["problem_match"])
+        if tutor.current_state is not None:
+            tutor._refresh_status()
+        return tutor
+
     def get_enhanced_status(self) -> Dict[str, Any]:
         """Get enhanced status including original problem, solved questions, and current solution if validated."""
+        if self.status_snapshot is not None:
+            return dict(self.status_snapshot)
+        return self._build_enhanced_status()
+
+    def _build_enhanced_status(self) -> Dict[str, Any]:
         if not self.current_state:
             return {"success": False, "error": "No active session"}
 
@@ -327,11 +569,11 @@ class ApiGeometryTutor(BaseGeometryTutor):
                 "hints_used": len(self.current_state["generated_hints"]),
                 "is_validated": self.current_state["is_validated"],
                 "session_complete": self.current_state["session_complete"],
-                "known_facts": self.current_state["known_facts"],
+                "known_facts": tuple(self.current_state["known_facts"]),
                 "original_problem": self.current_state["original_problem"],
                 "previously_solved_questions": previously_solved,
                 "current_question_solution": current_solution,
-                "illustration_steps": self.current_state.get("illustration_steps", []),
+                "illustration_steps": tuple(self.current_state.get("illustration_steps", [])),
             }
 
         except Exception as e:
@@ -1,4 +1,4 @@
-import os, subprocess, base64
+import os, subprocess, base64, time
 import google.generativeai as genai
 from .viz_prompts import (
     prompt_gen_asymptote,
@@ -10,6 +10,12 @@ from .viz_prompts import (
 from dotenv import load_dotenv
 import pathlib
 
+from src.geometry_tutor.stub_llm import StubGenerativeModel, is_stub_model
+from src.shared.logging import get_logger
+from src.shared.tracing import record_llm_call, render_span, trace_span
+
+logger = get_logger("visualization")
+
 # Load .env from backend directory
 backend_dir = pathlib.Path(__file__).parent.parent.parent
 env_path = backend_dir / '.env'
@@ -17,14 +23,6 @@ load_dotenv(env_path)
 
 GEMINI_MODEL = "gemini-2.0-flash"
 
-# Get API key from environment
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    print(f"Warning: GOOGLE_API_KEY not found. Trying to load from: {env_path}")
-    print(f"Environment variables: {[k for k in os.environ.keys() if 'GOOGLE' in k]}")
-    raise ValueError("GOOGLE_API_KEY environment variable is required for visualization")
-
-genai.configure(api_key=GOOGLE_API_KEY)
 config = {
     "temperature": 0.0,
     "top_p": 0.5,
@@ -32,7 +30,39 @@ config = {
     "max_output_tokens": 2048,
 }
 
-model = genai.GenerativeModel(GEMINI_MODEL, generation_config=config)
+if is_stub_model(os.getenv("LLM_MODEL")):
+    # Offline stub backend: no API key or network needed
+    model = StubGenerativeModel()
+else:
+    # Get API key from environment
+    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    if not GOOGLE_API_KEY:
+        logger.warning(
+            "GOOGLE_API_KEY not found. Trying to load from: %s. Environment variables: %s",
+            env_path, [k for k in os.environ.keys() if 'GOOGLE' in k],
+        )
+        raise ValueError("GOOGLE_API_KEY environment variable is required for visualization")
+
+    genai.configure(api_key=GOOGLE_API_KEY)
+    model = genai.GenerativeModel(GEMINI_MODEL, generation_config=config)
+
+
+def generate_text(prompt):
+    """Call the visualization model and report latency and token usage."""
+    start = time.perf_counter()
+    try:
+        response = model.generate_content(prompt)
+    except Exception:
+        record_llm_call(GEMINI_MODEL, time.perf_counter() - start, failed=True)
+        raise
+    usage = getattr(response, "usage_metadata", None)
+    record_llm_call(
+        GEMINI_MODEL,
+        time.perf_counter() - start,
+        getattr(usage, "prompt_token_count", 0) or 0,
+        getattr(usage, "candidates_token_count", 0) or 0,
+    )
+    return response.text
 
 
 class VizSolver:
@@ -67,9 +97,7 @@ class VizSolver:
             student_drawing_steps=self.student_drawing_steps
         )
 
-        self.asymptote_drawing_steps = model.generate_content(
-            self.drawing_steps_prompt
-        ).text
+        self.asymptote_drawing_steps = generate_text(self.drawing_steps_prompt)
 
     def get_geometry_reasoning(self):
         self.geometry_reasoning_prompt = prompt_get_geometry_reasoning.format(
@@ -77,9 +105,7 @@ class VizSolver:
             student_drawing_steps=self.student_drawing_steps,
             asymptote_drawing_steps=self.asymptote_drawing_steps,
         )
-        self.geometry_reasoning = model.generate_content(
-            self.geometry_reasoning_prompt
-        ).text
+        self.geometry_reasoning = generate_text(self.geometry_reasoning_prompt)
 
     def gen_asymptote_code(self):
         self.asymptote_code_prompt = prompt_gen_asymptote.format(
@@ -88,7 +114,7 @@ class VizSolver:
             asymptote_drawing_steps=self.asymptote_drawing_steps,
             geometry_reasoning=self.geometry_reasoning,
         )
-        self.asymptote_code = model.generate_content(self.asymptote_code_prompt).text
+        self.asymptote_code = generate_text(self.asymptote_code_prompt)
 
     def problem_to_viz_code(self):
         try:
@@ -96,21 +122,21 @@ class VizSolver:
             self.get_geometry_reasoning()
             self.gen_asymptote_code()
         except Exception as e:
-            print("Error generating Asymptote code:", e)
+            logger.error("Error generating Asymptote code: %s", e)
             self.err = str(e)
 
         if not self.asymptote_code:
             self.err = "Failed to generate Asymptote code."
-            print(self.err)
+            logger.error(self.err)
             return
         else:
             self.exec_asymptote()
-            print(self.asymptote_code)
-            # pass
+            # Generated programs are long; only a sample is logged
+            logger.info("Asymptote code:\n%s", self.asymptote_code, extra={"sampled": True})
 
     def exec_asymptote(self):
         if not self.asymptote_code:
-            print("No Asymptote code generated.")
+            logger.warning("No Asymptote code generated.")
             return
 
         code_asy = self.clean_asy(self.asymptote_code)
@@ -127,12 +153,15 @@ class VizSolver:
 
         # Run the Asymptote command to generate a JPG
         try:
-            result = subprocess.run(
-                ["asy", "-f", "jpg", asy_file_path], 
-                capture_output=True, 
-                text=True,
-                cwd=current_dir  # Run in the asymptote directory
-            )
+            with render_span() as render:
+                result = subprocess.run(
+                    ["asy", "-f", "jpg", asy_file_path], 
+                    capture_output=True, 
+                    text=True,
+                    cwd=current_dir  # Run in the asymptote directory
+                )
+                if result.returncode != 0:
+                    render["outcome"] = "error"
             
             if result.returncode == 0:
                 # Convert the generated JPG to base64
@@ -141,16 +170,16 @@ class VizSolver:
                         self.b64_string_viz = base64.b64encode(img_file.read()).decode("utf-8")
                 else:
                     self.code_err = "JPG file was not generated"
-                    print("Error: JPG file was not generated")
+                    logger.error("JPG file was not generated")
                     return
             else:
                 self.code_err = result.stderr
-                print("Asymptote Error:", result.stderr)
+                logger.error("Asymptote error: %s", result.stderr)
                 return
                 
         except Exception as e:
             self.code_err = str(e)
-            print("Error running Asymptote command:", self.code_err)
+            logger.error("Error running Asymptote command: %s", self.code_err)
             return
 
         # Cleanup files (optional)
@@ -171,6 +200,7 @@ def get_visualization(session_id, problem, student_drawing_steps):
     )
 
     # Asymptote Image Generation by LLM
-    VizS.problem_to_viz_code()
+    with trace_span("visualization"):
+        VizS.problem_to_viz_code()
 
     return VizS.b64_string_viz
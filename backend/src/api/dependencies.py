@@ -3,19 +3,27 @@ FastAPI dependencies for dependency injection.
 Provides singleton instances of services for API endpoints.
 """
 
-from fastapi import HTTPException
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
 
 from src.services.session_service import SessionService
+from src.services.idempotency_service import IdempotencyService
+from src.services.job_service import JobService
 from src.services.tutor_service import TutorService
 from src.services.visualization_service import VisualizationService
 from src.services.llm_service import LLMService
 from src.geometry_tutor.llm_utils import setup_environment
+from src.shared.config import get_settings
 
 # Global singleton instances
 _llm_service = None
 _session_service = None
 _tutor_service = None
 _visualization_service = None
+_idempotency_service = None
+_job_service = None
 
 
 def get_llm_service() -> LLMService:
@@ -63,10 +71,44 @@ def get_visualization_service() -> VisualizationService:
     return _visualization_service
 
 
+def get_idempotency_service() -> IdempotencyService:
+    """Get singleton idempotency service instance."""
+    global _idempotency_service
+    if _idempotency_service is None:
+        settings = get_settings()
+        _idempotency_service = IdempotencyService(
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            max_keys=settings.idempotency_max_keys,
+        )
+    return _idempotency_service
+
+
+def get_job_service() -> JobService:
+    """Get singleton job service instance."""
+    global _job_service
+    if _job_service is None:
+        settings = get_settings()
+        _job_service = JobService(
+            get_session_service(),
+            max_concurrent=settings.job_max_concurrent,
+            ttl_seconds=settings.job_ttl_seconds,
+        )
+    return _job_service
+
+
 def check_environment():
     """Dependency to ensure environment is properly set up."""
     if not setup_environment():
         raise HTTPException(
             status_code=500,
             detail="Environment setup failed. Please check API key configuration.",
-        )
\ No newline at end of file
+        )
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Dependency guarding admin endpoints with the ADMIN_TOKEN header."""
+    admin_token = get_settings().admin_token
+    if not admin_token:
+        # Admin endpoints do not exist unless a token is configured
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -3,20 +3,61 @@ FastAPI-based REST API server for the AI Geometry Tutor.
 Streamlined main application file with modular route organization.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
 # Import route modules
-from .routes import health, sessions, tutoring, visualization
+from .routes import admin, health, jobs, sessions, tutoring, visualization
+
+from .serialization import FastJSONResponse
 
 # Import middleware setup functions
-from .middleware import setup_cors, setup_error_handlers, setup_request_logging
+from .middleware import (
+    setup_compression,
+    setup_cors,
+    setup_error_handlers,
+    setup_request_logging,
+    setup_request_tracing,
+)
+
+from .dependencies import get_session_service
+
+from src.shared.logging import setup_logging
 
-# Dependencies are used in route modules
+# Seconds between sweeps expiring and hibernating idle sessions
+SESSION_MAINTENANCE_INTERVAL = 60.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the periodic session maintenance and apply background updates while the application serves."""
+    try:
+        session_service = get_session_service()
+    except Exception:
+        # Incomplete configuration is reported by the health check
+        yield
+        return
+    session_service.attach_background_updates(asyncio.get_running_loop())
+    maintenance = asyncio.create_task(session_service.run_maintenance(SESSION_MAINTENANCE_INTERVAL))
+    try:
+        yield
+    finally:
+        maintenance.cancel()
+        session_service.attach_background_updates(None)
 
 
 def create_app() -> FastAPI:
     """Factory function to create the FastAPI app."""
+    # Route logs through the background queue; an incomplete configuration
+    # (e.g. missing API key) is reported by the health check instead
+    try:
+        setup_logging()
+    except Exception:
+        pass
+
     # Create FastAPI application
     app = FastAPI(
         title="AI Geometry Tutor API",
@@ -24,18 +65,25 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
     )
 
     # Setup middleware
     setup_cors(app)
     setup_error_handlers(app)
     setup_request_logging(app)
+    setup_request_tracing(app)
+    # Added last so it is outermost and compresses the final headers and body
+    setup_compression(app)
 
     # Include route modules
     app.include_router(health.router, tags=["health"])
     app.include_router(sessions.router, tags=["sessions"]) 
+    app.include_router(jobs.router, tags=["jobs"])
     app.include_router(tutoring.router, tags=["tutoring"])
     app.include_router(visualization.router, tags=["visualization"])
+    app.include_router(admin.router, tags=["admin"])
 
     return app
 
@@ -44,13 +92,14 @@ def create_app() -> FastAPI:
 app = create_app()
 
 
-def run_server(host: str = "127.0.0.1", port: int = 8000, debug: bool = False):
-    """Run the API server."""
+def run_server(host: str = "127.0.0.1", port: int = 8000, debug: bool = False, workers: int = 1):
+    """Run the API server (auto-reload in debug mode, else with the given number of worker processes)."""
     uvicorn.run(
-        "src.api.main:app" if not debug else "src.api.main:app",
+        "src.api.main:app",
         host=host,
         port=port,
         reload=debug,
+        workers=None if debug else workers,
         log_level="info",
     )
 
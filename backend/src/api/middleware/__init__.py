@@ -2,12 +2,16 @@
 API middleware package for cross-cutting concerns.
 """
 
+from .compression import setup_compression
 from .error_handling import setup_error_handlers
 from .logging import setup_request_logging
+from .tracing import setup_request_tracing
 from .cors import setup_cors
 
 __all__ = [
     "setup_error_handlers",
     "setup_request_logging",
-    "setup_cors"
+    "setup_request_tracing",
+    "setup_cors",
+    "setup_compression"
 ]
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Response compression middleware (brotli or gzip).
+
+Responses at least COMPRESSION_MIN_SIZE bytes long (counted over streamed
+chunks too) are compressed with brotli when the client accepts it and the
+optional brotli package is installed, and with gzip otherwise. Bodies that are already compressed (images, archives,
+responses with a Content-Encoding) and event streams are sent as they are.
+"""
+
+import zlib
+from typing import List, Optional
+
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.shared.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Content types whose bodies are already compressed or must not be buffered
+_SKIPPED_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-brotli",
+    "text/event-stream",
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings listed in Accept-Encoding without q=0."""
+    encodings = []
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if name and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.append(name.strip().lower())
+    return encodings
+
+
+class _Compressor:
+    """Incremental brotli or gzip compressor."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            # Text mode suits JSON and Markdown (including UTF-8 Vietnamese)
+            self._brotli = brotli.Compressor(mode=brotli.MODE_TEXT, quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.flush() if flush else b"")
+        out = self._gzip.compress(data)
+        return out + (self._gzip.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._gzip.compress(data) + self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large responses with brotli or gzip."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and self.brotli_quality > 0 and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._choose_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+        # Body chunks held until minimum_size bytes arrive or the response ends:
+        # middlewares built on BaseHTTPMiddleware stream even small bodies in chunks
+        pending: List[bytes] = []
+        pending_size = 0
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough, pending_size
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows the size
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or content_type.startswith(_SKIPPED_TYPES):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                pending.append(body)
+                pending_size += len(body)
+                if more_body and pending_size < self.minimum_size:
+                    return
+                body = b"".join(pending)
+                pending.clear()
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # Streaming response: the final length is unknown
+                del headers["Content-Length"]
+                await send(start)
+
+            body = compressor.compress(body, flush=True) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    """Compress a whole body the way the middleware does ("br" or "gzip")."""
+    return _Compressor(encoding, gzip_level, brotli_quality).finish(body)
+
+
+def setup_compression(app: FastAPI) -> None:
+    """Setup response compression for the FastAPI application."""
+    try:
+        settings = get_settings()
+    except Exception:
+        # Incomplete configuration is reported by the health check
+        app.add_middleware(CompressionMiddleware)
+        return
+    if not settings.compression_enabled:
+        return
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
@@ -5,6 +5,10 @@ Request logging middleware.
 import time
 from fastapi import FastAPI
 
+from src.shared.logging import get_logger
+
+logger = get_logger("api.requests")
+
 
 def setup_request_logging(app: FastAPI) -> None:
     """Setup request logging middleware for the FastAPI application."""
@@ -12,16 +16,19 @@ def setup_request_logging(app: FastAPI) -> None:
     @app.middleware("http")
     async def log_requests(request, call_next):
         start_time = time.time()
-        print(f"🔍 Incoming request: {request.method} {request.url}")
+        logger.debug("Incoming request: %s %s", request.method, request.url)
         
         try:
             response = await call_next(request)
             process_time = time.time() - start_time
-            print(f"✅ Response: {response.status_code} (took {process_time:.2f}s)")
+            logger.info(
+                "%s %s -> %d (took %.2fs)",
+                request.method, request.url.path, response.status_code, process_time,
+            )
             return response
         except Exception as e:
             process_time = time.time() - start_time
-            print(f"❌ Request failed: {str(e)} (took {process_time:.2f}s)")
-            import traceback
-            traceback.print_exc()
+            logger.exception(
+                "%s %s failed: %s (took %.2fs)", request.method, request.url.path, e, process_time
+            )
             raise
\ No newline at end of file
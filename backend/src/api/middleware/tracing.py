@@ -0,0 +1,34 @@
+"""
+Request tracing middleware: per-request timing headers and HTTP metrics.
+"""
+
+import time
+from fastapi import FastAPI
+
+from src.shared import metrics
+from src.shared.tracing import start_request_trace
+
+
+def setup_request_tracing(app: FastAPI) -> None:
+    """Setup request tracing middleware for the FastAPI application."""
+
+    @app.middleware("http")
+    async def trace_requests(request, call_next):
+        trace = start_request_trace()
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            duration = time.perf_counter() - start_time
+            # Label by route template so session IDs in paths do not create new series
+            route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+            metrics.http_request_duration.observe(
+                duration, method=request.method, route=route, status=str(status_code)
+            )
+
+        server_timing = trace.server_timing()
+        total = f"total;dur={duration * 1000:.1f}"
+        response.headers["Server-Timing"] = f"{server_timing}, {total}" if server_timing else total
+        return response
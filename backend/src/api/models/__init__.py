@@ -8,12 +8,14 @@ from .requests import (
 )
 
 from .responses import (
+    SessionCost,
     SessionStatus,
     ApiResponse,
     HintResponse,
     ValidationResponse,
     SolutionResponse,
-    IllustrationResponse
+    IllustrationResponse,
+    JobStatus
 )
 
 __all__ = [
@@ -21,10 +23,12 @@ __all__ = [
     "ProblemRequest",
     "ValidationRequest",
     # Response models
+    "SessionCost",
     "SessionStatus",
     "ApiResponse",
     "HintResponse",
     "ValidationResponse",
     "SolutionResponse",
-    "IllustrationResponse"
+    "IllustrationResponse",
+    "JobStatus"
 ]
\ No newline at end of file
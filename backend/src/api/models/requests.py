@@ -19,6 +19,10 @@ class ProblemRequest(BaseModel):
         default=None,
         description="Base64 encoded image of the geometry problem (required if is_img=true)",
     )
+    async_mode: bool = Field(
+        default=False,
+        description="Return session_id and job_id immediately and create the session in the background",
+    )
 
 
 class ValidationRequest(BaseModel):
@@ -7,6 +7,20 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 
 
+class SessionCost(BaseModel):
+    llm_calls: int = 0
+    llm_errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    render_jobs: int = 0
+    render_seconds: float = 0.0
+    node_seconds: Dict[str, float] = Field(default_factory=dict)
+
+
 class SessionStatus(BaseModel):
     session_id: str
     success: bool
@@ -24,6 +38,7 @@ class SessionStatus(BaseModel):
     illustration_steps: List[str]
     created_at: datetime
     last_activity: datetime
+    cost: Optional[SessionCost] = None
 
 
 class ApiResponse(BaseModel):
@@ -80,4 +95,19 @@ class IllustrationResponse(BaseModel):
     b64_string_viz: Optional[str] = Field(
         None, description="Base64 encoded visualization image"
     )
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+class JobStatus(BaseModel):
+    job_id: str
+    session_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    stage: str = Field(..., description="queued, ocr, parsing, extracting, solving or done")
+    step: int = Field(default=0, description="Current solver step (while solving)")
+    total: int = Field(default=0, description="Solver step limit (while solving)")
+    interactive: bool = Field(
+        default=False, description="Questions are parsed and shown by /status"
+    )
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
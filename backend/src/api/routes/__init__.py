@@ -7,10 +7,14 @@ from . import sessions
 from . import tutoring  
 from . import visualization
 from . import health
+from . import admin
+from . import jobs
 
 __all__ = [
     "sessions",
     "tutoring",
     "visualization", 
-    "health"
+    "health",
+    "admin",
+    "jobs"
 ]
\ No newline at end of file
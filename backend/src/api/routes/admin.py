@@ -0,0 +1,69 @@
+"""
+Admin-only diagnostics endpoints (require the X-Admin-Token header).
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.shared.config import get_settings
+from src.shared.profiler import ProfilerBusyError, dump_asyncio_tasks, run_profile
+
+from ..dependencies import get_session_service, require_admin
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile")
+async def profile_process(
+    seconds: float = Query(default=10.0, gt=0, description="How long to sample"),
+    interval_ms: float = Query(default=10.0, ge=1, le=1000, description="Time between samples"),
+    asyncio_tasks: bool = Query(default=False, description="Also dump pending asyncio tasks"),
+):
+    """
+    Sample the stacks of every thread in this worker for a few seconds.
+
+    Returns collapsed stacks ("frame;frame;frame count" per line) ready for
+    flamegraph.pl or speedscope. With asyncio_tasks=true the response is JSON
+    and also contains the event loop's pending tasks at the start of the profile.
+    """
+    max_seconds = get_settings().profiler_max_seconds
+    if seconds > max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be <= {max_seconds}")
+
+    # Task stacks must be read on the event loop thread, before sampling starts
+    tasks = dump_asyncio_tasks() if asyncio_tasks else None
+
+    try:
+        # Sampling sleeps between snapshots on a worker thread; the loop keeps serving
+        sampler = await run_in_threadpool(run_profile, seconds, interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if tasks is not None:
+        return {
+            "samples": sampler.samples,
+            "duration": round(sampler.elapsed, 3),
+            "collapsed": sampler.collapsed(),
+            "asyncio_tasks": tasks,
+        }
+
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(sampler.samples),
+            "X-Profile-Duration": f"{sampler.elapsed:.3f}",
+        },
+    )
+
+
+@router.get("/costs")
+async def session_costs(
+    top: int = Query(default=10, ge=1, le=100, description="Sessions and problems to list"),
+    session_service=Depends(get_session_service),
+):
+    """LLM, cache and render cost aggregated over all active sessions."""
+    return session_service.get_cost_report(top)
@@ -3,9 +3,17 @@ Health check endpoints for API monitoring.
 """
 
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.shared.logging import get_dropped_count
+from src.shared.metrics import registry
 
 from src.geometry_tutor.llm_utils import setup_environment
+from src.geometry_tutor.input_classifier import classification_stats
+from src.geometry_tutor.problem_index import get_problem_index
+
+from ..dependencies import get_idempotency_service, get_job_service, get_session_service
 
 router = APIRouter()
 
@@ -21,6 +29,34 @@ async def health_check():
         raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
 
 
+@router.get("/stats")
+async def service_stats(
+    session_service=Depends(get_session_service),
+    idempotency_service=Depends(get_idempotency_service),
+    job_service=Depends(get_job_service),
+):
+    """Fast-path, cache, session lock, idempotency and job statistics for monitoring."""
+    index = get_problem_index()
+    return {
+        "input_classification": classification_stats.snapshot(),
+        "problem_index": index.get_stats() if index else {"enabled": False},
+        "logging": {"dropped_records": get_dropped_count()},
+        "session_locks": session_service.locks.get_stats(),
+        "session_store": session_service.repository.get_stats(),
+        "idempotency": idempotency_service.get_stats(),
+        "jobs": job_service.get_stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Node, LLM, render, queue and cache metrics in Prometheus text format."""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @router.get("/test")
 async def test_endpoint():
     """Simple test endpoint for debugging"""
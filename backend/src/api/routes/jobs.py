@@ -0,0 +1,63 @@
+"""
+Background job endpoints (asynchronous session creation).
+"""
+
+from datetime import datetime
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+
+from ..serialization import FastJSONResponse
+from ..models.responses import JobStatus
+from ..dependencies import get_job_service
+
+router = APIRouter()
+
+# Seconds between keep-alive comments on an idle event stream
+_KEEPALIVE_SECONDS = 15.0
+
+
+def _job_status(job) -> JobStatus:
+    data = job.to_dict()
+    data["created_at"] = datetime.fromtimestamp(data["created_at"])
+    data["updated_at"] = datetime.fromtimestamp(data["updated_at"])
+    return JobStatus(**data)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, job_service=Depends(get_job_service)):
+    """Get the stage and progress of a background session creation."""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return FastJSONResponse(_job_status(job))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, job_service=Depends(get_job_service)):
+    """
+    Stream job progress as Server-Sent Events.
+
+    Sends a "progress" event with the job status on every change and closes
+    the stream after the event for the finished (succeeded or failed) job.
+    """
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    async def _events() -> AsyncIterator[str]:
+        while True:
+            version = job.version
+            status = _job_status(job)
+            yield f"event: progress\ndata: {status.model_dump_json()}\n\n"
+            if job.finished:
+                return
+            while not await job.wait_for_change(version, _KEEPALIVE_SECONDS):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
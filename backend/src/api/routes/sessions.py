@@ -2,12 +2,20 @@
 Session management endpoints.
 """
 
-from typing import Dict, Any, Union
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from typing import Dict, Any, Optional, Union
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header, Response
 
+from src.services.idempotency_service import IdempotencyKeyError
+
+from ..serialization import FastJSONResponse
 from ..models.requests import ProblemRequest
 from ..models.responses import SessionStatus
-from ..dependencies import get_session_service, get_tutor_service
+from ..dependencies import (
+    get_idempotency_service,
+    get_job_service,
+    get_session_service,
+    get_tutor_service,
+)
 
 router = APIRouter()
 
@@ -19,8 +27,12 @@ router = APIRouter()
 async def create_session(
     request: ProblemRequest, 
     background_tasks: BackgroundTasks,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
     session_service=Depends(get_session_service),
-    tutor_service=Depends(get_tutor_service)
+    tutor_service=Depends(get_tutor_service),
+    idempotency_service=Depends(get_idempotency_service),
+    job_service=Depends(get_job_service),
 ) -> Dict[str, Union[str, int]]:
     """
     Create a new tutoring session with a geometry problem.
@@ -30,67 +42,119 @@ async def create_session(
 
     Only one of problem_text or img should be provided based on the is_img flag.
 
+    With async_mode=true the response comes back immediately with a job_id as
+    well; the session is created in the background (see /jobs/{job_id}).
+
+    Retries sent with the same Idempotency-Key get the session created by the
+    first request instead of a new one.
+
     Returns session_id for subsequent API calls.
     """
-    try:
-        # Process the problem text based on is_img flag
-        if request.is_img and request.img is not None:
-            # Process image to extract problem text
-            try:
-                final_problem_text = await tutor_service.process_image_to_text(request.img)
-            except Exception as img_error:
+    async def _create() -> Dict[str, Union[str, int]]:
+        try:
+            if request.async_mode:
+                # Respond right away; progress is polled at /jobs/{job_id}
+                has_image = request.is_img and request.img is not None
+                if not has_image and not request.problem_text.strip():
+                    raise HTTPException(status_code=400, detail="Problem text is required")
+
+                job = job_service.submit(
+                    problem_text=request.problem_text,
+                    image_b64=request.img if has_image else None,
+                    ocr=tutor_service.process_image_to_text,
+                )
+                background_tasks.add_task(session_service.cleanup_expired_sessions)
+                return {
+                    "session_id": job.session_id,
+                    "job_id": job.job_id,
+                    "message": "Session creation started",
+                    "total_questions": 0,
+                }
+
+            # Process the problem text based on is_img flag
+            if request.is_img and request.img is not None:
+                # Process image to extract problem text
+                try:
+                    final_problem_text = await tutor_service.process_image_to_text(request.img)
+                except Exception as img_error:
+                    raise HTTPException(
+                        status_code=400, detail=f"Failed to process image: {str(img_error)}"
+                    )
+            else:
+                # Use provided problem text
+                final_problem_text = request.problem_text
+
+            # Validate that we have some problem text
+            if not final_problem_text.strip():
                 raise HTTPException(
-                    status_code=400, detail=f"Failed to process image: {str(img_error)}"
+                    status_code=400,
+                    detail=(
+                        "Failed to extract problem text from image"
+                        if request.img
+                        else "Problem text is required"
+                    ),
                 )
-        else:
-            # Use provided problem text
-            final_problem_text = request.problem_text
 
-        # Validate that we have some problem text
-        if not final_problem_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    "Failed to extract problem text from image"
-                    if request.img
-                    else "Problem text is required"
-                ),
-            )
+            # Create session through service
+            result = session_service.create_session(final_problem_text)
 
-        # Create session through service
-        result = session_service.create_session(final_problem_text)
+            if not result["success"]:
+                raise HTTPException(status_code=400, detail=result["error"])
 
-        if not result["success"]:
-            raise HTTPException(status_code=400, detail=result["error"])
+            # Schedule cleanup task
+            background_tasks.add_task(session_service.cleanup_expired_sessions)
 
-        # Schedule cleanup task
-        background_tasks.add_task(session_service.cleanup_expired_sessions)
+            return {
+                "session_id": result["session_id"],
+                "message": "Session created successfully",
+                "total_questions": result.get("total_questions", 0),
+            }
 
-        return {
-            "session_id": result["session_id"],
-            "message": "Session created successfully",
-            "total_questions": result.get("total_questions", 0),
-        }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Failed to create session: {str(e)}"
+            )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to create session: {str(e)}"
+    try:
+        result, replayed = await idempotency_service.run(
+            "sessions",
+            idempotency_key,
+            idempotency_service.fingerprint(request.model_dump_json()),
+            _create,
         )
+    except IdempotencyKeyError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 
 @router.get("/status", response_model=SessionStatus)
 async def get_session_status(
     session_id: str,
+    if_none_match: Optional[str] = Header(default=None, alias="If-None-Match"),
     session_service=Depends(get_session_service)
-) -> SessionStatus:
-    """Get current status of a tutoring session."""
-    tutor = session_service.get_session(session_id)
+):
+    """
+    Get current status of a tutoring session.
+
+    The response carries a weak ETag tracking the session state; polling with
+    If-None-Match returns 304 until a hint, validation or solution changes it
+    (created_at, last_activity and cost are not part of the comparison).
+    """
+    tutor = await session_service.load_session(session_id)
     if not tutor:
         raise HTTPException(status_code=404, detail="Session not found or expired")
 
+    etag = f'W/"{session_id}-{tutor.state_version}"'
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+
     try:
+        # Served from the snapshot taken after the last mutation, without the session lock
         status = tutor.get_enhanced_status()
         session_info = session_service.get_session_info(session_id)
 
@@ -100,7 +164,8 @@ async def get_session_status(
         if not session_info:
             raise HTTPException(status_code=404, detail="Session info not found")
 
-        return SessionStatus(
+        # Built and validated once, serialized without FastAPI's re-validation
+        status_model = SessionStatus(
             session_id=session_id,
             success=status["success"],
             current_question_index=status["current_question_index"] + 1,
@@ -117,7 +182,9 @@ async def get_session_status(
             illustration_steps=status["illustration_steps"],
             created_at=session_info["created_at"],
             last_activity=session_info["last_activity"],
+            cost=session_info.get("cost"),
         )
+        return FastJSONResponse(status_model, headers={"ETag": etag})
 
     except HTTPException:
         raise
@@ -2,11 +2,17 @@
 Tutoring interaction endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from starlette.concurrency import run_in_threadpool
+
+from src.services.idempotency_service import IdempotencyKeyError
+from src.shared.exceptions import SessionBusyError
 
 from ..models.requests import ValidationRequest
 from ..models.responses import HintResponse, ValidationResponse, SolutionResponse
-from ..dependencies import get_session_service
+from ..dependencies import get_idempotency_service, get_session_service
 
 router = APIRouter()
 
@@ -16,21 +22,23 @@ async def request_hint(
     session_id: str, session_service=Depends(get_session_service)
 ) -> HintResponse:
     """Request a hint for the current question."""
-    tutor = session_service.get_session(session_id)
+    tutor = await session_service.load_session(session_id)
     if not tutor:
         raise HTTPException(status_code=404, detail="Session not found or expired")
 
     try:
-        # Get current state
-        status = tutor.get_status()
-        if not status["success"]:
-            raise HTTPException(status_code=400, detail=status["error"])
+        # One mutation per session at a time; the tutor runs off the event loop
+        async with session_service.lock_session(session_id):
+            # Get current state
+            status = tutor.get_status()
+            if not status["success"]:
+                raise HTTPException(status_code=400, detail=status["error"])
 
-        if status["session_complete"]:
-            raise HTTPException(status_code=400, detail="Session already complete")
+            if status["session_complete"]:
+                raise HTTPException(status_code=400, detail="Session already complete")
 
-        # Request hint
-        hint_result = tutor.request_hint()
+            # Request hint
+            hint_result = await run_in_threadpool(tutor.request_hint)
 
         if not hint_result["success"]:
             return HintResponse(
@@ -48,6 +56,8 @@ async def request_hint(
         )
     except HTTPException:
         raise
+    except SessionBusyError as e:
+        raise HTTPException(status_code=409, detail=e.message)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to generate hint: {str(e)}"
@@ -56,64 +66,91 @@ async def request_hint(
 
 @router.post("/validate", response_model=ValidationResponse)
 async def validate_solution(
-    request: ValidationRequest, session_service=Depends(get_session_service)
+    request: ValidationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+    session_service=Depends(get_session_service),
+    idempotency_service=Depends(get_idempotency_service),
 ) -> ValidationResponse:
-    """Validate a student's solution for the current question and automatically move to next if correct."""
+    """
+    Validate a student's solution for the current question and automatically move to next if correct.
+
+    A retry sent with the same Idempotency-Key returns the first response
+    without validating again (and without advancing the question twice).
+    """
     if not request.user_input:
         raise HTTPException(status_code=400, detail="Solution text is required")
 
-    tutor = session_service.get_session(request.session_id)
+    tutor = await session_service.load_session(request.session_id)
     if not tutor:
         raise HTTPException(status_code=404, detail="Session not found or expired")
 
-    try:
-        status = tutor.get_status()
-        if not status["success"]:
-            raise HTTPException(status_code=400, detail=status["error"])
-
-        if status["session_complete"]:
-            raise HTTPException(status_code=400, detail="Session already complete")
-
-        # Validate the solution using the API tutor
-        validation_result = tutor.validate_user_solution(request.user_input)
-
-        if not validation_result["success"]:
-            raise HTTPException(status_code=400, detail=validation_result["error"])
-
-        # Automatically move to next question if the solution is correct
-        moved_to_next = False
-        current_question_index = status["current_question_index"]
-        session_complete = status["session_complete"]
+    async def _validate() -> ValidationResponse:
+        try:
+            async with session_service.lock_session(request.session_id):
+                status = tutor.get_status()
+                if not status["success"]:
+                    raise HTTPException(status_code=400, detail=status["error"])
+
+                if status["session_complete"]:
+                    raise HTTPException(status_code=400, detail="Session already complete")
+
+                # Validate the solution using the API tutor
+                validation_result = await run_in_threadpool(tutor.validate_user_solution, request.user_input)
+
+                if not validation_result["success"]:
+                    raise HTTPException(status_code=400, detail=validation_result["error"])
+
+                # Automatically move to next question if the solution is correct
+                moved_to_next = False
+                current_question_index = status["current_question_index"]
+                session_complete = status["session_complete"]
+
+                if validation_result["is_correct"]:
+                    try:
+                        next_result = await run_in_threadpool(tutor.move_to_next_question)
+                        if next_result["success"]:
+                            moved_to_next = True
+                            current_question_index = next_result["current_question_index"]
+                            session_complete = next_result["session_complete"]
+                    except Exception:
+                        # If moving to next fails, continue anyway
+                        pass
+
+            return ValidationResponse(
+                success=True,
+                is_correct=validation_result["is_correct"],
+                feedback=validation_result["feedback"],
+                score=validation_result["score"],
+                moved_to_next=moved_to_next,
+                current_question_index=current_question_index,
+                session_complete=session_complete,
+                input_type=validation_result.get("input_type", "unknown"),
+                message_type=validation_result.get("message_type", "validation"),
+            )
 
-        if validation_result["is_correct"]:
-            try:
-                next_result = tutor.move_to_next_question()
-                if next_result["success"]:
-                    moved_to_next = True
-                    current_question_index = next_result["current_question_index"]
-                    session_complete = next_result["session_complete"]
-            except Exception:
-                # If moving to next fails, continue anyway
-                pass
+        except HTTPException:
+            raise
+        except SessionBusyError as e:
+            raise HTTPException(status_code=409, detail=e.message)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Failed to validate solution: {str(e)}"
+            )
 
-        return ValidationResponse(
-            success=True,
-            is_correct=validation_result["is_correct"],
-            feedback=validation_result["feedback"],
-            score=validation_result["score"],
-            moved_to_next=moved_to_next,
-            current_question_index=current_question_index,
-            session_complete=session_complete,
-            input_type=validation_result.get("input_type", "unknown"),
-            message_type=validation_result.get("message_type", "validation"),
+    try:
+        result, replayed = await idempotency_service.run(
+            f"validate:{request.session_id}",
+            idempotency_key,
+            idempotency_service.fingerprint(request.user_input),
+            _validate,
         )
+    except IdempotencyKeyError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to validate solution: {str(e)}"
-        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 
 @router.get("/solution", response_model=SolutionResponse)
@@ -121,38 +158,39 @@ async def get_solution(
     session_id: str, session_service=Depends(get_session_service)
 ) -> SolutionResponse:
     """Get the complete solution for the current question and automatically move to the next question."""
-    tutor = session_service.get_session(session_id)
+    tutor = await session_service.load_session(session_id)
     if not tutor:
         raise HTTPException(status_code=404, detail="Session not found or expired")
 
     try:
-        status = tutor.get_status()
-        if not status["success"]:
-            raise HTTPException(status_code=400, detail=status["error"])
+        async with session_service.lock_session(session_id):
+            status = tutor.get_status()
+            if not status["success"]:
+                raise HTTPException(status_code=400, detail=status["error"])
 
-        if status["session_complete"]:
-            raise HTTPException(status_code=400, detail="Session already complete")
+            if status["session_complete"]:
+                raise HTTPException(status_code=400, detail="Session already complete")
 
-        # Get the complete solution using the API tutor
-        solution_result = tutor.get_complete_solution()
+            # Get the complete solution using the API tutor
+            solution_result = await run_in_threadpool(tutor.get_complete_solution)
 
-        if not solution_result["success"]:
-            raise HTTPException(status_code=400, detail=solution_result["error"])
+            if not solution_result["success"]:
+                raise HTTPException(status_code=400, detail=solution_result["error"])
 
-        # Automatically move to next question (bypass validation)
-        moved_to_next = False
-        current_question_index = status["current_question_index"]
-        session_complete = status["session_complete"]
+            # Automatically move to next question (bypass validation)
+            moved_to_next = False
+            current_question_index = status["current_question_index"]
+            session_complete = status["session_complete"]
 
-        try:
-            next_result = tutor.move_to_next_question()
-            if next_result["success"]:
-                moved_to_next = True
-                current_question_index = next_result["current_question_index"]
-                session_complete = next_result["session_complete"]
-        except Exception:
-            # If moving to next fails, continue anyway
-            pass
+            try:
+                next_result = await run_in_threadpool(tutor.move_to_next_question)
+                if next_result["success"]:
+                    moved_to_next = True
+                    current_question_index = next_result["current_question_index"]
+                    session_complete = next_result["session_complete"]
+            except Exception:
+                # If moving to next fails, continue anyway
+                pass
 
         return SolutionResponse(
             success=True,
@@ -164,6 +202,8 @@ async def get_solution(
 
     except HTTPException:
         raise
+    except SessionBusyError as e:
+        raise HTTPException(status_code=409, detail=e.message)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to generate solution: {str(e)}"
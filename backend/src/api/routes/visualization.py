@@ -4,6 +4,7 @@ Visualization endpoints for geometric diagram generation.
 
 from fastapi import APIRouter, HTTPException, Depends
 
+from ..serialization import FastJSONResponse
 from ..models.responses import IllustrationResponse
 from ..dependencies import get_session_service, get_visualization_service
 
@@ -15,9 +16,9 @@ async def get_illustration(
     session_id: str,
     session_service=Depends(get_session_service),
     viz_service=Depends(get_visualization_service)
-) -> IllustrationResponse:
+):
     """Get a geometric illustration/visualization for the current problem."""
-    tutor = session_service.get_session(session_id)
+    tutor = await session_service.load_session(session_id)
     if not tutor:
         raise HTTPException(status_code=404, detail="Session not found or expired")
 
@@ -29,7 +30,8 @@ async def get_illustration(
 
         # Extract required data for visualization
         original_problem = status.get("original_problem", "")
-        illustration_steps = status.get("illustration_steps", [])
+        # The status holds a shared tuple; the prompt expects a list
+        illustration_steps = list(status.get("illustration_steps", []))
 
         # Generate visualization using service
         result = viz_service.generate_illustration(
@@ -38,11 +40,14 @@ async def get_illustration(
             illustration_steps=illustration_steps
         )
 
-        return IllustrationResponse(
-            success=result["success"],
-            message=result["message"],
-            b64_string_viz=result.get("b64_string_viz"),
-            error=result.get("error")
+        # The base64 image is large: serialize the model directly, once
+        return FastJSONResponse(
+            IllustrationResponse(
+                success=result["success"],
+                message=result["message"],
+                b64_string_viz=result.get("b64_string_viz"),
+                error=result.get("error")
+            )
         )
 
     except HTTPException:
@@ -0,0 +1,37 @@
+"""
+Fast JSON responses for the API.
+
+FastJSONResponse is the application's default response class: Pydantic models
+are serialized straight to JSON bytes by pydantic-core and everything else by
+orjson. Routes with large responses build their model once and return
+FastJSONResponse(model) themselves, which skips FastAPI's second validation
+against response_model and its jsonable_encoder pass (response_model is kept
+on those routes for the OpenAPI schema).
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def _default(value: Any) -> Any:
+    # Models nested in plain dicts or lists
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON response serializing models with pydantic-core and other content with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return to_json(content)
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
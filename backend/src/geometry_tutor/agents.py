@@ -2,20 +2,39 @@
 LangGraph node implementations (AI Agents) for the Geometry Tutor system.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from src.shared.config import get_settings
+from src.shared.logging import get_console_logger, get_logger
+from src.shared.tracing import record_cache, report_progress, trace_span, traced
 from .core import GraphState, format_facts_list
 from .llm_utils import (
     initialize_llm,
     create_parsing_chain,
     create_reasoning_chain,
     create_validation_chain,
+    create_combined_validation_chain,
+    create_hint_ladder_chain,
     create_input_classification_chain,
     create_question_extraction_chain,
 )
 from .prompts import prompt_templates, hint_builder
+from .input_classifier import classify_input_locally
+from .context_budget import compact_facts, normalize_fact
 
+logger = get_logger("agents")
+console = get_console_logger()
 
+# Conclusion recorded when the solver loop aborts on an error
+REASONING_FAILED_CONCLUSION = "Không thể tiếp tục lập luận"
+
+
+def prompt_facts(facts: List[str], current_question: str) -> List[str]:
+    """Deduplicate and trim a fact list to the prompt token budget for a question."""
+    return compact_facts(facts, current_question, get_settings().prompt_fact_token_budget)
+
+
+@traced()
 def parse_problem(state: GraphState) -> GraphState:
     """
     Node 1: parse_problem
@@ -70,12 +89,17 @@ def parse_problem(state: GraphState) -> GraphState:
     return state
 
 
-def reason_and_solve(state: GraphState) -> GraphState:
+@traced()
+def reason_and_solve(state: GraphState, max_iterations: Optional[int] = None) -> GraphState:
     """
     Node 2: reason_and_solve
     Agent: "Solver Agent"
     Develops a step-by-step solution for the current question using iterative reasoning.
     AI discoveries are kept separate from user's known facts until solution is validated.
+
+    Args:
+        state: Current graph state
+        max_iterations: Reasoning step limit; defaults to SOLVER_MAX_ITERATIONS
     """
     llm = initialize_llm()
     if not llm:
@@ -92,15 +116,20 @@ def reason_and_solve(state: GraphState) -> GraphState:
     ai_discoveries = []  # Fresh AI discoveries for this reasoning session
     reasoning_chain = []
 
-    max_iterations = 10  # Prevent infinite loops
+    # Prevent infinite loops
+    max_iterations = max_iterations or get_settings().solver_max_iterations
     iteration = 0
 
     while iteration < max_iterations:
+        report_progress("solving", iteration + 1, max_iterations)
         # Combine base facts with current AI discoveries for reasoning
         all_available_facts = base_facts + ai_discoveries
 
         solver_prompt = prompt_templates.get_solver_prompt_template(
-            current_question, all_available_facts, reasoning_chain, format_facts_list
+            current_question,
+            prompt_facts(all_available_facts, current_question),
+            reasoning_chain,
+            format_facts_list,
         )
 
         try:
@@ -109,7 +138,8 @@ def reason_and_solve(state: GraphState) -> GraphState:
             step_data = reasoning_chain_processor.invoke(
                 {"solver_prompt": solver_prompt}
             )
-            print(step_data)
+            # Full reasoning steps are verbose; only a sample is logged
+            logger.info("Reasoning step: %s", step_data, extra={"sampled": True})
 
             reasoning_chain.append(
                 {
@@ -120,8 +150,10 @@ def reason_and_solve(state: GraphState) -> GraphState:
 
             # Add new conclusion to AI discoveries (separate from user's known facts)
             conclusion = step_data.conclusion.strip()
-            print(f"New AI discovery: {conclusion}")
-            if conclusion and conclusion not in all_available_facts:
+            logger.debug("New AI discovery: %s", conclusion)
+            if conclusion and normalize_fact(conclusion) not in {
+                normalize_fact(fact) for fact in all_available_facts
+            }:
                 ai_discoveries.append(conclusion)
 
             # Check if goal is reached
@@ -132,7 +164,7 @@ def reason_and_solve(state: GraphState) -> GraphState:
             reasoning_chain.append(
                 {
                     "thought": f"Lỗi trong quá trình lập luận: {str(e)}",
-                    "conclusion": "Không thể tiếp tục lập luận",
+                    "conclusion": REASONING_FAILED_CONCLUSION,
                 }
             )
             break
@@ -144,20 +176,72 @@ def reason_and_solve(state: GraphState) -> GraphState:
     state["ai_discovered_facts"] = ai_discoveries
     # AI discoveries are NOT merged here - only when question is solved/validated
 
+    # Hints depend only on the question, known facts and reasoning chain, so
+    # they can be generated together right after solving
+    state["precomputed_hints"] = []
+    if get_settings().hint_ladder_mode == "eager":
+        state = precompute_hint_ladder(state)
+
     return state
 
 
-def generate_hint(state: GraphState) -> GraphState:
+def build_hint_ladder(
+    llm, current_question: str, known_facts: List[str], reasoning_chain: List[Dict[str, str]]
+) -> List[str]:
+    """Generate the three hint levels for a question in one structured LLM call."""
+    hint_ladder_prompt = prompt_templates.get_hint_ladder_prompt_template(
+        current_question,
+        prompt_facts(known_facts, current_question),
+        reasoning_chain,
+        format_facts_list,
+    )
+    hint_ladder_chain = create_hint_ladder_chain(llm)
+    ladder = hint_ladder_chain.invoke({"hint_ladder_prompt": hint_ladder_prompt})
+    return [ladder.conceptual.strip(), ladder.contextual.strip(), ladder.direct.strip()]
+
+
+@traced()
+def precompute_hint_ladder(state: GraphState) -> GraphState:
     """
-    Node 3: generate_hint
-    Agent: "Hinting Agent"
-    Provides scaffolded hints based on the AI's solution path.
+    Generate all hint levels for the current question and store them in state.
+    On failure the state is left without precomputed hints and generate_hint
+    falls back to a live LLM call per hint.
     """
+    if not state["reasoning_chain"] or state["current_question_index"] >= len(state["questions"]):
+        return state
+
     llm = initialize_llm()
     if not llm:
-        state["error_message"] = "Không thể khởi tạo mô hình AI."
         return state
 
+    try:
+        state["precomputed_hints"] = build_hint_ladder(
+            llm,
+            state["questions"][state["current_question_index"]],
+            state["known_facts"],
+            state["reasoning_chain"],
+        )
+    except Exception as e:
+        logger.warning("Failed to precompute hints: %s", e)
+
+    return state
+
+
+def _display_hint(hint_level: int, hint_text: str) -> None:
+    """Display a generated hint."""
+    separator = "=" * 60
+    console.info(f"\n{separator}\n💡 GỢI Ý LẦN {hint_level}\n{separator}\n{hint_text}\n{separator}\n")
+
+
+@traced()
+def generate_hint(state: GraphState) -> GraphState:
+    """
+    Node 3: generate_hint
+    Agent: "Hinting Agent"
+    Provides scaffolded hints based on the AI's solution path.
+    Serves hints from the precomputed hint ladder when available, so only a
+    missing ladder costs an LLM call.
+    """
     reasoning_chain = state["reasoning_chain"]
     hint_level = state["hint_level"]
     current_question = state["questions"][state["current_question_index"]]
@@ -168,6 +252,20 @@ def generate_hint(state: GraphState) -> GraphState:
         )
         return state
 
+    precomputed_hints = state.get("precomputed_hints") or []
+    record_cache("hint_ladder", len(precomputed_hints) > hint_level)
+    if len(precomputed_hints) > hint_level:
+        state["hint_level"] = hint_level + 1
+        hint_text = precomputed_hints[hint_level]
+        state["generated_hints"].append(hint_text)
+        _display_hint(state["hint_level"], hint_text)
+        return state
+
+    llm = initialize_llm()
+    if not llm:
+        state["error_message"] = "Không thể khởi tạo mô hình AI."
+        return state
+
     # Increment hint level
     state["hint_level"] = hint_level + 1
     new_hint_level = state["hint_level"]
@@ -176,7 +274,7 @@ def generate_hint(state: GraphState) -> GraphState:
     hint_prompt = hint_builder.build_hint_prompt(
         new_hint_level,
         current_question,
-        state["known_facts"],
+        prompt_facts(state["known_facts"], current_question),
         reasoning_chain,
         format_facts_list,
     )
@@ -194,132 +292,208 @@ def generate_hint(state: GraphState) -> GraphState:
         state["generated_hints"].append(hint_text)
 
         # Display the generated hint immediately
-        print("\n" + "=" * 60)
-        print(f"💡 GỢI Ý LẦN {new_hint_level}")
-        print("=" * 60)
-        print(hint_text)
-        print("=" * 60 + "\n")
+        _display_hint(new_hint_level, hint_text)
 
     except Exception as e:
         error_message = f"Lỗi khi tạo gợi ý: {str(e)}"
         state["generated_hints"].append(error_message)
-        print(f"❌ {error_message}")
+        logger.error(error_message)
 
     return state
 
 
-def validate_solution(state: GraphState) -> GraphState:
-    """
-    Node 4: validate_solution (Enhanced)
-    Agent: "Validation Agent"
-    Handles different types of user input: questions, solutions, statements, etc.
-    """
-    llm = initialize_llm()
-    if not llm:
-        state["error_message"] = "Không thể khởi tạo mô hình AI."
-        return state
+SOLUTION_INPUT_TYPES = ["complete_solution", "partial_solution", "statement"]
+
+
+def _apply_question_answer(state: GraphState, answer: str) -> GraphState:
+    """Store the answer to a student question (questions are never validated)."""
+    state["is_validated"] = False  # Questions don't mark as validated
+    state["validation_score"] = 0  # Questions don't have a validation score
+    state["final_answer"] = (
+        f"**Câu trả lời cho câu hỏi của bạn:**\n\n{answer}\n\n💡 Hãy thử áp dụng thông tin này để tiếp tục giải bài toán!"
+    )
+    return state
+
+
+def _apply_validation(
+    state: GraphState,
+    is_correct: bool,
+    feedback: str,
+    score: int,
+    additional_steps: List[str],
+) -> GraphState:
+    """Store a validation verdict and merge AI discoveries when accepted."""
+    state["is_validated"] = is_correct
+
+    # Store the score in state for API access
+    state["validation_score"] = score
 
+    state["final_answer"] = (
+        f"**Kết quả đánh giá:**\n{feedback}\n\n**Mức độ hoàn thiện: {score}%**"
+    )
+
+    if state["is_validated"]:
+        state["final_answer"] += "\n\n✅ Lời giải của bạn đã được chấp nhận!"
+
+        # MERGE AI discoveries into known facts when solution is validated
+        state = merge_ai_discoveries(state)
+
+        # Add additional illustration steps when solution is validated
+        if additional_steps:
+            state["illustration_steps"].extend(additional_steps)
+
+    return state
+
+
+def _apply_unclear(state: GraphState) -> GraphState:
+    """Store the guidance message for unclear input."""
+    state["is_validated"] = False
+    state["validation_score"] = 0  # Unclear inputs don't have a validation score
+    state["final_answer"] = (
+        "**Thông tin chưa rõ ràng**\n\n"
+        "Bạn có thể:\n"
+        "- Đặt câu hỏi cụ thể về khái niệm hoặc phương pháp\n"
+        "- Chia sẻ ý tưởng hoặc bước giải đã nghĩ ra\n"
+        "- Trình bày lời giải hoàn chỉnh để được đánh giá\n\n"
+        "💡 Hãy thử diễn đạt lại một cách rõ ràng hơn!"
+    )
+    return state
+
+
+def _validate_combined(state: GraphState, llm) -> GraphState:
+    """Classify and evaluate the user input with a single structured LLM call."""
     user_input = state["user_solution_attempt"]
-    if not user_input.strip():
-        state["error_message"] = "Nội dung đầu vào không được để trống."
-        return state
+    current_question = state["questions"][state["current_question_index"]]
+
+    combined_prompt = prompt_templates.get_combined_validation_prompt_template(
+        current_question,
+        user_input,
+        prompt_facts(state["known_facts"], current_question),
+        state["reasoning_chain"],
+        format_facts_list,
+    )
+    combined_chain = create_combined_validation_chain(llm)
+    result = combined_chain.invoke({"combined_prompt": combined_prompt})
+
+    # Store the input type in state for API access
+    state["user_input_type"] = result.input_type
+
+    if result.input_type == "question":
+        return _apply_question_answer(state, result.question_answer or result.feedback)
+    if result.input_type in SOLUTION_INPUT_TYPES:
+        return _apply_validation(
+            state,
+            result.is_correct,
+            result.feedback,
+            result.score,
+            result.additional_illustration_steps,
+        )
+    return _apply_unclear(state)
+
 
+def _validate_two_call(state: GraphState, llm, classification_result) -> GraphState:
+    """Classify the user input (unless already classified), then answer or validate it."""
+    user_input = state["user_solution_attempt"]
     reasoning_chain = state["reasoning_chain"]
     current_question = state["questions"][state["current_question_index"]]
-    known_facts = state["known_facts"]
+    known_facts = prompt_facts(state["known_facts"], current_question)
 
-    try:
-        # Step 1: Classify the type of user input
+    # Step 1: Classify the type of user input
+    if classification_result is None:
         classification_prompt = prompt_templates.get_input_classification_prompt(
             current_question, user_input, known_facts, format_facts_list
         )
 
-        classification_chain = create_input_classification_chain(llm)
-        classification_result = classification_chain.invoke(
-            {"classification_prompt": classification_prompt}
-        )
+        with trace_span("classify_input"):
+            classification_chain = create_input_classification_chain(llm)
+            classification_result = classification_chain.invoke(
+                {"classification_prompt": classification_prompt}
+            )
 
-        input_type = classification_result.input_type
+    input_type = classification_result.input_type
 
-        # Store the input type in state for API access
-        state["user_input_type"] = input_type
+    # Store the input type in state for API access
+    state["user_input_type"] = input_type
 
-        # Step 2: Handle based on input type
-        if input_type == "question":
-            # Handle student questions
-            response_text = prompt_templates.get_question_answering_prompt(
-                current_question,
-                user_input,
-                known_facts,
-                reasoning_chain,
-                format_facts_list,
-            )
-
-            # Generate direct response for questions (not using validation chain)
-            response = llm.invoke(response_text)
+    # Step 2: Handle based on input type
+    if input_type == "question":
+        # Handle student questions
+        response_text = prompt_templates.get_question_answering_prompt(
+            current_question,
+            user_input,
+            known_facts,
+            reasoning_chain,
+            format_facts_list,
+        )
 
-            state["is_validated"] = False  # Questions don't mark as validated
-            state["validation_score"] = 0  # Questions don't have a validation score
-            state["final_answer"] = (
-                f"**Câu trả lời cho câu hỏi của bạn:**\n\n{response.content}\n\n💡 Hãy thử áp dụng thông tin này để tiếp tục giải bài toán!"
-            )
+        # Generate direct response for questions (not using validation chain)
+        response = llm.invoke(response_text)
+        return _apply_question_answer(state, response.content)
 
-        elif input_type in ["complete_solution", "partial_solution", "statement"]:
-            # Handle solutions and statements using enhanced validation
-            validation_prompt = prompt_templates.get_validation_prompt_template(
-                reasoning_chain, current_question, user_input
-            )
+    if input_type in SOLUTION_INPUT_TYPES:
+        # Handle solutions and statements using enhanced validation
+        validation_prompt = prompt_templates.get_validation_prompt_template(
+            reasoning_chain, current_question, user_input
+        )
 
-            validation_chain = create_validation_chain(llm)
-            validation_data = validation_chain.invoke(
-                {"validation_prompt": validation_prompt}
-            )
+        validation_chain = create_validation_chain(llm)
+        validation_data = validation_chain.invoke(
+            {"validation_prompt": validation_prompt}
+        )
+        return _apply_validation(
+            state,
+            validation_data.is_correct,
+            validation_data.feedback,
+            validation_data.score,
+            validation_data.additional_illustration_steps,
+        )
 
-            state["is_validated"] = validation_data.is_correct
+    # unclear or other types
+    return _apply_unclear(state)
 
-            feedback = validation_data.feedback
-            score = validation_data.score
 
-            # Store the score in state for API access
-            state["validation_score"] = score
+@traced()
+def validate_solution(state: GraphState, mode: Optional[str] = None) -> GraphState:
+    """
+    Node 4: validate_solution (Enhanced)
+    Agent: "Validation Agent"
+    Handles different types of user input: questions, solutions, statements, etc.
 
-            state["final_answer"] = (
-                f"**Kết quả đánh giá:**\n{feedback}\n\n**Mức độ hoàn thiện: {score}%**"
-            )
+    Obvious inputs are classified locally. Otherwise, in "two_call" mode the input
+    is classified by the LLM and then answered or validated by a second call; in
+    "combined" mode both happen in one structured call. The mode defaults to the
+    VALIDATION_MODE setting.
+    """
+    llm = initialize_llm()
+    if not llm:
+        state["error_message"] = "Không thể khởi tạo mô hình AI."
+        return state
 
-            if state["is_validated"]:
-                state["final_answer"] += "\n\n✅ Lời giải của bạn đã được chấp nhận!"
+    user_input = state["user_solution_attempt"]
+    if not user_input.strip():
+        state["error_message"] = "Nội dung đầu vào không được để trống."
+        return state
 
-                # MERGE AI discoveries into known facts when solution is validated
-                state = merge_ai_discoveries(state)
+    try:
+        mode = mode or get_settings().validation_mode
 
-                # Add additional illustration steps when solution is validated
-                additional_steps = validation_data.additional_illustration_steps
-                if additional_steps:
-                    state["illustration_steps"].extend(additional_steps)
+        # Classify locally when the rules are confident
+        classification_result = classify_input_locally(user_input)
 
-        else:  # unclear or other types
-            state["is_validated"] = False
-            state["validation_score"] = (
-                0  # Unclear inputs don't have a validation score
-            )
-            state["final_answer"] = (
-                "**Thông tin chưa rõ ràng**\n\n"
-                "Bạn có thể:\n"
-                "- Đặt câu hỏi cụ thể về khái niệm hoặc phương pháp\n"
-                "- Chia sẻ ý tưởng hoặc bước giải đã nghĩ ra\n"
-                "- Trình bày lời giải hoàn chỉnh để được đánh giá\n\n"
-                "💡 Hãy thử diễn đạt lại một cách rõ ràng hơn!"
-            )
+        if classification_result is None and mode == "combined":
+            state = _validate_combined(state, llm)
+        else:
+            state = _validate_two_call(state, llm, classification_result)
 
     except Exception as e:
         error_message = f"Lỗi trong quá trình xử lý: {str(e)}"
         state["error_message"] = error_message
-        print(f"❌ {error_message}")
+        logger.error(error_message)
 
     return state
 
 
+@traced()
 def generate_solution(state: GraphState) -> GraphState:
     """
     Node 5: generate_solution
@@ -350,22 +524,22 @@ def generate_solution(state: GraphState) -> GraphState:
             state["final_answer"] = str(response)
 
         # Display the generated solution immediately
-        print("\n" + "=" * 60)
-        print("📖 LỜI GIẢI HOÀN CHỈNH")
-        print("=" * 60)
-        print(state["final_answer"])
-        print("=" * 60 + "\n")
+        separator = "=" * 60
+        console.info(
+            f"\n{separator}\n📖 LỜI GIẢI HOÀN CHỈNH\n{separator}\n{state['final_answer']}\n{separator}\n"
+        )
 
         # MERGE AI discoveries into known facts when complete solution is provided
         state = merge_ai_discoveries(state)
 
     except Exception as e:
         state["final_answer"] = f"Lỗi khi tạo lời giải: {str(e)}"
-        print(f"❌ {state['final_answer']}")
+        logger.error(state["final_answer"])
 
     return state
 
 
+@traced()
 def move_to_next_question(state: GraphState) -> GraphState:
     """
     Node 6: move_to_next_question
@@ -383,6 +557,7 @@ def move_to_next_question(state: GraphState) -> GraphState:
     state["final_answer"] = ""
     state["reasoning_chain"] = []
     state["ai_discovered_facts"] = []  # Reset AI discoveries for new question
+    state["precomputed_hints"] = []
 
     # Extract new facts and illustration steps mentioned in the new question
     # This is separate from AI discoveries and should be done for each new question
@@ -402,11 +577,10 @@ def move_to_next_question(state: GraphState) -> GraphState:
         state["final_answer"] = completion_message
 
         # Display completion message immediately
-        print("\n" + "=" * 60)
-        print("🎉 HOÀN THÀNH BÀI TOÁN")
-        print("=" * 60)
-        print(completion_message)
-        print("=" * 60 + "\n")
+        separator = "=" * 60
+        console.info(
+            f"\n{separator}\n🎉 HOÀN THÀNH BÀI TOÁN\n{separator}\n{completion_message}\n{separator}\n"
+        )
 
     return state
 
@@ -423,44 +597,47 @@ def await_user_action(state: GraphState) -> GraphState:
         questions = state.get("questions", [])
 
         if current_question_index >= len(questions):
-            print("🎉 Đã hoàn thành tất cả câu hỏi!")
+            console.info("🎉 Đã hoàn thành tất cả câu hỏi!")
             return
 
         current_question = questions[current_question_index]
         hint_level = state.get("hint_level", 0)
         generated_hints = state.get("generated_hints", [])
 
-        print("=" * 60)
-        print(f"📋 CÂU HỎI {current_question_index + 1}/{len(questions)}")
-        print("=" * 60)
-        print(f"❓ {current_question}")
-        print()
+        lines = [
+            "=" * 60,
+            f"📋 CÂU HỎI {current_question_index + 1}/{len(questions)}",
+            "=" * 60,
+            f"❓ {current_question}",
+            "",
+        ]
 
         # Show current status - only user's known facts
         if state.get("known_facts"):
-            print("📝 Các sự kiện đã biết:")
+            lines.append("📝 Các sự kiện đã biết:")
             for i, fact in enumerate(state["known_facts"], 1):
-                print(f"  {i}. {fact}")
-            print()
+                lines.append(f"  {i}. {fact}")
+            lines.append("")
 
         # Show hints if any have been generated
         if generated_hints:
-            print("💡 Gợi ý đã nhận:")
+            lines.append("💡 Gợi ý đã nhận:")
             for i, hint in enumerate(generated_hints, 1):
-                print(f"\n📌 Gợi ý {i}:")
-                print(f"  {hint}")
-            print()
+                lines.append(f"\n📌 Gợi ý {i}:")
+                lines.append(f"  {hint}")
+            lines.append("")
 
         # Show available actions
-        print("🎯 Các hành động có thể thực hiện:")
-        print("  1. 💡 Xin gợi ý (hint)")
-        print("  2. 📝 Nộp lời giải (submit)")
-        print("  3. 📖 Xem đáp án (solution)")
+        lines.append("🎯 Các hành động có thể thực hiện:")
+        lines.append("  1. 💡 Xin gợi ý (hint)")
+        lines.append("  2. 📝 Nộp lời giải (submit)")
+        lines.append("  3. 📖 Xem đáp án (solution)")
         if state.get("is_validated"):
-            print("  4. ➡️  Câu hỏi tiếp theo (next)")
-        print("  5. 📊 Xem trạng thái (status)")
-        print("  6. 🚪 Thoát (exit)")
-        print()
+            lines.append("  4. ➡️  Câu hỏi tiếp theo (next)")
+        lines.append("  5. 📊 Xem trạng thái (status)")
+        lines.append("  6. 🚪 Thoát (exit)")
+        lines.append("")
+        console.info("\n".join(lines))
 
     def get_user_input_in_node() -> str:
         """Get user input for the current action within the graph node."""
@@ -468,10 +645,10 @@ def await_user_action(state: GraphState) -> GraphState:
             user_choice = input("👤 Chọn hành động (1-6): ").strip()
             return user_choice
         except KeyboardInterrupt:
-            print("\n👋 Thoát chương trình...")
+            console.info("\n👋 Thoát chương trình...")
             return "6"  # Exit
         except Exception as e:
-            print(f"❌ Lỗi: {e}")
+            console.error(f"❌ Lỗi: {e}")
             return ""
 
     current_question_index = state.get("current_question_index", 0)
@@ -501,9 +678,13 @@ def merge_ai_discoveries(state: GraphState) -> GraphState:
     ai_discoveries = state.get("ai_discovered_facts", [])
     current_known = state["known_facts"]
 
-    # Add AI discoveries to known facts (avoid duplicates)
+    # Add AI discoveries to known facts (avoid duplicates, including ones that
+    # differ only in formatting)
+    known_keys = {normalize_fact(fact) for fact in current_known}
     for discovery in ai_discoveries:
-        if discovery and discovery not in current_known:
+        key = normalize_fact(discovery) if discovery else ""
+        if key and key not in known_keys:
+            known_keys.add(key)
             current_known.append(discovery)
 
     state["known_facts"] = current_known
@@ -513,6 +694,7 @@ def merge_ai_discoveries(state: GraphState) -> GraphState:
     return state
 
 
+@traced()
 def extract_question_facts_and_steps(state: GraphState) -> GraphState:
     """
     Extract new facts and illustration steps mentioned in the current question.
@@ -531,7 +713,7 @@ def extract_question_facts_and_steps(state: GraphState) -> GraphState:
 
     # Format current known facts and illustration steps for context
     known_facts_text = (
-        format_facts_list(state["known_facts"])
+        format_facts_list(prompt_facts(state["known_facts"], current_question))
         if state["known_facts"]
         else "Chưa có sự kiện nào"
     )
@@ -554,8 +736,11 @@ def extract_question_facts_and_steps(state: GraphState) -> GraphState:
 
         # Add new facts to known_facts (avoid duplicates)
         current_known = state["known_facts"]
+        known_keys = {normalize_fact(fact) for fact in current_known}
         for fact in extraction_data.new_facts:
-            if fact and fact.strip() and fact not in current_known:
+            key = normalize_fact(fact) if fact else ""
+            if key and key not in known_keys:
+                known_keys.add(key)
                 current_known.append(fact)
 
         # Add new illustration steps (avoid duplicates)
@@ -566,7 +751,7 @@ def extract_question_facts_and_steps(state: GraphState) -> GraphState:
 
     except Exception as e:
         # If extraction fails, log error but continue
-        print(f"⚠️ Warning: Failed to extract facts from question: {str(e)}")
+        logger.warning("Failed to extract facts from question: %s", e)
         pass
 
     return state
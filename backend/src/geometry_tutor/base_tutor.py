@@ -7,10 +7,14 @@ from typing import Dict, Any, Optional
 from abc import ABC
 from langchain_core.runnables import RunnableConfig
 
+from src.shared.logging import get_logger
+
 from .core import GraphState, create_initial_state
-from .graph import create_geometry_tutor_graph
+from .graph import get_geometry_tutor_graph
 from .llm_utils import setup_environment
 
+logger = get_logger("tutor")
+
 
 class BaseGeometryTutor(ABC):
     """
@@ -18,6 +22,8 @@ class BaseGeometryTutor(ABC):
     Contains common initialization and core functionality.
     """
 
+    __slots__ = ("graph", "current_state", "thread_id")
+
     def __init__(self, strict_environment: bool = False):
         """
         Initialize the base geometry tutor.
@@ -33,9 +39,9 @@ class BaseGeometryTutor(ABC):
                     "Environment setup incomplete. Please check your API key configuration."
                 )
             else:
-                print("⚠️  Warning: Environment setup incomplete. Some features may not work.")
+                logger.warning("Environment setup incomplete. Some features may not work.")
         
-        self.graph = create_geometry_tutor_graph()
+        self.graph = get_geometry_tutor_graph()
         self.current_state: Optional[GraphState] = None
         self.thread_id: Optional[str] = None
 
@@ -0,0 +1,181 @@
+"""
+Offline batch pre-solving of problem sets.
+
+Reads problems from a JSONL file or a directory of text files and runs the
+parse, fact extraction, solve and hint ladder steps for every question on a
+thread pool, writing the results into the shared problem index (SQLite) so
+that live sessions on the same problems start from a warm cache. Finished
+problems are appended to a checkpoint file and skipped when the batch is run
+again; failed problems are retried with exponential backoff.
+"""
+
+import json
+import time
+import random
+import hashlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.shared.config import get_settings
+from src.shared.logging import get_logger
+from .core import create_initial_state
+from .agents import (
+    REASONING_FAILED_CONCLUSION,
+    extract_question_facts_and_steps,
+    move_to_next_question,
+    parse_problem,
+    precompute_hint_ladder,
+    reason_and_solve,
+)
+from .problem_index import ProblemIndex
+
+logger = get_logger("batch")
+
+# Keys accepted for the problem text in JSONL records
+_TEXT_KEYS = ("problem_text", "problem", "text")
+
+
+def _problem_id(problem_text: str) -> str:
+    return hashlib.sha1(problem_text.strip().encode("utf-8")).hexdigest()[:12]
+
+
+def load_problems(source: str) -> List[Tuple[str, str]]:
+    """
+    Load (problem_id, problem_text) pairs.
+
+    A directory yields one problem per *.txt file (ID = relative path). A JSONL
+    file holds one problem per line, either a JSON string or an object with
+    "problem_text" (or "problem"/"text") and an optional "id". Problems without
+    an ID are identified by a hash of their text.
+    """
+    path = Path(source)
+    problems = []
+    if path.is_dir():
+        for file in sorted(path.rglob("*.txt")):
+            text = file.read_text(encoding="utf-8").strip()
+            if text:
+                problems.append((str(file.relative_to(path)), text))
+        return problems
+
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"problem_text": record}
+            text = next((record[key] for key in _TEXT_KEYS if record.get(key)), None)
+            if not text:
+                raise ValueError(f"{source}:{line_number}: no problem text")
+            problems.append((str(record.get("id") or _problem_id(text)), text.strip()))
+    return problems
+
+
+def load_checkpoint(path: Optional[str]) -> Set[str]:
+    """IDs of problems a previous run finished successfully."""
+    if not path or not Path(path).exists():
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("success"):
+                    done.add(record["id"])
+    return done
+
+
+def presolve_problem(problem_text: str, index: ProblemIndex) -> Dict[str, Any]:
+    """
+    Parse and solve every question of a problem, recording the results in the
+    index. Questions of an exactly matching problem already solved in the index
+    are reused, not re-solved.
+    """
+    hint_ladder = get_settings().hint_ladder_mode != "off"
+    state = create_initial_state(problem_text)
+
+    match = index.lookup(problem_text)
+    if match and match.similarity < 1.0:
+        # A near-duplicate gets its own entry, so it must hold this problem's own parse
+        match = None
+    if match:
+        state = match.apply_parsed(state)
+    else:
+        state = parse_problem(state)
+        if state.get("error_message"):
+            return {"success": False, "error": state["error_message"]}
+        if state["questions"]:
+            state = extract_question_facts_and_steps(state)
+        index.record_parse(problem_text, state)
+
+    solved = reused = 0
+    while state["current_question_index"] < len(state["questions"]):
+        question_index = state["current_question_index"]
+        if match and match.apply_solution(state, question_index):
+            reused += 1
+        else:
+            state = reason_and_solve(state)
+            if state.get("error_message"):
+                return {"success": False, "error": state["error_message"]}
+            chain = state["reasoning_chain"]
+            if not chain or chain[-1].get("conclusion") == REASONING_FAILED_CONCLUSION:
+                return {"success": False, "error": f"Solver failed on question {question_index + 1}"}
+            if hint_ladder and not state.get("precomputed_hints"):
+                state = precompute_hint_ladder(state)
+            index.record_solution(problem_text, question_index, state)
+            solved += 1
+        state = move_to_next_question(state)
+
+    return {
+        "success": True,
+        "questions": len(state["questions"]),
+        "solved": solved,
+        "reused": reused,
+    }
+
+
+def _with_retries(problem_text: str, index: ProblemIndex, retries: int, backoff: float) -> Dict[str, Any]:
+    """Run presolve_problem, retrying failures (e.g. rate limiting) with jittered exponential backoff."""
+    result: Dict[str, Any] = {}
+    for attempt in range(retries + 1):
+        try:
+            result = presolve_problem(problem_text, index)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        if result["success"] or attempt == retries:
+            break
+        delay = backoff * (2 ** attempt) * (0.5 + random.random())
+        logger.warning("Retrying problem in %.1fs after error: %s", delay, result["error"])
+        time.sleep(delay)
+    result["attempts"] = attempt + 1
+    return result
+
+
+def run_batch(
+    problems: List[Tuple[str, str]],
+    index: ProblemIndex,
+    workers: int = 4,
+    checkpoint: Optional[str] = None,
+    retries: int = 3,
+    backoff: float = 2.0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pre-solve problems on a thread pool, skipping those already in the
+    checkpoint. Yields one result per problem as it finishes.
+    """
+    done = load_checkpoint(checkpoint)
+    pending = [(problem_id, text) for problem_id, text in problems if problem_id not in done]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        futures = {
+            executor.submit(_with_retries, text, index, retries, backoff): problem_id
+            for problem_id, text in pending
+        }
+        # Results are checkpointed from this thread only, as they complete
+        for future in as_completed(futures):
+            result = {"id": futures[future], **future.result(), "finished_at": time.time()}
+            if checkpoint:
+                with open(checkpoint, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            yield result
@@ -2,7 +2,9 @@
 Command-line interface for the AI Geometry Tutor.
 """
 
+import os
 import sys
+import time
 import argparse
 from .tutor import GeometryTutor
 from .llm_utils import setup_environment
@@ -19,6 +21,14 @@ def main():
     parser.add_argument(
         "--interactive", action="store_true", help="Start interactive mode"
     )
+    parser.add_argument(
+        "--batch", type=str, help="Pre-solve problems from a JSONL file or a directory of .txt files"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Batch: problems solved in parallel")
+    parser.add_argument("--checkpoint", type=str, help="Batch: file recording finished problems (resume)")
+    parser.add_argument("--index-path", type=str, help="Batch: problem index SQLite file (PROBLEM_INDEX_PATH)")
+    parser.add_argument("--max-rpm", type=int, help="Batch: LLM requests per minute cap (LLM_MAX_RPM)")
+    parser.add_argument("--retries", type=int, default=3, help="Batch: retries per failed problem")
     parser.add_argument("--version", action="version", version="%(prog)s 0.1.0")
 
     args = parser.parse_args()
@@ -28,6 +38,10 @@ def main():
         print("❌ Environment setup failed. Please check your API key configuration.")
         sys.exit(1)
 
+    if args.batch:
+        batch_mode(args)
+        return
+
     # Create tutor instance
     tutor = GeometryTutor()
 
@@ -63,6 +77,53 @@ def main():
             sys.exit(1)
 
 
+def batch_mode(args: argparse.Namespace):
+    """Pre-solve a problem set into the shared problem index."""
+    # Command-line options override the environment before settings are read
+    if args.index_path:
+        os.environ["PROBLEM_INDEX_PATH"] = args.index_path
+    if args.max_rpm is not None:
+        os.environ["LLM_MAX_RPM"] = str(args.max_rpm)
+
+    from src.shared.config import get_settings
+    from src.shared.logging import setup_logging
+    from .batch import load_checkpoint, load_problems, run_batch
+    from .problem_index import get_problem_index
+
+    get_settings.cache_clear()
+    setup_logging()
+    settings = get_settings()
+    index = get_problem_index()
+    if index is None or not settings.problem_index_path:
+        print("❌ Batch mode writes to the shared problem index: set PROBLEM_INDEX_PATH or --index-path")
+        sys.exit(1)
+
+    problems = load_problems(args.batch)
+    done = load_checkpoint(args.checkpoint)
+    pending = sum(1 for problem_id, _ in problems if problem_id not in done)
+    print(f"📚 {len(problems)} bài toán, {len(problems) - pending} đã xong, {pending} cần giải")
+    print(f"⚙️ {args.workers} luồng, giới hạn {settings.llm_max_rpm or '∞'} yêu cầu/phút -> {settings.problem_index_path}")
+
+    start = time.perf_counter()
+    succeeded = failed = 0
+    for finished, result in enumerate(
+        run_batch(problems, index, args.workers, args.checkpoint, args.retries), 1
+    ):
+        if result["success"]:
+            succeeded += 1
+            print(
+                f"✅ [{finished}/{pending}] {result['id']}: {result['questions']} câu "
+                f"(giải {result['solved']}, dùng lại {result['reused']})"
+            )
+        else:
+            failed += 1
+            print(f"❌ [{finished}/{pending}] {result['id']}: {result['error']} (sau {result['attempts']} lần)")
+
+    print(f"⏱️ Hoàn tất trong {time.perf_counter() - start:.1f}s: {succeeded} thành công, {failed} lỗi")
+    if failed:
+        sys.exit(1)
+
+
 def interactive_mode(tutor: GeometryTutor):
     """Interactive CLI mode."""
     print("🎓 Chế độ tương tác AI Geometry Tutor")
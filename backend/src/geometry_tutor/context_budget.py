@@ -0,0 +1,116 @@
+"""
+Token-budgeted fact context for LLM prompts.
+
+known_facts only grows across questions, and every solver, hint and validation
+prompt embeds it. These helpers remove formatting-only duplicates, estimate the
+prompt cost with a local token heuristic and, when the list exceeds the budget,
+keep the facts most relevant to the current question.
+"""
+
+import re
+import unicodedata
+from typing import List, Optional, Set, Tuple
+
+from .problem_index import extract_labels
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_OPERATOR_SPACING = re.compile(r"\s*([=<>+\-*/^(),;:⊥∥//])\s*")
+_KEYWORD = re.compile(r"[^\W\d_]{3,}")
+
+# Words that carry no relevance signal in Vietnamese geometry statements
+_STOPWORDS = {
+    "của", "các", "cho", "với", "trên", "tại", "và", "là", "có", "được", "một",
+    "hai", "này", "đó", "thì", "nên", "vì", "khi", "hãy", "chứng", "minh", "tính",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the LLM token count of text without a tokenizer.
+    Counts one token per punctuation mark and per word, plus one per six
+    characters of long words (Vietnamese syllables are mostly short).
+    """
+    return sum(1 + len(token) // 6 for token in _TOKEN.findall(text))
+
+
+def normalize_fact(fact: str) -> str:
+    """Normalize a fact so that variants differing only in formatting compare equal."""
+    text = unicodedata.normalize("NFC", fact).strip().lower()
+    text = _OPERATOR_SPACING.sub(r"\1", text)
+    text = _WHITESPACE.sub(" ", text)
+    return text.rstrip(" .;,")
+
+
+def dedupe_facts(facts: List[str]) -> List[str]:
+    """Drop empty facts and duplicates that differ only in formatting, keeping the first."""
+    seen: Set[str] = set()
+    unique = []
+    for fact in facts:
+        key = normalize_fact(fact)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(fact)
+    return unique
+
+
+def _relevance(fact: str, question_labels: Set[str], question_letters: Set[str], question_words: Set[str]) -> float:
+    """Score a fact by the labels and keywords it shares with the question."""
+    labels = set(extract_labels(fact))
+    letters = {letter for label in labels for letter in label if letter.isalpha()}
+    words = set(_KEYWORD.findall(fact.lower())) - _STOPWORDS
+
+    score = 3.0 * len(labels & question_labels)
+    if letters:
+        score += 2.0 * len(letters & question_letters) / len(letters)
+    score += 0.5 * len(words & question_words)
+    return score
+
+
+def rank_facts(facts: List[str], question: str) -> List[Tuple[float, int]]:
+    """Rank facts by relevance to the question. Returns (score, index) best first."""
+    question_labels = set(extract_labels(question))
+    question_letters = {letter for label in question_labels for letter in label if letter.isalpha()}
+    question_words = set(_KEYWORD.findall(question.lower())) - _STOPWORDS
+
+    scored = [
+        (_relevance(fact, question_labels, question_letters, question_words), index)
+        for index, fact in enumerate(facts)
+    ]
+    # Best score first; on ties prefer later facts, which were derived closer to
+    # the current question
+    return sorted(scored, key=lambda item: (-item[0], -item[1]))
+
+
+def compact_facts(facts: List[str], question: str, token_budget: Optional[int]) -> List[str]:
+    """
+    Build the fact list for a prompt within a token budget.
+
+    Formatting-only duplicates are always removed. If the remaining facts exceed
+    the budget, the most relevant ones are kept (in their original order) and a
+    final line notes how many were omitted. A budget of 0 or None disables
+    trimming.
+    """
+    unique = dedupe_facts(facts)
+    if not token_budget:
+        return unique
+
+    costs = [estimate_tokens(fact) + 2 for fact in unique]  # "- " prefix and newline
+    if sum(costs) <= token_budget:
+        return unique
+
+    summary_reserve = 20
+    kept: Set[int] = set()
+    used = 0
+    for _, index in rank_facts(unique, question):
+        if used + costs[index] <= token_budget - summary_reserve:
+            kept.add(index)
+            used += costs[index]
+
+    compacted = [fact for index, fact in enumerate(unique) if index in kept]
+    omitted = len(unique) - len(compacted)
+    if omitted:
+        compacted.append(
+            f"(Đã lược bớt {omitted} sự kiện ít liên quan đến câu hỏi hiện tại)"
+        )
+    return compacted
@@ -2,6 +2,7 @@
 Core data structures and state management for the AI Geometry Tutor system.
 """
 
+import sys
 from typing import List, Dict, Any
 from typing_extensions import TypedDict
 
@@ -36,6 +37,7 @@ class GraphState(TypedDict):
     user_input_type: str  # Type of last user input: question, complete_solution, partial_solution, statement, unclear
     hint_level: int  # Counter for hints requested (0-3)
     generated_hints: List[str]  # The text of hints already provided to the user
+    precomputed_hints: List[str]  # Hint ladder (levels 1-3) generated after solving, empty if not ready
     is_validated: bool  # Flag indicating if the user's solution was marked correct
     validation_score: int  # Score from validation (0-100)
 
@@ -68,6 +70,7 @@ def create_initial_state(problem: str) -> GraphState:
         user_input_type="",
         hint_level=0,
         generated_hints=[],
+        precomputed_hints=[],
         is_validated=False,
         validation_score=0,
         final_answer="",
@@ -78,6 +81,52 @@ def create_initial_state(problem: str) -> GraphState:
     )
 
 
+# Fields derived from the problem itself, identical across sessions on the same problem
+SHARED_STATE_FIELDS = (
+    "original_problem",
+    "parsed_elements",
+    "questions",
+    "known_facts",
+    "ai_discovered_facts",
+    "reasoning_chain",
+    "precomputed_hints",
+    "illustration_steps",
+)
+
+
+def _intern_in_place(value: Any) -> None:
+    # Containers keep their identity (the hint ladder compares reasoning_chain by
+    # identity) and their size (other threads may be iterating them)
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, str):
+                value[i] = sys.intern(item)
+            else:
+                _intern_in_place(item)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, str):
+                value[key] = sys.intern(item)
+            else:
+                _intern_in_place(item)
+
+
+def intern_shared_strings(state: GraphState) -> GraphState:
+    """
+    Replace the problem-derived strings of a state with interned copies, so
+    sessions on the same problem (e.g. reused from the problem index, or
+    loaded from the session store) hold one copy of each fact, question and
+    reasoning step instead of one per session.
+    """
+    for field in SHARED_STATE_FIELDS:
+        value = state.get(field)
+        if isinstance(value, str):
+            state[field] = sys.intern(value)
+        else:
+            _intern_in_place(value)
+    return state
+
+
 def format_facts_list(facts: List[str]) -> str:
     """Format a list of facts for display."""
     if not facts:
@@ -3,9 +3,12 @@ LangGraph workflow construction and routing for the Geometry Tutor system.
 """
 
 import json
+from functools import lru_cache
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
 
+from src.shared.logging import get_console_logger
+
 from .core import GraphState
 from .agents import (
     parse_problem,
@@ -17,6 +20,8 @@ from .agents import (
     await_user_action,
 )
 
+console = get_console_logger()
+
 
 def route_user_action(state: GraphState) -> str:
     """
@@ -29,13 +34,16 @@ def route_user_action(state: GraphState) -> str:
         questions = state.get("questions", [])
         hint_level = state.get("hint_level", 0)
 
-        print("📊 TRẠNG THÁI CHI TIẾT:")
-        print(f"  📍 Câu hỏi: {current_question_index + 1}/{len(questions)}")
-        print(f"  💡 Gợi ý đã dùng: {hint_level}/3")
-        print(f"  ✅ Đã xác thực: {'Có' if state.get('is_validated') else 'Chưa'}")
+        lines = [
+            "📊 TRẠNG THÁI CHI TIẾT:",
+            f"  📍 Câu hỏi: {current_question_index + 1}/{len(questions)}",
+            f"  💡 Gợi ý đã dùng: {hint_level}/3",
+            f"  ✅ Đã xác thực: {'Có' if state.get('is_validated') else 'Chưa'}",
+        ]
         if current_question_index < len(questions):
-            print(f"  🎯 Câu hỏi: {questions[current_question_index]}")
-        print()
+            lines.append(f"  🎯 Câu hỏi: {questions[current_question_index]}")
+        lines.append("")
+        console.info("\n".join(lines))
         # Default fallback - this should handle cases where user_action is unexpected
         return "await_user_action"
 
@@ -56,23 +64,23 @@ def route_user_action(state: GraphState) -> str:
         # Check if user has reached hint limit
         hint_level = state.get("hint_level", 0)
         if hint_level >= 3:
-            print("⚠️  Bạn đã sử dụng hết 3 gợi ý cho câu hỏi này!")
+            console.info("⚠️  Bạn đã sử dụng hết 3 gợi ý cho câu hỏi này!")
             return "await_user_action"
         return "generate_hint"
 
     elif user_action == "2" or user_action.lower() == "submit":
         # Get user's solution input
         try:
-            print("📝 Nhập lời giải của bạn:")
+            console.info("📝 Nhập lời giải của bạn:")
             solution = input("👤 Lời giải: ").strip()
             if solution:
                 state["user_solution_attempt"] = solution
                 return "validate_solution"
             else:
-                print("❌ Lời giải không được để trống!")
+                console.warning("❌ Lời giải không được để trống!")
                 return "await_user_action"
         except Exception as e:
-            print(f"❌ Lỗi khi nhập lời giải: {e}")
+            console.warning(f"❌ Lỗi khi nhập lời giải: {e}")
             return "await_user_action"
 
     elif user_action == "3" or user_action.lower() == "solution":
@@ -82,7 +90,7 @@ def route_user_action(state: GraphState) -> str:
         if state.get("is_validated"):
             return "move_to_next_question"
         else:
-            print("❌ Cần hoàn thành câu hỏi hiện tại trước khi chuyển tiếp!")
+            console.info("❌ Cần hoàn thành câu hỏi hiện tại trước khi chuyển tiếp!")
             return "await_user_action"
     elif user_action == "5" or user_action.lower() == "status":
         # Display status and return to user input
@@ -90,7 +98,7 @@ def route_user_action(state: GraphState) -> str:
         return "await_user_action"
 
     elif user_action == "6" or user_action.lower() == "exit":
-        print("👋 Cảm ơn bạn đã sử dụng AI Geometry Tutor!")
+        console.info("👋 Cảm ơn bạn đã sử dụng AI Geometry Tutor!")
         state["session_complete"] = True
         return END
 
@@ -110,7 +118,7 @@ def route_user_action(state: GraphState) -> str:
 
     else:
         if user_action:  # Only show error for non-empty input
-            print("❌ Lựa chọn không hợp lệ! Vui lòng chọn từ 1-6.")
+            console.info("❌ Lựa chọn không hợp lệ! Vui lòng chọn từ 1-6.")
         return "await_user_action"
 
 
@@ -120,18 +128,15 @@ def should_continue_after_validation(state: GraphState) -> str:
     """
     # Display the validation feedback
     if state.get("final_answer"):
-        print("\\n" + "=" * 60)
-        print("📝 KẾT QUẢ ĐÁNH GIÁ")
-        print("=" * 60)
-        print(state["final_answer"])
-        print("=" * 60 + "\\n")
+        separator = "=" * 60
+        console.info(f"\n{separator}\n📝 KẾT QUẢ ĐÁNH GIÁ\n{separator}\n{state['final_answer']}\n{separator}\n")
 
     if state.get("is_validated"):
-        print("✅ Lời giải của bạn đã được xác nhận!")
+        console.info("✅ Lời giải của bạn đã được xác nhận!")
         return "move_to_next_question"
 
     else:
-        print("❌ Lời giải của bạn không chính xác. Vui lòng thử lại hoặc xin gợi ý.")
+        console.info("❌ Lời giải của bạn không chính xác. Vui lòng thử lại hoặc xin gợi ý.")
         return "await_user_action"
 
 
@@ -206,3 +211,12 @@ def create_geometry_tutor_graph() -> CompiledStateGraph:
 
     # Compile the graph
     return workflow.compile()
+
+
+@lru_cache()
+def get_geometry_tutor_graph() -> CompiledStateGraph:
+    """
+    The compiled workflow, shared by all tutors. It is compiled without a
+    checkpointer, so it holds no per-session state.
+    """
+    return create_geometry_tutor_graph()
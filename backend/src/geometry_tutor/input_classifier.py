@@ -0,0 +1,216 @@
+"""
+Local rule-based classification of student input for the validation node.
+
+Resolves the obvious cases (plain questions, worked solutions, short statements,
+empty noise) from Vietnamese surface cues without an LLM call. Anything ambiguous
+returns None so the caller falls back to the LLM classification chain.
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Optional
+
+from src.shared.config import get_settings
+from src.shared.tracing import record_cache
+from .llm_utils import InputClassification
+
+_INTERROGATIVES = (
+    "tại sao",
+    "vì sao",
+    "làm sao",
+    "làm thế nào",
+    "như thế nào",
+    "thế nào",
+    "là gì",
+    "nghĩa là gì",
+    "cái gì",
+    "bao nhiêu",
+    "có phải",
+    "hay không",
+    "được không",
+    "phải không",
+    "đúng không",
+    "định lý nào",
+    "cách nào",
+    "ở đâu",
+    "giải thích",
+    "gợi ý",
+)
+# Multi-word or symbolic markers: evidence of a worked step on their own
+_REASONING_MARKERS = (
+    "ta có",
+    "suy ra",
+    "do đó",
+    "vì vậy",
+    "theo định lý",
+    "áp dụng",
+    "lại có",
+    "=>",
+    "⇒",
+    "→",
+    "∴",
+)
+# Single words that also occur in ordinary sentences ("mà", "nên"): they only
+# make an input ambiguous, never a solution by themselves
+_WEAK_REASONING_MARKERS = (
+    "nên",
+    "xét",
+    "mà",
+)
+_CONCLUSION_MARKERS = (
+    "vậy",
+    "đpcm",
+    "điều phải chứng minh",
+    "kết luận",
+    "∎",
+)
+_RELATION_MARKERS = (
+    "=",
+    "//",
+    "∥",
+    "⊥",
+    "∽",
+    "<",
+    ">",
+    "song song",
+    "vuông góc",
+    "bằng",
+    "cân tại",
+    "vuông tại",
+    "đồng dạng",
+    "trung điểm",
+    "thẳng hàng",
+    "nội tiếp",
+    "tiếp tuyến",
+)
+_WORD_CHARS = re.compile(r"\w", re.UNICODE)
+_DIGIT = re.compile(r"\d")
+# Shorter inputs ("AB = 5", "có") are left to the LLM unless they have no content
+_MIN_LOCAL_LENGTH = 12
+
+
+def _count_markers(text: str, markers) -> int:
+    """Count marker phrases occurring as whole words (or symbols) in text."""
+    count = 0
+    for marker in markers:
+        if marker[0].isalpha():
+            count += len(re.findall(rf"(?<!\w){re.escape(marker)}(?!\w)", text))
+        else:
+            count += text.count(marker)
+    return count
+
+
+def _classify(text: str) -> Optional[InputClassification]:
+    """Apply the heuristics to normalized input. Returns None when unsure."""
+    if len(_WORD_CHARS.findall(text)) < 2:
+        return InputClassification(
+            input_type="unclear", confidence=95, explanation="local: no content"
+        )
+
+    question_marks = text.count("?")
+    interrogatives = _count_markers(text, _INTERROGATIVES)
+    reasoning = _count_markers(text, _REASONING_MARKERS)
+    weak_reasoning = _count_markers(text, _WEAK_REASONING_MARKERS)
+    # "vậy" inside "vì vậy" is a step, not a conclusion
+    conclusions = _count_markers(text.replace("vì vậy", " "), _CONCLUSION_MARKERS)
+    relations = _count_markers(text, _RELATION_MARKERS)
+    asks = question_marks > 0 or interrogatives > 0
+
+    if asks:
+        # A question mixed with worked steps ("ta có ... vậy có đúng không?")
+        # needs the LLM to tell a question from a solution seeking confirmation.
+        if reasoning or conclusions or len(text) > 300:
+            return None
+        confidence = 95 if text.endswith("?") and interrogatives else 85
+        return InputClassification(
+            input_type="question",
+            confidence=confidence,
+            explanation="local: question mark / interrogative words",
+        )
+
+    if len(text) < _MIN_LOCAL_LENGTH:
+        return None
+
+    if conclusions and reasoning >= 2 and relations and len(text) >= 80:
+        return InputClassification(
+            input_type="complete_solution",
+            confidence=85,
+            explanation="local: reasoning steps with a conclusion",
+        )
+
+    if reasoning and relations and not conclusions:
+        # One step marker may be a sentence about the problem, so it stays
+        # below the default threshold and goes to the LLM
+        return InputClassification(
+            input_type="partial_solution",
+            confidence=85 if reasoning >= 2 else 70,
+            explanation="local: reasoning steps without a conclusion",
+        )
+
+    # A relation with a computed value ("nên BC = 5") may be a final answer
+    if (
+        relations
+        and not (reasoning or weak_reasoning or conclusions)
+        and not _DIGIT.search(text)
+        and len(text) <= 120
+    ):
+        return InputClassification(
+            input_type="statement",
+            confidence=80,
+            explanation="local: short geometric relation",
+        )
+
+    return None
+
+
+class ClassificationStats:
+    """Thread-safe counters for the local classification fast path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.llm_fallbacks = 0
+        self.by_type: Dict[str, int] = {}
+
+    def record(self, result: Optional[InputClassification]) -> None:
+        with self._lock:
+            if result is None:
+                self.llm_fallbacks += 1
+            else:
+                self.local_hits += 1
+                self.by_type[result.input_type] = self.by_type.get(result.input_type, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.local_hits + self.llm_fallbacks
+            return {
+                "local_hits": self.local_hits,
+                "llm_fallbacks": self.llm_fallbacks,
+                "hit_rate": self.local_hits / total if total else 0.0,
+                "local_hits_by_type": dict(self.by_type),
+            }
+
+
+classification_stats = ClassificationStats()
+
+
+def classify_input_locally(user_input: str) -> Optional[InputClassification]:
+    """
+    Classify student input without an LLM call.
+
+    Returns:
+        InputClassification when the local rules are confident enough,
+        None when the caller should fall back to the LLM chain.
+    """
+    settings = get_settings()
+    result = None
+    if settings.local_classifier_enabled:
+        text = unicodedata.normalize("NFC", user_input).strip().lower()
+        result = _classify(text)
+        if result and result.confidence < settings.local_classifier_min_confidence:
+            result = None
+        record_cache("local_classifier", result is not None)
+
+    classification_stats.record(result)
+    return result
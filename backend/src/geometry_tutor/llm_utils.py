@@ -4,28 +4,155 @@ LLM integration and utility functions for the AI Geometry Tutor system.
 
 import os
 import json
-from typing import Optional, List
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import lru_cache
+from uuid import UUID
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_core.outputs import LLMResult
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
+from src.shared.config import get_settings
+from src.shared.logging import get_logger
+from src.shared.tracing import record_llm_call, record_retry
 from .prompts import prompt_templates
+from .stub_llm import is_stub_model, create_stub_llm
+from .session_capture import get_session_recorder, session_capture_callback
+
+logger = get_logger("llm")
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """Extract (prompt, completion) token counts from an LLM result."""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if not (prompt_tokens or completion_tokens) and response.llm_output:
+        usage = response.llm_output.get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Reports latency, token usage, errors and retries of every LLM call to the tracing layer."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: Dict[UUID, Tuple[float, str]] = {}
+
+    def _start(self, run_id: UUID, kwargs: Dict[str, Any]) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or params.get("_type") or "unknown"
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), str(model))
+
+    def _finish(self, run_id: UUID) -> Tuple[float, str]:
+        with self._lock:
+            start, model = self._started.pop(run_id, (time.perf_counter(), "unknown"))
+        return time.perf_counter() - start, model
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        duration, model = self._finish(run_id)
+        prompt_tokens, completion_tokens = _token_usage(response)
+        record_llm_call(model, duration, prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        duration, model = self._finish(run_id)
+        record_llm_call(model, duration, failed=True)
+
+    def on_retry(self, retry_state: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        record_retry()
+
+
+llm_metrics_callback = LLMMetricsCallback()
+
+# Chat model returned by initialize_llm() instead of the configured one (session replay)
+_llm_override: contextvars.ContextVar[Optional[BaseChatModel]] = contextvars.ContextVar(
+    "tutor_llm_override", default=None
+)
+
+
+@lru_cache()
+def get_rate_limiter() -> Optional[InMemoryRateLimiter]:
+    """Process-wide limiter shared by all chat models, or None when LLM_MAX_RPM is 0."""
+    max_rpm = get_settings().llm_max_rpm
+    if not max_rpm:
+        return None
+    requests_per_second = max_rpm / 60
+    return InMemoryRateLimiter(
+        requests_per_second=requests_per_second,
+        check_every_n_seconds=0.05,
+        max_bucket_size=max(1.0, requests_per_second),
+    )
+
+
+@contextmanager
+def override_llm(llm: BaseChatModel) -> Iterator[BaseChatModel]:
+    """Make initialize_llm() return llm for work started in this context."""
+    token = _llm_override.set(llm)
+    try:
+        yield llm
+    finally:
+        _llm_override.reset(token)
 
 
 def initialize_llm(
-    model_name: str = "gemini-2.0-flash-exp", temperature=0.1, max_output_token=2048
+    model_name: Optional[str] = None, temperature=None, max_output_token=None
 ) -> Optional[ChatGoogleGenerativeAI]:
-    """Initialize the Google Gemini LLM with appropriate settings."""
+    """
+    Initialize the Google Gemini LLM with appropriate settings.
+    Unset arguments come from Settings; a model name starting with "stub"
+    returns the offline stub model instead.
+    """
+    override = _llm_override.get()
+    if override is not None:
+        return override
+
     try:
+        settings = get_settings()
+        model_name = model_name or settings.llm_model
+        temperature = settings.llm_temperature if temperature is None else temperature
+        max_output_token = max_output_token or settings.max_output_tokens
+
+        callbacks = [llm_metrics_callback]
+        if get_session_recorder() is not None:
+            callbacks.append(session_capture_callback)
+
+        if is_stub_model(model_name):
+            return create_stub_llm(model_name, callbacks=callbacks, rate_limiter=get_rate_limiter())
+
         llm = ChatGoogleGenerativeAI(
             model=model_name,
             temperature=temperature,
             max_output_tokens=max_output_token,
+            callbacks=callbacks,
+            rate_limiter=get_rate_limiter(),
         )
         return llm
     except Exception as e:
-        print(f"Error initializing LLM: {e}")
-        print("Please make sure you have set the GOOGLE_API_KEY environment variable")
+        logger.error(
+            "Error initializing LLM: %s. Please make sure you have set the GOOGLE_API_KEY environment variable", e
+        )
         return None
 
 
@@ -107,6 +234,41 @@ class InputClassification(BaseModel):
     )
 
 
+class CombinedValidationResult(BaseModel):
+    """Model for classifying and validating user input in a single call."""
+
+    input_type: str = Field(
+        description="Type of input: question, complete_solution, partial_solution, statement, unclear"
+    )
+    is_correct: bool = Field(
+        default=False, description="Whether the solution is correct (false for questions)"
+    )
+    feedback: str = Field(
+        default="", description="Feedback on the solution or statement"
+    )
+    score: int = Field(default=0, description="Score from 0-100 (0 for questions)")
+    additional_illustration_steps: List[str] = Field(
+        default_factory=list, description="Additional illustration steps if needed"
+    )
+    question_answer: Optional[str] = Field(
+        default=None, description="Answer to the student's question when input_type is question"
+    )
+
+
+class HintLadder(BaseModel):
+    """Model for the three progressive hint levels of a question."""
+
+    conceptual: str = Field(
+        description="Level 1: general strategy hint without specific details"
+    )
+    contextual: str = Field(
+        description="Level 2: points to the specific known facts needed for the next step"
+    )
+    direct: str = Field(
+        description="Level 3: directly suggests the next step for the student to complete"
+    )
+
+
 class QuestionExtraction(BaseModel):
     """Model for extracting new facts and illustration steps from question text."""
 
@@ -157,6 +319,32 @@ def create_validation_chain(llm):
     return prompt | llm | parser
 
 
+def create_combined_validation_chain(llm):
+    """Create a chain that classifies and validates user input in one call."""
+    parser = PydanticOutputParser(pydantic_object=CombinedValidationResult)
+
+    prompt = PromptTemplate(
+        template=prompt_templates.get_combined_validation_prompt(),
+        input_variables=["combined_prompt"],
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+
+    return prompt | llm | parser
+
+
+def create_hint_ladder_chain(llm):
+    """Create a chain that generates all hint levels in one call."""
+    parser = PydanticOutputParser(pydantic_object=HintLadder)
+
+    prompt = PromptTemplate(
+        template=prompt_templates.get_hint_ladder_prompt(),
+        input_variables=["hint_ladder_prompt"],
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+
+    return prompt | llm | parser
+
+
 def create_text_extraction_chain(llm):
     """Create a chain for text extraction from images."""
     parser = PydanticOutputParser(pydantic_object=ExtractedText)
@@ -255,12 +443,17 @@ def setup_environment():
     # Load environment variables from .env file if it exists
     load_dotenv()
 
+    # The offline stub model needs no credentials
+    if is_stub_model(os.getenv("LLM_MODEL")):
+        return True
+
     # Check if Google API key is set
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
-        print("Warning: GOOGLE_API_KEY environment variable is not set.")
-        print("Please set it using: export GOOGLE_API_KEY='your-api-key'")
-        print("Or create a .env file with: GOOGLE_API_KEY=your-api-key")
+        logger.warning(
+            "GOOGLE_API_KEY environment variable is not set. Please set it using: "
+            "export GOOGLE_API_KEY='your-api-key' or create a .env file with: GOOGLE_API_KEY=your-api-key"
+        )
         return False
 
     return True
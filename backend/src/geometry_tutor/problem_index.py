@@ -0,0 +1,585 @@
+"""
+Near-duplicate problem index for reusing work from previous sessions.
+
+Problems are normalized (Unicode, whitespace, operator spacing), point labels are
+canonicalized in order of first appearance (so "tam giác DEF" and "tam giác ABC"
+share a key) and compared with MinHash/LSH over word shingles. Shingle
+similarity tolerates rewording, but a single changed relation ("vuông" vs "cân",
+"hình chữ nhật" vs "hình vuông") makes a different problem, so candidates must
+also state the same geometric structure: the same relation terms, symbols and
+labels. A match lets a new session reuse the parsed problem and the solver's reasoning chains after the
+labels are remapped back to the new problem's naming.
+"""
+
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from src.shared.config import get_settings
+
+# A point label is a run of uppercase Latin letters, each optionally followed by
+# primes or digits (A, AB, ABC, A'B', O1), not glued to other Latin (including
+# Vietnamese) letters or digits. Symbols such as "Δ" may precede a label.
+_LETTER_CLASS = "A-Za-z0-9À-ÖØ-öø-ɏḀ-ỿ"
+_LABEL_TOKEN = re.compile(
+    rf"(?<![{_LETTER_CLASS}'])(?:[A-Z]'*\d*)+(?![{_LETTER_CLASS}'])"
+)
+_LABEL_LETTER = re.compile(r"[A-Z]")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+_OPERATOR_SPACING = re.compile(r"\s*([=<>+\-*/^(),.;:])\s*")
+_WHITESPACE = re.compile(r"\s+")
+_SHINGLE_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Words and symbols that state geometric relations; longer terms first so that
+# "hình vuông" and "vuông góc" are not read as "vuông"
+_RELATION_TERMS = (
+    "hình chữ nhật", "hình bình hành", "hình thang cân", "hình thang vuông", "hình thang",
+    "hình vuông", "hình thoi", "tứ giác", "tam giác", "đa giác", "đường tròn", "nửa đường tròn",
+    "vuông góc", "vuông cân", "song song", "thẳng hàng", "đối xứng", "nội tiếp", "ngoại tiếp",
+    "tiếp tuyến", "tiếp điểm", "đường kính", "bán kính", "dây cung", "trung điểm", "trung tuyến",
+    "trung trực", "đường cao", "phân giác", "hình chiếu", "giao điểm", "trọng tâm", "trực tâm",
+    "chu vi", "diện tích", "lớn hơn", "nhỏ hơn", "chứng minh", "không", "vuông", "cân", "đều",
+    "nhọn", "tù", "bằng", "góc", "cung", "tâm", "tính",
+)
+_RELATION_TERM = re.compile(
+    r"(?<!\w)(?:" + "|".join(re.escape(term) for term in _RELATION_TERMS) + r")(?!\w)"
+)
+_RELATION_SYMBOL = re.compile(r"[=<>≤≥≠⊥∥∠△∽√°^+\-*/]")
+
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_MERSENNE_PRIME = (1 << 61) - 1
+_NUM_PERMUTATIONS = 64
+_BAND_ROWS = 4
+_SHINGLE_SIZE = 3
+
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_NUM_PERMUTATIONS)
+]
+
+
+def normalize_problem_text(text: str) -> str:
+    """Normalize Unicode form, quotes, whitespace and operator spacing."""
+    text = unicodedata.normalize("NFC", text)
+    text = text.replace("’", "'").replace("′", "'")
+    text = _OPERATOR_SPACING.sub(r"\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def canonicalize_labels(text: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Rename point labels to A, B, C... in order of first appearance.
+
+    Returns:
+        Tuple of (canonical text, mapping of original letter -> canonical letter)
+    """
+    mapping: Dict[str, str] = {}
+
+    def _rename_letter(match: re.Match) -> str:
+        letter = match.group(0)
+        if letter not in mapping:
+            mapping[letter] = _ALPHABET[len(mapping)]
+        return mapping[letter]
+
+    def _rename_token(match: re.Match) -> str:
+        return _LABEL_LETTER.sub(_rename_letter, match.group(0))
+
+    return _LABEL_TOKEN.sub(_rename_token, text), mapping
+
+
+def remap_labels(text: str, translation: Dict[str, str]) -> str:
+    """Rewrite point labels in text using a letter -> letter translation."""
+
+    def _rename_token(match: re.Match) -> str:
+        return _LABEL_LETTER.sub(
+            lambda letter: translation.get(letter.group(0), letter.group(0)),
+            match.group(0),
+        )
+
+    return _LABEL_TOKEN.sub(_rename_token, text)
+
+
+def extract_labels(text: str) -> List[str]:
+    """Return the point-label tokens (A, AB, ABC, O1...) used in text."""
+    return _LABEL_TOKEN.findall(text)
+
+
+def _label_letters(text: str) -> List[str]:
+    """Return the label letters used in text, in order of appearance."""
+    letters = []
+    for token in _LABEL_TOKEN.findall(text):
+        letters.extend(_LABEL_LETTER.findall(token))
+    return letters
+
+
+def _iter_strings(value: Any):
+    """Yield every string nested inside lists and dicts."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_strings(item)
+
+
+def _map_strings(value: Any, func) -> Any:
+    """Apply func to every string nested inside lists and dicts."""
+    if isinstance(value, str):
+        return func(value)
+    if isinstance(value, dict):
+        return {key: _map_strings(item, func) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_map_strings(item, func) for item in value]
+    return value
+
+
+def _complete_translation(translation: Dict[str, str], payload: Any) -> Dict[str, str]:
+    """
+    Extend a label translation to letters that only appear in generated text
+    (e.g. an auxiliary point introduced by the solver) without colliding with
+    letters already used as translation targets.
+    """
+    completed = dict(translation)
+    used = set(completed.values())
+    for text in _iter_strings(payload):
+        for letter in _label_letters(text):
+            if letter in completed:
+                continue
+            if letter not in used:
+                target = letter
+            else:
+                target = next((c for c in _ALPHABET if c not in used), letter)
+            completed[letter] = target
+            used.add(target)
+    return completed
+
+
+def _structure(canonical_text: str) -> Tuple[str, ...]:
+    """
+    Geometric structure of a canonical text: its relation terms, relation
+    symbols and point labels, in sorted order. Rewording keeps the structure;
+    changing what is stated about which points does not.
+    """
+    items = _LABEL_TOKEN.findall(canonical_text)
+    text = _LABEL_TOKEN.sub(" ", canonical_text).lower()
+    items.extend(_RELATION_TERM.findall(text))
+    items.extend(_RELATION_SYMBOL.findall(text))
+    return tuple(sorted(items))
+
+
+def _shingles(canonical_text: str) -> FrozenSet[str]:
+    """Word n-gram shingles of the lowercased canonical text."""
+    tokens = _SHINGLE_TOKEN.findall(canonical_text.lower())
+    if len(tokens) < _SHINGLE_SIZE:
+        return frozenset([" ".join(tokens)])
+    return frozenset(
+        " ".join(tokens[i : i + _SHINGLE_SIZE])
+        for i in range(len(tokens) - _SHINGLE_SIZE + 1)
+    )
+
+
+def _text_digest(canonical_text: str) -> str:
+    """Short digest identifying an entry's problem across processes."""
+    return hashlib.blake2b(canonical_text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _minhash(shingles: FrozenSet[str]) -> Tuple[int, ...]:
+    """MinHash signature with a fixed set of universal hash permutations."""
+    hashed = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashed) for a, b in _PERMUTATIONS
+    )
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    """Split a signature into LSH bands."""
+    return [
+        (i, signature[i : i + _BAND_ROWS])
+        for i in range(0, len(signature), _BAND_ROWS)
+    ]
+
+
+@dataclass(frozen=True)
+class ProblemFingerprint:
+    """Label-independent fingerprint of a problem text."""
+
+    canonical_text: str
+    label_map: Dict[str, str]
+    numbers: Tuple[str, ...]
+    shingles: FrozenSet[str]
+    structure: Tuple[str, ...]
+
+    @classmethod
+    def from_text(cls, problem_text: str) -> "ProblemFingerprint":
+        canonical_text, label_map = canonicalize_labels(
+            normalize_problem_text(problem_text)
+        )
+        # Numbers must match exactly: "AB=3" and "AB=5" are different problems
+        without_labels = _LABEL_TOKEN.sub(" ", canonical_text)
+        numbers = tuple(sorted(Counter(_NUMBER.findall(without_labels)).elements()))
+        return cls(
+            canonical_text, label_map, numbers, _shingles(canonical_text), _structure(canonical_text)
+        )
+
+    def to_canonical(self, payload: Any) -> Any:
+        """Rewrite payload strings from this problem's labels to canonical labels."""
+        translation = _complete_translation(self.label_map, payload)
+        return _map_strings(payload, lambda s: remap_labels(s, translation))
+
+    def from_canonical(self, payload: Any) -> Any:
+        """Rewrite payload strings from canonical labels to this problem's labels."""
+        return _from_canonical(self.label_map, payload)
+
+
+def _from_canonical(label_map: Dict[str, str], payload: Any) -> Any:
+    """Rewrite payload strings from canonical labels using a problem's label map."""
+    inverse = {canon: original for original, canon in label_map.items()}
+    translation = _complete_translation(inverse, payload)
+    return _map_strings(payload, lambda s: remap_labels(s, translation))
+
+
+@dataclass
+class _IndexEntry:
+    entry_id: int
+    fingerprint: ProblemFingerprint
+    signature: Tuple[int, ...]
+    payload: Optional[Dict[str, Any]] = None
+
+
+class ProblemMatch:
+    """
+    A previously seen problem matched to a new problem text.
+
+    Only a reference to the index entry and the new problem's label map are
+    kept: the payload stays shared in the index and is remapped to the new
+    problem's labels when applied.
+    """
+
+    __slots__ = ("index", "entry_id", "digest", "label_map", "similarity")
+
+    def __init__(
+        self,
+        index: "ProblemIndex",
+        entry_id: int,
+        digest: str,
+        label_map: Dict[str, str],
+        similarity: float,
+    ):
+        self.index = index
+        self.entry_id = entry_id
+        self.digest = digest
+        self.label_map = label_map
+        self.similarity = similarity
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable reference, restored with from_dict() without a new lookup."""
+        return {
+            "entry_id": self.entry_id,
+            "digest": self.digest,
+            "label_map": self.label_map,
+            "similarity": self.similarity,
+        }
+
+    @classmethod
+    def from_dict(cls, index: "ProblemIndex", data: Dict[str, Any]) -> "ProblemMatch":
+        return cls(index, data["entry_id"], data["digest"], data["label_map"], data["similarity"])
+
+    def apply_parsed(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill a fresh state with the remapped parse results. The state keeps its
+        own original_problem: the stored text is another student's wording.
+
+        Raises:
+            LookupError: If the entry left the index since the lookup
+        """
+        payload = self.index.get_payload(self.entry_id, self.digest)
+        if not payload:
+            raise LookupError("Matched problem is no longer in the problem index")
+        parsed = _from_canonical(self.label_map, payload["parsed"])
+        state["parsed_elements"] = parsed["parsed_elements"]
+        state["questions"] = parsed["questions"]
+        state["known_facts"] = parsed["known_facts"]
+        state["illustration_steps"] = parsed["illustration_steps"]
+        state["error_message"] = ""
+        return state
+
+    def apply_solution(self, state: Dict[str, Any], question_index: int) -> bool:
+        """Fill the reasoning for a question if one was recorded. Returns True on reuse."""
+        payload = self.index.get_payload(self.entry_id, self.digest)
+        solution = payload.get("solutions", {}).get(str(question_index)) if payload else None
+        if not solution:
+            return False
+
+        solution = _from_canonical(self.label_map, solution)
+        state["reasoning_chain"] = solution["reasoning_chain"]
+        state["ai_discovered_facts"] = solution["ai_discovered_facts"]
+        state["precomputed_hints"] = solution.get("precomputed_hints", [])
+        return True
+
+
+class ProblemIndex:
+    """
+    Index of previously parsed and solved problems.
+
+    Entries are held in memory with MinHash/LSH buckets. When a database path is
+    given, entries are also persisted to SQLite so that several processes (API
+    workers, batch jobs) share the same index.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        max_entries: int = 5000,
+        db_path: Optional[str] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.db_path = db_path
+
+        self._entries: "OrderedDict[int, _IndexEntry]" = OrderedDict()
+        self._by_canonical: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._next_id = 1
+        self._last_db_id = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.stats = {"lookups": 0, "hits": 0, "exact_hits": 0, "near_hits": 0}
+
+        if db_path:
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS problem_index (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    canonical_text TEXT UNIQUE NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.commit()
+            self._refresh_locked()
+
+    # --- Internal bookkeeping (callers hold self._lock) ---
+
+    def _add_entry_locked(
+        self, entry_id: int, fingerprint: ProblemFingerprint, payload: Optional[Dict[str, Any]]
+    ) -> _IndexEntry:
+        signature = _minhash(fingerprint.shingles)
+        entry = _IndexEntry(entry_id, fingerprint, signature, payload)
+        self._entries[entry_id] = entry
+        self._by_canonical[fingerprint.canonical_text] = entry_id
+        for band in _bands(signature):
+            self._buckets.setdefault(band, []).append(entry_id)
+        self._next_id = max(self._next_id, entry_id + 1)
+
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._by_canonical.pop(evicted.fingerprint.canonical_text, None)
+            for band in _bands(evicted.signature):
+                bucket = self._buckets.get(band)
+                if bucket and evicted.entry_id in bucket:
+                    bucket.remove(evicted.entry_id)
+                    if not bucket:
+                        del self._buckets[band]
+        return entry
+
+    def _refresh_locked(self) -> None:
+        """Load entries written by other processes since the last refresh."""
+        if not self._conn:
+            return
+        rows = self._conn.execute(
+            "SELECT id, canonical_text FROM problem_index WHERE id > ? ORDER BY id",
+            (self._last_db_id,),
+        ).fetchall()
+        for entry_id, canonical_text in rows:
+            self._last_db_id = entry_id
+            if canonical_text in self._by_canonical:
+                continue
+            # The canonical text already uses canonical labels, so its own label
+            # map is the identity and re-fingerprinting it is stable.
+            self._add_entry_locked(entry_id, ProblemFingerprint.from_text(canonical_text), None)
+
+    def _load_payload_locked(self, entry_id: int, digest: str) -> Optional[Dict[str, Any]]:
+        # Checking the digest keeps a match made against another process's index
+        # (per-worker in-memory index, other database) from reading an unrelated entry
+        if not self._conn:
+            entry = self._entries.get(entry_id)
+            if entry is None or _text_digest(entry.fingerprint.canonical_text) != digest:
+                return None
+            return entry.payload
+        row = self._conn.execute(
+            "SELECT canonical_text, payload FROM problem_index WHERE id = ?", (entry_id,)
+        ).fetchone()
+        if row is None or _text_digest(row[0]) != digest:
+            return None
+        return json.loads(row[1])
+
+    def _find_locked(self, fingerprint: ProblemFingerprint) -> Tuple[Optional[_IndexEntry], float]:
+        entry_id = self._by_canonical.get(fingerprint.canonical_text)
+        if entry_id is not None:
+            return self._entries[entry_id], 1.0
+
+        signature = _minhash(fingerprint.shingles)
+        candidates = set()
+        for band in _bands(signature):
+            candidates.update(self._buckets.get(band, ()))
+
+        best, best_similarity = None, 0.0
+        for candidate_id in candidates:
+            candidate = self._entries[candidate_id].fingerprint
+            if candidate.numbers != fingerprint.numbers:
+                continue
+            if len(candidate.label_map) != len(fingerprint.label_map):
+                continue
+            # Similar shingles are not enough ("vuông tại A" vs "cân tại A"):
+            # the problems must state the same relations about the same points
+            if candidate.structure != fingerprint.structure:
+                continue
+            union = len(candidate.shingles | fingerprint.shingles)
+            similarity = len(candidate.shingles & fingerprint.shingles) / union if union else 0.0
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = self._entries[candidate_id], similarity
+        return best, best_similarity
+
+    # --- Public API ---
+
+    def lookup(self, problem_text: str) -> Optional[ProblemMatch]:
+        """Find a previously seen problem that is a near-duplicate of problem_text."""
+        fingerprint = ProblemFingerprint.from_text(problem_text)
+        with self._lock:
+            self.stats["lookups"] += 1
+            self._refresh_locked()
+            entry, similarity = self._find_locked(fingerprint)
+            if entry is None:
+                return None
+            digest = _text_digest(entry.fingerprint.canonical_text)
+            payload = self._load_payload_locked(entry.entry_id, digest)
+            if not payload or "parsed" not in payload:
+                return None
+
+            self._entries.move_to_end(entry.entry_id)
+            self.stats["hits"] += 1
+            self.stats["exact_hits" if similarity == 1.0 else "near_hits"] += 1
+
+        return ProblemMatch(self, entry.entry_id, digest, fingerprint.label_map, similarity)
+
+    def get_payload(self, entry_id: int, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored payload (canonical labels) of an entry, or None if the entry no
+        longer holds the problem with that digest. In-memory entries return the
+        shared payload itself: callers must not modify it.
+        """
+        with self._lock:
+            return self._load_payload_locked(entry_id, digest)
+
+    def record_parse(self, problem_text: str, state: Dict[str, Any]) -> None:
+        """Store the parse results of a problem if it is not indexed yet."""
+        fingerprint = ProblemFingerprint.from_text(problem_text)
+        parsed = fingerprint.to_canonical(
+            {
+                "original_problem": state["original_problem"],
+                "parsed_elements": state["parsed_elements"],
+                "questions": state["questions"],
+                "known_facts": state["known_facts"],
+                "illustration_steps": state["illustration_steps"],
+            }
+        )
+        payload = {"parsed": parsed, "solutions": {}}
+
+        with self._lock:
+            self._refresh_locked()
+            if fingerprint.canonical_text in self._by_canonical:
+                return
+            if self._conn:
+                now = time.time()
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO problem_index "
+                    "(canonical_text, payload, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (fingerprint.canonical_text, json.dumps(payload, ensure_ascii=False), now, now),
+                )
+                self._conn.commit()
+                if cursor.rowcount:
+                    self._add_entry_locked(cursor.lastrowid, fingerprint, None)
+                else:
+                    self._refresh_locked()
+            else:
+                self._add_entry_locked(self._next_id, fingerprint, payload)
+
+    def record_solution(self, problem_text: str, question_index: int, state: Dict[str, Any]) -> None:
+        """Store the reasoning for one question of an indexed problem."""
+        fingerprint = ProblemFingerprint.from_text(problem_text)
+        solution = fingerprint.to_canonical(
+            {
+                "reasoning_chain": state["reasoning_chain"],
+                "ai_discovered_facts": state["ai_discovered_facts"],
+                "precomputed_hints": state.get("precomputed_hints", []),
+            }
+        )
+
+        with self._lock:
+            self._refresh_locked()
+            entry_id = self._by_canonical.get(fingerprint.canonical_text)
+            if entry_id is None:
+                return
+            entry = self._entries[entry_id]
+
+            if not self._conn:
+                entry.payload.setdefault("solutions", {})[str(question_index)] = solution
+                return
+
+            # Read-modify-write inside one transaction so concurrent writers
+            # recording different questions do not overwrite each other.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT payload FROM problem_index WHERE id = ?", (entry_id,)
+                ).fetchone()
+                if row:
+                    payload = json.loads(row[0])
+                    payload.setdefault("solutions", {})[str(question_index)] = solution
+                    self._conn.execute(
+                        "UPDATE problem_index SET payload = ?, updated_at = ? WHERE id = ?",
+                        (json.dumps(payload, ensure_ascii=False), time.time(), entry_id),
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup statistics for monitoring."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+
+@lru_cache()
+def get_problem_index() -> Optional[ProblemIndex]:
+    """Get the process-wide problem index, or None when disabled."""
+    settings = get_settings()
+    if not settings.problem_index_enabled:
+        return None
+    return ProblemIndex(
+        threshold=settings.problem_index_threshold,
+        max_entries=settings.problem_index_max_entries,
+        db_path=settings.problem_index_path,
+    )
@@ -194,6 +194,34 @@ Chuỗi lập luận đúng:
 Hãy gợi ý trực tiếp bước tiếp theo mà học sinh nên thực hiện, nhưng vẫn để học sinh tự hoàn thành.
 Đưa ra một gợi ý cụ thể dưới dạng đề xuất."""
 
+    @staticmethod
+    def get_hint_ladder_prompt() -> str:
+        """Template for generating all hint levels together."""
+        return """{hint_ladder_prompt}
+
+{format_instructions}"""
+
+    @staticmethod
+    def get_hint_ladder_prompt_template(
+        current_question: str,
+        known_facts: List[str],
+        reasoning_chain: List[Dict[str, Any]],
+        format_facts_func,
+    ) -> str:
+        """Template for generating the three hint levels (1-3) in one call."""
+        return f"""Bạn là một giáo viên hình học. Học sinh đang giải câu hỏi: {current_question}
+
+Các sự kiện học sinh đã biết:
+{format_facts_func(known_facts)}
+
+Chuỗi lập luận đúng:
+{json.dumps(reasoning_chain, ensure_ascii=False, indent=2)}
+
+Hãy soạn trước ba gợi ý tăng dần để học sinh tự giải, mỗi gợi ý độc lập với nhau:
+1. conceptual: Gợi ý khái niệm tổng quát (không tiết lộ chi tiết cụ thể) về chiến lược giải quyết. Đặt câu hỏi hướng dẫn để học sinh tự suy nghĩ.
+2. contextual: Chỉ ra những sự kiện cụ thể từ danh sách đã biết mà học sinh cần chú ý để thực hiện bước tiếp theo. Không tiết lộ bước lập luận, chỉ hướng dẫn tập trung vào thông tin nào.
+3. direct: Gợi ý trực tiếp bước tiếp theo mà học sinh nên thực hiện, nhưng vẫn để học sinh tự hoàn thành. Đưa ra một gợi ý cụ thể dưới dạng đề xuất."""
+
     @staticmethod
     def get_solution_prompt(
         current_question: str, reasoning_chain: List[Dict[str, Any]]
@@ -301,6 +329,52 @@ Hãy trả lời câu hỏi của học sinh một cách:
 
 Trả về phản hồi hướng dẫn và khuyến khích cho học sinh."""
 
+    @staticmethod
+    def get_combined_validation_prompt() -> str:
+        """Template for combined classification and validation."""
+        return """{combined_prompt}
+
+{format_instructions}"""
+
+    @staticmethod
+    def get_combined_validation_prompt_template(
+        current_question: str,
+        user_input: str,
+        known_facts: List[str],
+        reasoning_chain: List[Dict[str, Any]],
+        format_facts_func,
+    ) -> str:
+        """Template for classifying and evaluating student input in a single call."""
+        return f"""Bạn là một trợ giảng dạy hình học thân thiện và xây dựng. Học sinh đang làm câu hỏi: {current_question}
+
+Các sự kiện đã biết:
+{format_facts_func(known_facts)}
+
+Chuỗi lập luận đúng (để tham khảo):
+{json.dumps(reasoning_chain, ensure_ascii=False, indent=2)}
+
+Học sinh vừa gửi nội dung sau:
+{user_input}
+
+Bước 1 - Phân loại nội dung (input_type):
+1. **question**: Câu hỏi về khái niệm, định nghĩa, phương pháp, hoặc yêu cầu giải thích
+2. **complete_solution**: Lời giải hoàn chỉnh từ đầu đến cuối
+3. **partial_solution**: Lời giải một phần, ý tưởng, hoặc bước đầu
+4. **statement**: Phát biểu, nhận xét, hoặc kết luận không có lời giải chi tiết
+5. **unclear**: Nội dung không rõ ràng hoặc không liên quan
+
+Bước 2 - Phản hồi theo loại:
+- Nếu là **question**: viết câu trả lời vào question_answer (rõ ràng, liên kết với bài toán hiện tại, không tiết lộ hoàn toàn lời giải), đặt is_correct = false và score = 0
+- Nếu là **complete_solution**, **partial_solution** hoặc **statement**: so sánh với chuỗi lập luận đúng, viết phản hồi vào feedback, chấm điểm score (0-100), đặt is_correct = true chỉ khi lời giải đúng và hoàn chỉnh
+- Nếu là **unclear**: đặt is_correct = false, score = 0
+
+Luôn luôn:
+- Sử dụng giọng điệu khuyến khích, tích cực
+- Đưa ra phản hồi xây dựng và hữu ích
+- Hướng dẫn bước tiếp theo nếu cần
+
+Nếu lời giải của học sinh đúng hoàn toàn, hãy đưa ra các bước vẽ hình bổ sung (additional_illustration_steps) để minh họa cho lời giải này. Nếu không thì trả về mảng rỗng."""
+
     @staticmethod
     def get_question_extraction_prompt() -> str:
         """Template for extracting new facts and illustration steps from question text."""
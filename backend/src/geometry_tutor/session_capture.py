@@ -0,0 +1,275 @@
+"""
+Session capture and replay.
+
+With SESSION_CAPTURE_PATH set, every API session appends JSON lines to that
+file: one "action" record per tutor action (problem text or student input,
+the returned result and a summary of the resulting state) and one "llm"
+record per chat-model response (calling node, prompt fingerprint and raw
+text). scripts/replay_sessions.py re-runs captured sessions offline against
+the current code, answering every LLM call from the recording through
+ReplayChatModel.
+"""
+
+import json
+import time
+import hashlib
+import threading
+import functools
+from collections import deque
+from functools import lru_cache
+from uuid import UUID
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from pydantic import PrivateAttr
+
+from src.shared.config import get_settings
+from src.shared.tracing import get_current_node, get_session_id
+from .context_budget import estimate_tokens
+from .stub_llm import message_text
+
+# Settings that change which LLM calls a session makes; replay reapplies them
+CAPTURED_SETTINGS = (
+    "validation_mode",
+    "hint_ladder_mode",
+    "local_classifier_enabled",
+    "local_classifier_min_confidence",
+    "prompt_fact_token_budget",
+)
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Short stable hash identifying a prompt."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class SessionRecorder:
+    """Appends capture records to a JSONL file (safe to share between threads)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+@lru_cache()
+def get_session_recorder() -> Optional[SessionRecorder]:
+    """Get the process-wide recorder, or None when capture is disabled."""
+    path = get_settings().session_capture_path
+    return SessionRecorder(path) if path else None
+
+
+def record_event(kind: str, **fields: Any) -> None:
+    """Record an event for the session bound to the current context."""
+    recorder = get_session_recorder()
+    session_id = get_session_id()
+    if recorder is None or session_id is None:
+        return
+    recorder.write({"type": kind, "session_id": session_id, "ts": time.time(), **fields})
+
+
+def state_summary(state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The parts of a tutor state that must match between capture and replay."""
+    if not state:
+        return {}
+    return {
+        "current_question_index": state.get("current_question_index"),
+        "hint_level": state.get("hint_level"),
+        "hints": len(state.get("generated_hints", [])),
+        "is_validated": state.get("is_validated"),
+        "session_complete": state.get("session_complete"),
+        "known_facts": len(state.get("known_facts", [])),
+        "reasoning_steps": len(state.get("reasoning_chain", [])),
+        "error_message": state.get("error_message"),
+    }
+
+
+def captured(action: str) -> Callable:
+    """
+    Decorator recording a tutor action, its arguments, its result and the
+    resulting state when session capture is enabled.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            if get_session_recorder() is not None:
+                fields = {}
+                if action == "start":
+                    settings = get_settings()
+                    fields["settings"] = {name: getattr(settings, name) for name in CAPTURED_SETTINGS}
+                    fields["problem_index_hit"] = getattr(self, "problem_match", None) is not None
+                elif action == "hint" and self.current_state and result.get("success"):
+                    # With a background ladder the hint depends on whether it was ready
+                    ladder = self.current_state.get("precomputed_hints") or []
+                    level = self.current_state["hint_level"]
+                    fields["hint_from_ladder"] = len(ladder) >= level and ladder[level - 1] == result["hint_text"]
+                record_event(
+                    "action",
+                    action=action,
+                    args=list(args),
+                    result=result,
+                    state=state_summary(self.current_state),
+                    **fields,
+                )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class SessionCaptureCallback(BaseCallbackHandler):
+    """Records the raw response of every chat-model call."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prompts: Dict[UUID, str] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._prompts[run_id] = prompt_fingerprint(message_text(messages[0]))
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._prompts[run_id] = prompt_fingerprint(prompts[0])
+
+    def _prompt(self, run_id: UUID) -> Optional[str]:
+        with self._lock:
+            return self._prompts.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        text = response.generations[0][0].text if response.generations and response.generations[0] else ""
+        record_event("llm", node=get_current_node(), prompt=self._prompt(run_id), response=text)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        record_event("llm", node=get_current_node(), prompt=self._prompt(run_id), error=str(error))
+
+
+session_capture_callback = SessionCaptureCallback()
+
+
+def load_captured_sessions(path: str) -> List[Dict[str, Any]]:
+    """
+    Group a capture file into sessions, in order of their first record.
+    Sessions whose "start" action was not captured are dropped.
+    """
+    sessions: Dict[str, Dict[str, Any]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            session = sessions.setdefault(
+                record["session_id"],
+                {"session_id": record["session_id"], "actions": [], "llm": []},
+            )
+            if record["type"] == "action":
+                session["actions"].append(record)
+            elif record["type"] == "llm":
+                session["llm"].append(record)
+    return [
+        session for session in sessions.values()
+        if session["actions"] and session["actions"][0]["action"] == "start"
+    ]
+
+
+class ReplayMissError(RuntimeError):
+    """Raised when a replayed session makes an LLM call that was not recorded."""
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model answering from the recorded responses of one captured session.
+
+    A call is matched to a recorded response with the same prompt fingerprint;
+    if the prompt changed, the next unused response recorded for the same node
+    is returned instead. Recorded failures are raised again.
+    """
+
+    model_name: str = "replay"
+    _records: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _used: List[bool] = PrivateAttr(default_factory=list)
+    _by_prompt: Dict[str, Deque[int]] = PrivateAttr(default_factory=dict)
+    _by_node: Dict[str, Deque[int]] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _prompt_mismatches: int = PrivateAttr(default=0)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], callbacks: Optional[list] = None) -> "ReplayChatModel":
+        model = cls(callbacks=callbacks)
+        model._records = records
+        model._used = [False] * len(records)
+        for index, record in enumerate(records):
+            model._by_prompt.setdefault(record.get("prompt"), deque()).append(index)
+            model._by_node.setdefault(record.get("node", ""), deque()).append(index)
+        return model
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name}
+
+    def _take(self, queue: Optional[Deque[int]]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if not self._used[index]:
+                self._used[index] = True
+                return index
+        return None
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = message_text(messages)
+        with self._lock:
+            index = self._take(self._by_prompt.get(prompt_fingerprint(prompt)))
+            if index is None:
+                index = self._take(self._by_node.get(get_current_node()))
+                if index is not None:
+                    self._prompt_mismatches += 1
+        if index is None:
+            raise ReplayMissError(f"No recorded LLM response left for node '{get_current_node()}'")
+
+        record = self._records[index]
+        if "error" in record:
+            raise RuntimeError(record["error"])
+        text = record["response"]
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def prompt_mismatches(self) -> int:
+        """Calls answered by node because their prompt differed from the recording."""
+        return self._prompt_mismatches
+
+    def unused_responses(self) -> int:
+        """Recorded responses the replay never asked for."""
+        return self._used.count(False)
@@ -0,0 +1,346 @@
+"""
+Offline stub LLM backend for load testing and benchmarks.
+
+Selected by setting LLM_MODEL to a name starting with "stub" (e.g. "stub" or
+"stub-fast"). StubChatModel is a drop-in replacement for ChatGoogleGenerativeAI
+in the `prompt | llm | parser` chains: it detects which output schema a prompt
+asks for from its format instructions and returns schema-valid canned JSON
+derived from the prompt, after a simulated latency. Failures and malformed
+outputs can be injected at configurable rates.
+"""
+
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.shared.config import get_settings
+from .context_budget import estimate_tokens
+from .problem_index import extract_labels
+
+STUB_MODEL_PREFIX = "stub"
+
+_SHAPE_KEYWORDS = (
+    "tam giác",
+    "tứ giác",
+    "hình vuông",
+    "hình chữ nhật",
+    "hình thang",
+    "hình bình hành",
+    "đường tròn",
+)
+_QUESTION_SPLIT = re.compile(r"(?:^|\s)[a-h]\)\s+")
+_CONCLUSION_WORDS = ("vậy", "đpcm", "kết luận", "suy ra")
+
+_rng_lock = threading.Lock()
+
+
+class StubLLMError(RuntimeError):
+    """Injected failure raised by the stub model."""
+
+
+def is_stub_model(model_name: Optional[str]) -> bool:
+    """Check whether a model name selects the offline stub backend."""
+    return bool(model_name) and model_name.lower().startswith(STUB_MODEL_PREFIX)
+
+
+@lru_cache()
+def _get_rng() -> random.Random:
+    """Shared RNG for latency and failure injection, seeded once from settings."""
+    return random.Random(get_settings().stub_llm_seed)
+
+
+def _sample_latency(mean_ms: float, jitter_ms: float, distribution: str) -> float:
+    """Draw a simulated call latency in seconds."""
+    with _rng_lock:
+        rng = _get_rng()
+        if distribution == "fixed" or mean_ms <= 0:
+            latency = mean_ms
+        elif distribution == "uniform":
+            latency = rng.uniform(mean_ms - jitter_ms, mean_ms + jitter_ms)
+        elif distribution == "exponential":
+            latency = rng.expovariate(1.0 / mean_ms)
+        elif distribution == "lognormal":
+            # Parameterized so the samples have the configured mean and std dev
+            sigma2 = math.log(1 + (jitter_ms / mean_ms) ** 2)
+            latency = rng.lognormvariate(math.log(mean_ms) - sigma2 / 2, math.sqrt(sigma2))
+        else:
+            latency = rng.gauss(mean_ms, jitter_ms)
+    return max(0.0, latency) / 1000
+
+
+def _roll(rate: float) -> bool:
+    """Return True with the given probability."""
+    if rate <= 0:
+        return False
+    with _rng_lock:
+        return _get_rng().random() < rate
+
+
+def message_text(messages: List[BaseMessage]) -> str:
+    """Concatenate the text parts of the input messages (image parts are ignored)."""
+    parts = []
+    for message in messages:
+        if isinstance(message.content, str):
+            parts.append(message.content)
+        else:
+            for item in message.content:
+                if isinstance(item, str):
+                    parts.append(item)
+                elif item.get("type") == "text":
+                    parts.append(item.get("text", ""))
+    return "\n".join(parts)
+
+
+def _section(prompt: str, start: str, end: str = "\n\n") -> str:
+    """Return the text between the last occurrence of start and the next end marker."""
+    index = prompt.rfind(start)
+    if index == -1:
+        return ""
+    text = prompt[index + len(start):].lstrip()
+    end_index = text.find(end)
+    return (text[:end_index] if end_index != -1 else text).strip()
+
+
+def _current_question(prompt: str) -> str:
+    """Find the question a tutoring prompt is about."""
+    for marker in ("chứng minh/giải quyết:", "đang làm câu hỏi:", "Câu hỏi:"):
+        question = _section(prompt, marker, "\n")
+        if question:
+            return question
+    return "câu hỏi hiện tại"
+
+
+def _user_input(prompt: str) -> str:
+    """Find the student input embedded in a validation or classification prompt."""
+    for marker in ("Học sinh vừa gửi nội dung sau:", "Học sinh hỏi:"):
+        text = _section(prompt, marker)
+        if text:
+            return text
+    match = re.search(r"Học sinh đã nộp nội dung sau cho câu hỏi .*?:\s*\n\n(.*?)\n\n", prompt, re.S)
+    return match.group(1).strip() if match else ""
+
+
+def _classify_input(user_input: str) -> str:
+    """Deterministic input classification from surface cues."""
+    text = user_input.lower()
+    if len(re.findall(r"\w+", text)) < 2:
+        return "unclear"
+    if "?" in text:
+        return "question"
+    if any(word in text for word in _CONCLUSION_WORDS):
+        return "complete_solution"
+    if len(text) <= 60:
+        return "statement"
+    return "partial_solution"
+
+
+def _parsed_problem(prompt: str) -> dict:
+    problem = _section(prompt, "Bài toán:") or "Cho tam giác ABC."
+    pieces = [piece.strip() for piece in _QUESTION_SPLIT.split(problem) if piece.strip()]
+    statement, questions = (pieces[0], pieces[1:]) if len(pieces) > 1 else (problem, [problem])
+
+    labels = extract_labels(statement)
+    points = sorted({letter for label in labels for letter in label if letter.isalpha()})
+    lines = sorted({label for label in labels if len(label) == 2})
+    facts = [sentence.strip() for sentence in re.split(r"[.;]\s+", statement) if sentence.strip()]
+    return {
+        "problem_statement_only": statement,
+        "points": points,
+        "lines": lines,
+        "shapes": [shape for shape in _SHAPE_KEYWORDS if shape in statement.lower()],
+        "given_facts": facts,
+        "questions": questions,
+        "illustration_steps": [f"Vẽ hình theo dữ kiện: {fact}" for fact in facts],
+    }
+
+
+def _reasoning_step(prompt: str, total_steps: int) -> dict:
+    done = _section(prompt, "Bước lập luận đã thực hiện:", "\n\nHãy xác định").count('"conclusion"')
+    step = done + 1
+    question = _current_question(prompt)
+    goal_reached = step >= total_steps
+    return {
+        "thought": f"Bước {step}: xét các sự kiện đã biết liên quan đến yêu cầu \"{question}\".",
+        "conclusion": (
+            f"Đã giải quyết: {question}" if goal_reached else f"Kết luận trung gian {step} cho: {question}"
+        ),
+        "is_goal_reached": goal_reached,
+    }
+
+
+def _evaluation(input_type: str) -> dict:
+    is_correct = input_type == "complete_solution"
+    score = {"complete_solution": 90, "partial_solution": 50, "statement": 60}.get(input_type, 0)
+    return {
+        "is_correct": is_correct,
+        "feedback": "Lời giải đúng, rất tốt!" if is_correct else "Em đang đi đúng hướng, hãy tiếp tục.",
+        "score": score,
+        "additional_illustration_steps": ["Đánh dấu các yếu tố vừa chứng minh"] if is_correct else [],
+    }
+
+
+def _structured_response(prompt: str, reasoning_steps: int) -> Optional[dict]:
+    """Build the canned JSON for the schema requested in the prompt, if any."""
+    if "problem_statement_only" in prompt:
+        return _parsed_problem(prompt)
+    if "is_goal_reached" in prompt:
+        return _reasoning_step(prompt, reasoning_steps)
+    if '"conceptual"' in prompt and '"contextual"' in prompt:
+        question = _current_question(prompt)
+        return {
+            "conceptual": f"Hãy nghĩ xem định lý nào liên quan đến: {question}",
+            "contextual": "Hãy chú ý đến các sự kiện đã biết về các cạnh và góc.",
+            "direct": "Hãy áp dụng định lý đó cho tam giác trong bài và hoàn thành phép tính.",
+        }
+    if '"question_answer"' in prompt:
+        input_type = _classify_input(_user_input(prompt))
+        result = {"input_type": input_type, **_evaluation(input_type), "question_answer": None}
+        if input_type == "question":
+            result.update(is_correct=False, score=0, question_answer="Câu hỏi hay! Hãy xem lại các sự kiện đã biết.")
+        return result
+    if '"new_illustration_steps"' in prompt:
+        return {"new_facts": [], "new_illustration_steps": []}
+    if '"input_type"' in prompt:
+        input_type = _classify_input(_user_input(prompt))
+        return {"input_type": input_type, "confidence": 90, "explanation": "stub classification"}
+    if '"is_correct"' in prompt:
+        return _evaluation(_classify_input(_user_input(prompt)))
+    if '"problem_text"' in prompt:
+        return {
+            "problem_text": "Cho tam giác ABC vuông tại A có AB=3, AC=4. a) Tính BC.",
+            "illustration_description": "",
+            "has_text_in_image": True,
+            "has_illustration_in_image": False,
+        }
+    return None
+
+
+def generate_stub_response(prompt: str, reasoning_steps: int = 3) -> str:
+    """Produce the stub model's response text for a prompt."""
+    structured = _structured_response(prompt, reasoning_steps)
+    if structured is not None:
+        return json.dumps(structured, ensure_ascii=False)
+    if "Học sinh hỏi:" in prompt:
+        return "Câu hỏi hay! Hãy xem lại các sự kiện đã biết và định lý liên quan."
+    return f"💡 Gợi ý: hãy bắt đầu từ các sự kiện đã biết để giải quyết \"{_current_question(prompt)}\"."
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model that answers from canned, schema-valid responses without network access."""
+
+    model_name: str = STUB_MODEL_PREFIX
+    latency_ms: float = 200.0
+    latency_jitter_ms: float = 50.0
+    latency_distribution: str = "normal"
+    failure_rate: float = 0.0
+    malformed_rate: float = 0.0
+    reasoning_steps: int = 3
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name}
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        """Build the result for a call, raising injected failures."""
+        if _roll(self.failure_rate):
+            raise StubLLMError("429 Resource has been exhausted (injected by stub LLM)")
+
+        prompt = message_text(messages)
+        text = generate_stub_response(prompt, self.reasoning_steps)
+        if _roll(self.malformed_rate):
+            text = text[: len(text) // 2]
+
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _latency(self) -> float:
+        return _sample_latency(self.latency_ms, self.latency_jitter_ms, self.latency_distribution)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._latency())
+        return self._respond(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._latency())
+        return self._respond(messages)
+
+
+class _StubGeneration:
+    """Minimal stand-in for a google.generativeai response."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Stand-in for google.generativeai.GenerativeModel used by the visualization tool."""
+
+    _ASYMPTOTE_CODE = """unitsize(1cm);
+pair A = (0,0), B = (4,0), C = (0,3);
+draw(A--B--C--cycle);
+label("$A$", A, SW); label("$B$", B, SE); label("$C$", C, N);
+"""
+
+    def __init__(self, model: Optional[StubChatModel] = None):
+        self.model = model or create_stub_llm()
+
+    def generate_content(self, prompt: str) -> _StubGeneration:
+        time.sleep(self.model._latency())
+        if _roll(self.model.failure_rate):
+            raise StubLLMError("503 Service unavailable (injected by stub LLM)")
+        if "Asymptote code" in prompt:
+            return _StubGeneration(self._ASYMPTOTE_CODE)
+        return _StubGeneration(json.dumps({"steps": ["Vẽ tam giác ABC"]}, ensure_ascii=False))
+
+
+def create_stub_llm(
+    model_name: str = STUB_MODEL_PREFIX, callbacks: Optional[list] = None, rate_limiter: Any = None
+) -> StubChatModel:
+    """Create a stub chat model configured from the STUB_LLM_* settings."""
+    settings = get_settings()
+    return StubChatModel(
+        model_name=model_name,
+        callbacks=callbacks,
+        rate_limiter=rate_limiter,
+        latency_ms=settings.stub_llm_latency_ms,
+        latency_jitter_ms=settings.stub_llm_latency_jitter_ms,
+        latency_distribution=settings.stub_llm_latency_distribution,
+        failure_rate=settings.stub_llm_failure_rate,
+        malformed_rate=settings.stub_llm_malformed_rate,
+        reasoning_steps=settings.stub_llm_reasoning_steps,
+    )
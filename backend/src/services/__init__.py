@@ -3,12 +3,16 @@ Services package for the AI Geometry Tutor.
 Contains business logic services separated from API controllers and tutor classes.
 """
 
+from .idempotency_service import IdempotencyService
+from .job_service import JobService
 from .llm_service import LLMService
 from .session_service import SessionService
 from .tutor_service import TutorService
 from .visualization_service import VisualizationService
 
 __all__ = [
+    "IdempotencyService",
+    "JobService",
     "LLMService",
     "SessionService", 
     "TutorService",
@@ -0,0 +1,123 @@
+"""
+Idempotency Service for retried mutating requests.
+Replays the stored response of a request repeated with the same Idempotency-Key.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+# Longest accepted Idempotency-Key header value
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyError(ValueError):
+    """Raised when a key is malformed or reused for a different request."""
+
+
+class IdempotencyService:
+    """
+    Service remembering the responses of requests sent with an Idempotency-Key.
+
+    A repeated key within the TTL gets the stored response without running the
+    handler again; a repeat that arrives while the first request is still
+    running waits for it and shares its result, or runs the handler itself if
+    the first request is cancelled. Only successful responses are stored, so a
+    failed request can be retried. Keys are scoped per route and
+    must always be sent with the same request body.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0, max_keys: int = 10000):
+        """
+        Initialize the idempotency service.
+
+        Args:
+            ttl_seconds: How long a stored response is replayed
+            max_keys: Maximum number of stored responses (least recently used are evicted)
+        """
+        self._responses: TTLCache = TTLCache(maxsize=max_keys, ttl=ttl_seconds)
+        self._in_flight: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+        self.replayed = 0
+        self.joined = 0
+
+    @staticmethod
+    def fingerprint(payload: str) -> str:
+        """Hash of a request body, used to detect a key reused for another request."""
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """
+        Run handler once per (scope, key).
+
+        Args:
+            scope: Route (and session) the key belongs to
+            key: Idempotency-Key header value; without one the handler always runs
+            fingerprint: Fingerprint of the request body
+            handler: Coroutine function producing the response
+
+        Returns:
+            The response and whether it was replayed rather than produced now
+
+        Raises:
+            IdempotencyKeyError: If the key is too long or was used for a different body
+        """
+        if not key:
+            return await handler(), False
+        if len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyKeyError(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+        cache_key = (scope, key)
+        while True:
+            stored = self._responses.get(cache_key)
+            in_flight = self._in_flight.get(cache_key)
+            if stored is not None or in_flight is None:
+                break
+            if in_flight[0] != fingerprint:
+                raise IdempotencyKeyError("Idempotency-Key was already used with a different request")
+            self.joined += 1
+            stored = await asyncio.shield(in_flight[1])
+            if stored is not None:
+                break
+            # The running request was cancelled: run the handler (or join whoever does) now
+        if stored is not None:
+            stored_fingerprint, response = stored
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyError("Idempotency-Key was already used with a different request")
+            self.replayed += 1
+            return response, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = (fingerprint, future)
+        try:
+            response = await handler()
+            self._responses[cache_key] = (fingerprint, response)
+            future.set_result((fingerprint, response))
+            return response, False
+        except Exception as e:
+            # Concurrent duplicates fail the same way; nothing is stored
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled: waiting duplicates take over instead of failing with it
+            future.set_result(None)
+            raise
+        finally:
+            del self._in_flight[cache_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store counters for the /stats endpoint."""
+        return {
+            "stored": len(self._responses),
+            "in_flight": len(self._in_flight),
+            "replayed": self.replayed,
+            "joined": self.joined,
+        }
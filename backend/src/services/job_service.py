@@ -0,0 +1,192 @@
+"""
+Job Service for asynchronous session creation.
+Runs OCR, parsing and solving in the background and tracks per-stage progress.
+"""
+
+import time
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from cachetools import TTLCache
+from starlette.concurrency import run_in_threadpool
+
+from src.shared.affinity import new_affinity_id
+from src.shared.logging import get_logger
+from src.shared.tracing import bind_progress, bind_session, detached_context
+from .session_service import SessionService
+
+logger = get_logger("jobs")
+
+# Stages after which the session's questions can be shown (unless the job failed)
+INTERACTIVE_STAGES = ("solving", "done")
+
+
+class Job:
+    """
+    Progress of one background session creation.
+
+    Updated from worker threads through report(); coroutines wait for changes
+    with wait_for_change() (used by the SSE stream).
+    """
+
+    def __init__(self, session_id: str, loop: asyncio.AbstractEventLoop):
+        self.job_id = new_affinity_id()
+        self.session_id = session_id
+        self.status = "queued"
+        self.stage = "queued"
+        self.step = 0
+        self.total = 0
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, **fields: Any) -> None:
+        """Change job fields (from any thread) and wake up waiters."""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.updated_at = time.time()
+            self.version += 1
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def report(self, stage: str, step: int = 0, total: int = 0) -> None:
+        """Progress callback bound while the pipeline runs."""
+        self.update(status="running", stage=stage, step=step, total=total)
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, version: int, timeout: float) -> bool:
+        """Wait until the job changes past version; False if timeout expired first."""
+        while self.version == version:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "session_id": self.session_id,
+                "status": self.status,
+                "stage": self.stage,
+                "step": self.step,
+                "total": self.total,
+                "interactive": self.status != "failed" and self.stage in INTERACTIVE_STAGES,
+                "error": self.error,
+                "result": self.result,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+
+class JobService:
+    """
+    Service running session creation in the background.
+
+    The session exists (with its ID) as soon as the job is submitted. The job
+    holds the session lock while the pipeline runs, so hint and validation
+    requests sent early wait for it; /status and /illustration show the
+    questions once parsing is done. A failed job deletes its session.
+    """
+
+    def __init__(self, session_service: SessionService, max_concurrent: int = 4, ttl_seconds: float = 3600.0):
+        """
+        Initialize the job service.
+
+        Args:
+            session_service: Service owning the sessions the jobs create
+            max_concurrent: Jobs running the pipeline at the same time; others stay queued
+            ttl_seconds: How long finished jobs can still be queried
+        """
+        self.session_service = session_service
+        self.max_concurrent = max_concurrent
+        self._jobs: TTLCache = TTLCache(maxsize=10000, ttl=ttl_seconds)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def submit(
+        self,
+        problem_text: str = "",
+        image_b64: Optional[str] = None,
+        ocr: Optional[Callable[[str], Awaitable[str]]] = None,
+    ) -> Job:
+        """
+        Register a session and start creating it in the background.
+
+        Args:
+            problem_text: Problem text (ignored when an image is given)
+            image_b64: Base64 image to extract the problem text from first
+            ocr: Coroutine function extracting problem text from image_b64
+
+        Returns:
+            The queued job
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        session_id, tutor = self.session_service.register_session()
+        job = Job(session_id, asyncio.get_running_loop())
+        self._jobs[job.job_id] = job
+
+        # Keep the session binding, not the submitting request's trace
+        task = detached_context().run(
+            asyncio.ensure_future, self._run(job, tutor, problem_text, image_b64, ocr)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, tutor, problem_text: str, image_b64: Optional[str], ocr) -> None:
+        try:
+            async with self.session_service.lock_session(job.session_id):
+                async with self._semaphore:
+                    if image_b64 is not None:
+                        job.report("ocr")
+                        problem_text = await ocr(image_b64)
+                        if not problem_text.strip():
+                            raise ValueError("Failed to extract problem text from image")
+
+                    bind_session(job.session_id, tutor.ledger)
+                    bind_progress(job.report)
+                    result = await run_in_threadpool(tutor.start_problem, problem_text)
+
+            if not result["success"]:
+                raise ValueError(result["error"])
+            job.update(
+                status="succeeded",
+                stage="done",
+                result={
+                    "total_questions": result.get("total_questions", 0),
+                    "current_question": result.get("current_question", ""),
+                },
+            )
+        except Exception as e:
+            logger.warning("Session creation job %s failed: %s", job.job_id, e)
+            self.session_service.delete_session(job.session_id)
+            job.update(status="failed", error=str(e))
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID (finished jobs expire after the TTL)."""
+        return self._jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Job counters for the /stats endpoint."""
+        jobs = list(self._jobs.values())
+        statuses: Dict[str, int] = {}
+        for job in jobs:
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {"jobs": len(jobs), "statuses": statuses, "max_concurrent": self.max_concurrent}
@@ -3,16 +3,54 @@ Session Service for managing tutoring sessions.
 Handles session creation, storage, and lifecycle management.
 """
 
-import uuid
-from typing import Dict, Any, Optional, List
+import os
+import json
+import time
+import zlib
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Collection, Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 
-from src.api.api_tutor import ApiGeometryTutor
+from starlette.concurrency import run_in_threadpool
+
+from src.api.api_tutor import ApiGeometryTutor, set_background_publisher
+from src.shared import metrics
+from src.shared.affinity import new_affinity_id
+from src.shared.config import get_settings
+from src.shared.exceptions import SessionBusyError
+from src.shared.logging import get_logger
+from src.shared.tracing import bind_session, get_session_id, record_queue_wait
+
+
+logger = get_logger("sessions")
+
+# File name suffix of hibernated session snapshots
+HIBERNATION_SUFFIX = ".json.z"
+
+# Seconds a stored last_activity may lag behind reads before a read rewrites it
+SESSION_TOUCH_INTERVAL = 30.0
+
+
+def dump_tutor(tutor: ApiGeometryTutor) -> bytes:
+    """Compressed snapshot of a tutor (see ApiGeometryTutor.to_snapshot)."""
+    return zlib.compress(json.dumps(tutor.to_snapshot(), ensure_ascii=False).encode("utf-8"))
+
+
+def load_tutor(data: bytes) -> ApiGeometryTutor:
+    """Rebuild a tutor from dump_tutor() output."""
+    return ApiGeometryTutor.from_snapshot(json.loads(zlib.decompress(data)))
 
 
 class SessionRepository(ABC):
     """Abstract base class for session storage implementations."""
+
+    # Whether reads and saves do disk or database I/O (run off the event loop)
+    blocking = False
     
     @abstractmethod
     def create_session(self, session_id: str, tutor: ApiGeometryTutor) -> None:
@@ -44,13 +82,47 @@ class SessionRepository(ABC):
         """List all active sessions."""
         pass
 
+    def save_session(self, session_id: str) -> None:
+        """Persist changes made to a session's tutor (no-op for in-process storage)."""
+        pass
+
+    def hibernate_idle_sessions(self, busy: Collection[str] = ()) -> int:
+        """Drop idle sessions (except busy ones) from memory; returns how many."""
+        return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Storage counters for the /stats endpoint."""
+        return {}
+
 
 class InMemorySessionRepository(SessionRepository):
-    """In-memory implementation of session repository."""
+    """
+    In-memory implementation of session repository.
+
+    Sessions idle for longer than hibernate_after can be spilled to disk by
+    hibernate_idle_sessions(): the tutor is written to hibernate_dir as a
+    compressed snapshot and dropped from memory, and the next get_session
+    restores it. Hibernation may run on a worker thread while requests use
+    the repository on the event loop; _lock orders the hand-over of a tutor.
+    """
     
-    def __init__(self, session_timeout: timedelta = timedelta(hours=2)):
+    def __init__(
+        self,
+        session_timeout: timedelta = timedelta(hours=2),
+        hibernate_after: Optional[timedelta] = None,
+        hibernate_dir: Optional[str] = None,
+    ):
         self.sessions: Dict[str, Dict[str, Any]] = {}
         self.session_timeout = session_timeout
+        self.hibernate_after = hibernate_after
+        # A private temporary directory is created on first use if unset
+        self.hibernate_dir = hibernate_dir
+        self.hibernation_stats = {
+            "hibernated": 0, "restored": 0, "failed": 0, "hibernate_seconds": 0.0, "restore_seconds": 0.0,
+        }
+        self._lock = threading.RLock()
+        # Restoring a hibernated session reads its snapshot from disk
+        self.blocking = hibernate_after is not None
     
     def create_session(self, session_id: str, tutor: ApiGeometryTutor) -> None:
         """Store a new session."""
@@ -63,24 +135,34 @@ class InMemorySessionRepository(SessionRepository):
     
     def get_session(self, session_id: str) -> Optional[ApiGeometryTutor]:
         """Retrieve a session by ID, return None if not found or expired."""
-        if session_id not in self.sessions:
-            return None
-        
-        session = self.sessions[session_id]
-        
-        # Check if session is expired
-        if datetime.now() - session["last_activity"] > self.session_timeout:
-            self.delete_session(session_id)
-            return None
-        
-        # Update last activity
-        session["last_activity"] = datetime.now()
-        return session["tutor"]
+        with self._lock:
+            if session_id not in self.sessions:
+                return None
+
+            session = self.sessions[session_id]
+
+            # Check if session is expired
+            if datetime.now() - session["last_activity"] > self.session_timeout:
+                self.delete_session(session_id)
+                return None
+
+            if session["tutor"] is None:
+                session["tutor"] = self._restore(session_id)
+                if session["tutor"] is None:
+                    del self.sessions[session_id]
+                    return None
+
+            # Update last activity
+            session["last_activity"] = datetime.now()
+            return session["tutor"]
     
     def delete_session(self, session_id: str) -> None:
         """Delete a session."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        with self._lock:
+            if session_id in self.sessions:
+                session = self.sessions.pop(session_id)
+                if session["tutor"] is None:
+                    self._remove_file(self._hibernation_path(session_id))
     
     def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions and return count of cleaned sessions."""
@@ -93,8 +175,91 @@ class InMemorySessionRepository(SessionRepository):
         
         for session_id in expired_sessions:
             self.delete_session(session_id)
+
+        # Snapshots left behind by earlier processes expire like their sessions
+        if self.hibernate_dir and os.path.isdir(self.hibernate_dir):
+            cutoff = time.time() - self.session_timeout.total_seconds()
+            for entry in os.scandir(self.hibernate_dir):
+                if entry.name.endswith(HIBERNATION_SUFFIX) and entry.stat().st_mtime < cutoff:
+                    self._remove_file(entry.path)
         
         return len(expired_sessions)
+
+    def hibernate_idle_sessions(self, busy: Collection[str] = ()) -> int:
+        """
+        Write sessions idle beyond hibernate_after to disk and drop their tutors
+        from memory. Snapshots are serialized and written without holding the
+        lock, so this can run on a worker thread; a session a request picked up
+        in the meantime stays in memory.
+        """
+        if not self.hibernate_after:
+            return 0
+
+        current_time = datetime.now()
+        hibernated = 0
+        for session_id, session in list(self.sessions.items()):
+            tutor, last_activity = session["tutor"], session["last_activity"]
+            if tutor is None or session_id in busy or current_time - last_activity <= self.hibernate_after:
+                continue
+
+            start = time.perf_counter()
+            path = self._hibernation_path(session_id)
+            try:
+                data = dump_tutor(tutor)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+            except (OSError, TypeError, ValueError, RuntimeError) as e:
+                logger.warning("Failed to hibernate session %s: %s", session_id, e)
+                self.hibernation_stats["failed"] += 1
+                continue
+
+            with self._lock:
+                if self.sessions.get(session_id) is not session or session["last_activity"] != last_activity:
+                    self._remove_file(path)
+                    continue
+                # Metadata reads must not restore the session
+                session["problem_text"] = tutor.problem_text
+                session["cost"] = tutor.ledger.to_dict()
+                session["tutor"] = None
+            elapsed = time.perf_counter() - start
+            self.hibernation_stats["hibernated"] += 1
+            self.hibernation_stats["hibernate_seconds"] += elapsed
+            metrics.session_hibernation.observe(elapsed, operation="hibernate")
+            hibernated += 1
+        return hibernated
+
+    def _restore(self, session_id: str) -> Optional[ApiGeometryTutor]:
+        start = time.perf_counter()
+        path = self._hibernation_path(session_id)
+        try:
+            with open(path, "rb") as f:
+                tutor = load_tutor(f.read())
+        except (OSError, ValueError, KeyError, zlib.error) as e:
+            logger.warning("Failed to restore hibernated session %s: %s", session_id, e)
+            self.hibernation_stats["failed"] += 1
+            return None
+        self._remove_file(path)
+
+        elapsed = time.perf_counter() - start
+        self.hibernation_stats["restored"] += 1
+        self.hibernation_stats["restore_seconds"] += elapsed
+        metrics.session_hibernation.observe(elapsed, operation="restore")
+        return tutor
+
+    def _hibernation_path(self, session_id: str) -> str:
+        if self.hibernate_dir is None:
+            self.hibernate_dir = tempfile.mkdtemp(prefix="geometry-tutor-sessions-")
+        else:
+            os.makedirs(self.hibernate_dir, exist_ok=True)
+        return os.path.join(self.hibernate_dir, session_id + HIBERNATION_SUFFIX)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
     
     def get_session_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session metadata without the tutor instance."""
@@ -102,11 +267,14 @@ class InMemorySessionRepository(SessionRepository):
             return None
         
         session = self.sessions[session_id]
+        tutor = session["tutor"]
         return {
             "session_id": session_id,
             "created_at": session["created_at"],
             "last_activity": session["last_activity"],
             "active": session["active"],
+            "problem_text": tutor.problem_text if tutor is not None else session["problem_text"],
+            "cost": tutor.ledger.to_dict() if tutor is not None else session["cost"],
         }
     
     def list_active_sessions(self) -> List[Dict[str, Any]]:
@@ -119,10 +287,377 @@ class InMemorySessionRepository(SessionRepository):
                 "created_at": session_data["created_at"].isoformat(),
                 "last_activity": session_data["last_activity"].isoformat(),
                 "active": session_data["active"],
+                "hibernated": session_data["tutor"] is None,
             })
         
         return active_sessions
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Storage counters for the /stats endpoint."""
+        stats = self.hibernation_stats
+        return {
+            "store": "memory",
+            "sessions": len(self.sessions),
+            "hibernated_sessions": sum(1 for session in self.sessions.values() if session["tutor"] is None),
+            "hibernations": stats["hibernated"],
+            "restores": stats["restored"],
+            "hibernation_failures": stats["failed"],
+            "avg_hibernate_ms": (
+                round(stats["hibernate_seconds"] / stats["hibernated"] * 1000, 3) if stats["hibernated"] else 0.0
+            ),
+            "avg_restore_ms": (
+                round(stats["restore_seconds"] / stats["restored"] * 1000, 3) if stats["restored"] else 0.0
+            ),
+        }
+
+
+class SqliteSessionRepository(SessionRepository):
+    """
+    Session repository in a SQLite file shared by several API worker processes.
+
+    Each session is stored as a compressed tutor snapshot together with its
+    state version. Workers keep the tutors they have loaded in memory and only
+    rehydrate one when another worker saved a newer version. Saves are
+    optimistic: a save based on an outdated version raises SessionBusyError
+    instead of overwriting the other worker's change.
+
+    Loads are counted as hits (tutor already warm in this worker), misses
+    (first load here) and stale (reloaded because another worker changed the
+    session); behind the affinity router stale loads should only follow a
+    failover.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        db_path: str,
+        session_timeout: timedelta = timedelta(hours=2),
+        hibernate_after: Optional[timedelta] = None,
+    ):
+        self.db_path = db_path
+        self.session_timeout = session_timeout
+        self.hibernate_after = hibernate_after
+        # session_id -> (tutor, version stored in the database)
+        self._local: Dict[str, Tuple[ApiGeometryTutor, int]] = {}
+        # session_id -> when this worker last used the tutor (time.monotonic)
+        self._used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "stale": 0, "saves": 0, "conflicts": 0, "evicted": 0}
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                state BLOB NOT NULL,
+                state_version INTEGER NOT NULL,
+                problem_text TEXT NOT NULL,
+                cost TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_activity REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def _expired(self, last_activity: float) -> bool:
+        return time.time() - last_activity > self.session_timeout.total_seconds()
+
+    def create_session(self, session_id: str, tutor: ApiGeometryTutor) -> None:
+        """Store a new session."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    dump_tutor(tutor),
+                    tutor.state_version,
+                    tutor.problem_text,
+                    json.dumps(tutor.ledger.to_dict()),
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._local[session_id] = (tutor, tutor.state_version)
+            self._used[session_id] = time.monotonic()
+
+    def get_session(self, session_id: str) -> Optional[ApiGeometryTutor]:
+        """Retrieve a session by ID, loading it if another worker changed it."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state_version, last_activity FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                self._local.pop(session_id, None)
+                self._used.pop(session_id, None)
+                return None
+            version, last_activity = row
+            if self._expired(last_activity):
+                self._delete_locked(session_id)
+                return None
+
+            # Expiry works in hours: a read only rewrites last_activity once it is stale
+            now = time.time()
+            if now - last_activity > SESSION_TOUCH_INTERVAL:
+                self._conn.execute(
+                    "UPDATE sessions SET last_activity = ? WHERE session_id = ?", (now, session_id)
+                )
+                self._conn.commit()
+
+            local = self._local.get(session_id)
+            result = "miss" if local is None else "hit" if local[1] == version else "stale"
+            self.stats[result] += 1
+            metrics.cache_requests.inc(cache="session_store", result=result)
+            if result == "hit":
+                self._used[session_id] = time.monotonic()
+                return local[0]
+            state, version = self._conn.execute(
+                "SELECT state, state_version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+
+        # Rebuilding the tutor does not need the database
+        tutor = load_tutor(state)
+        with self._lock:
+            self._local[session_id] = (tutor, version)
+            self._used[session_id] = time.monotonic()
+        return tutor
+
+    def save_session(self, session_id: str) -> None:
+        """
+        Write the worker's tutor back if its state changed since it was loaded.
+
+        Raises:
+            SessionBusyError: If another worker saved the session in the meantime
+        """
+        with self._lock:
+            local = self._local.get(session_id)
+            if local is None or local[0].state_version == local[1]:
+                return
+            tutor, stored_version = local
+            cursor = self._conn.execute(
+                """UPDATE sessions SET state = ?, state_version = ?, problem_text = ?, cost = ?,
+                   last_activity = ? WHERE session_id = ? AND state_version = ?""",
+                (
+                    dump_tutor(tutor),
+                    tutor.state_version,
+                    tutor.problem_text,
+                    json.dumps(tutor.ledger.to_dict()),
+                    time.time(),
+                    session_id,
+                    stored_version,
+                ),
+            )
+            self._conn.commit()
+            if cursor.rowcount:
+                self.stats["saves"] += 1
+                self._local[session_id] = (tutor, tutor.state_version)
+                self._used[session_id] = time.monotonic()
+                return
+            self.stats["conflicts"] += 1
+            # Lost the race: the next get_session loads the other worker's version
+            del self._local[session_id]
+            self._used.pop(session_id, None)
+        raise SessionBusyError("Phiên học vừa được cập nhật bởi một yêu cầu khác, vui lòng thử lại")
+
+    def hibernate_idle_sessions(self, busy: Collection[str] = ()) -> int:
+        """
+        Drop tutors this worker has not used for hibernate_after from memory.
+        They are already in the database (unsaved ones are kept); the next
+        get_session loads them again.
+        """
+        if not self.hibernate_after:
+            return 0
+        cutoff = time.monotonic() - self.hibernate_after.total_seconds()
+        with self._lock:
+            idle = [
+                session_id
+                for session_id, (tutor, version) in self._local.items()
+                if self._used.get(session_id, 0.0) < cutoff
+                and session_id not in busy
+                and tutor.state_version == version
+            ]
+            for session_id in idle:
+                del self._local[session_id]
+                self._used.pop(session_id, None)
+            self.stats["evicted"] += len(idle)
+        return len(idle)
+
+    def _delete_locked(self, session_id: str) -> None:
+        self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._conn.commit()
+        self._local.pop(session_id, None)
+        self._used.pop(session_id, None)
+
+    def delete_session(self, session_id: str) -> None:
+        """Delete a session."""
+        with self._lock:
+            self._delete_locked(session_id)
+
+    def cleanup_expired_sessions(self) -> int:
+        """Clean up expired sessions and return count of cleaned sessions."""
+        cutoff = time.time() - self.session_timeout.total_seconds()
+        with self._lock:
+            expired = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT session_id FROM sessions WHERE last_activity < ?", (cutoff,)
+                )
+            ]
+            self._conn.execute("DELETE FROM sessions WHERE last_activity < ?", (cutoff,))
+            self._conn.commit()
+            for session_id in expired:
+                self._local.pop(session_id, None)
+                self._used.pop(session_id, None)
+        return len(expired)
+
+    def get_session_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session metadata without the tutor instance."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT problem_text, cost, created_at, last_activity FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        problem_text, cost, created_at, last_activity = row
+        return {
+            "session_id": session_id,
+            "created_at": datetime.fromtimestamp(created_at),
+            "last_activity": datetime.fromtimestamp(last_activity),
+            "active": True,
+            "problem_text": problem_text,
+            "cost": json.loads(cost),
+        }
+
+    def list_active_sessions(self) -> List[Dict[str, Any]]:
+        """List all active sessions."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, created_at, last_activity FROM sessions ORDER BY created_at"
+            ).fetchall()
+        return [
+            {
+                "session_id": session_id,
+                "created_at": datetime.fromtimestamp(created_at).isoformat(),
+                "last_activity": datetime.fromtimestamp(last_activity).isoformat(),
+                "active": True,
+            }
+            for session_id, created_at, last_activity in rows
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Storage counters for the /stats endpoint."""
+        with self._lock:
+            stats = dict(self.stats)
+            loaded = len(self._local)
+        loads = stats["hit"] + stats["miss"] + stats["stale"]
+        return {
+            "store": "sqlite",
+            "loaded_sessions": loaded,
+            **stats,
+            "hit_rate": round(stats["hit"] / loads, 4) if loads else 0.0,
+        }
+
+
+class SessionLockManager:
+    """
+    Per-session locks serializing mutating operations (hint, validate,
+    solution) on the event loop.
+
+    In "queue" mode an overlapping request waits for the running one, up to
+    the timeout; in "reject" mode it fails immediately. Either way a request
+    that does not get the lock raises SessionBusyError. Locks are created on
+    first use and dropped once no request holds or waits for them.
+    """
+
+    def __init__(self, mode: str = "queue", timeout: float = 30.0):
+        self.mode = mode
+        self.timeout = timeout
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+        self.acquired = 0
+        self.contended = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[float]:
+        """Hold the session's lock for the block; yields the time spent waiting for it."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+
+        # Count holders and waiters rather than lock.locked(): an earlier request
+        # may not have completed its acquire yet
+        if self._users.get(session_id):
+            self.contended += 1
+            if self.mode == "reject":
+                self._reject("busy")
+
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        try:
+            start = time.perf_counter()
+            if not await self._acquire(lock):
+                self._reject("timeout")
+            waited = time.perf_counter() - start
+            self.acquired += 1
+            self.wait_seconds += waited
+            record_queue_wait("session_lock", waited)
+            try:
+                yield waited
+            finally:
+                lock.release()
+        finally:
+            self._users[session_id] -= 1
+            if not self._users[session_id]:
+                del self._users[session_id]
+                del self._locks[session_id]
+
+    async def _acquire(self, lock: asyncio.Lock) -> bool:
+        """
+        Acquire lock within the timeout. wait_for(lock.acquire()) can time out
+        (or be cancelled) just after the acquire completed on Python < 3.12 and
+        leave the lock held forever (bpo-42130); here an acquire that completes
+        after we gave up releases the lock again.
+        """
+        acquire = asyncio.ensure_future(lock.acquire())
+        acquired = False
+        try:
+            done, _ = await asyncio.wait({acquire}, timeout=self.timeout)
+            acquired = bool(done)
+            return acquired
+        finally:
+            if not acquired:
+
+                def _release_late(task: "asyncio.Future[bool]") -> None:
+                    if not task.cancelled() and task.exception() is None:
+                        lock.release()
+
+                acquire.cancel()
+                acquire.add_done_callback(_release_late)
+
+    def busy_sessions(self) -> Collection[str]:
+        """Sessions a request currently holds or waits for."""
+        return set(self._users)
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        metrics.session_lock_rejections.inc(reason=reason)
+        raise SessionBusyError("Phiên học đang xử lý một yêu cầu khác, vui lòng thử lại sau")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lock counters for the /stats endpoint."""
+        return {
+            "mode": self.mode,
+            "held_or_waiting": len(self._locks),
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / self.acquired * 1000, 3) if self.acquired else 0.0,
+        }
+
 
 class SessionService:
     """
@@ -135,9 +670,24 @@ class SessionService:
         Initialize the session service.
         
         Args:
-            repository: Session repository implementation. Defaults to InMemorySessionRepository.
+            repository: Session repository implementation. Defaults to the SQLite
+                store at SESSION_STORE_PATH when set, else InMemorySessionRepository.
         """
-        self.repository = repository or InMemorySessionRepository()
+        settings = get_settings()
+        if repository is None:
+            timeout = timedelta(hours=settings.session_timeout_hours)
+            hibernate_after = (
+                timedelta(seconds=settings.session_hibernate_after_seconds)
+                if settings.session_hibernate_after_seconds
+                else None
+            )
+            if settings.session_store_path:
+                repository = SqliteSessionRepository(settings.session_store_path, timeout, hibernate_after)
+            else:
+                repository = InMemorySessionRepository(timeout, hibernate_after, settings.session_hibernate_dir)
+        self.repository = repository
+        self.locks = SessionLockManager(settings.session_lock_mode, settings.session_lock_timeout)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
     
     def create_session(self, problem_text: str) -> Dict[str, Any]:
         """
@@ -150,14 +700,7 @@ class SessionService:
             Dictionary with session creation result
         """
         try:
-            # Create tutor instance
-            tutor = ApiGeometryTutor()
-            
-            # Generate unique session ID
-            session_id = str(uuid.uuid4())
-            
-            # Store session
-            self.repository.create_session(session_id, tutor)
+            session_id, tutor = self.register_session()
             
             # Start the problem
             result = tutor.start_problem(problem_text)
@@ -169,6 +712,8 @@ class SessionService:
                     "error": result["error"]
                 }
             
+            self.repository.save_session(session_id)
+
             return {
                 "success": True,
                 "session_id": session_id,
@@ -182,10 +727,87 @@ class SessionService:
                 "error": f"Failed to create session: {str(e)}"
             }
     
+    def register_session(self) -> Tuple[str, ApiGeometryTutor]:
+        """
+        Create and store a tutor that has not started a problem yet.
+        
+        Returns:
+            The new session ID and its tutor
+        """
+        # Create tutor instance
+        tutor = ApiGeometryTutor()
+        
+        # Generate unique session ID (owned by this worker behind the affinity router)
+        session_id = new_affinity_id()
+        bind_session(session_id, tutor.ledger)
+        
+        # Store session
+        self.repository.create_session(session_id, tutor)
+        return session_id, tutor
+    
     def get_session(self, session_id: str) -> Optional[ApiGeometryTutor]:
         """Get a session by ID."""
-        return self.repository.get_session(session_id)
+        tutor = self.repository.get_session(session_id)
+        bind_session(session_id, tutor.ledger if tutor else None)
+        return tutor
+
+    async def load_session(self, session_id: str) -> Optional[ApiGeometryTutor]:
+        """get_session for request handlers: repositories doing I/O are read off the event loop."""
+        if self.repository.blocking:
+            tutor = await run_in_threadpool(self.repository.get_session, session_id)
+        else:
+            tutor = self.repository.get_session(session_id)
+        bind_session(session_id, tutor.ledger if tutor else None)
+        return tutor
+    
+    @asynccontextmanager
+    async def lock_session(self, session_id: str) -> AsyncIterator[float]:
+        """
+        Async context manager serializing mutations of one session; the
+        session is saved to the repository when the block exits.
+
+        Raises:
+            SessionBusyError: If the session is busy (reject mode), the wait
+                times out, or another worker changed the session meanwhile
+        """
+        async with self.locks.hold(session_id) as waited:
+            try:
+                yield waited
+            finally:
+                if self.repository.blocking:
+                    await run_in_threadpool(self.repository.save_session, session_id)
+                else:
+                    self.repository.save_session(session_id)
     
+    def attach_background_updates(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """
+        Apply results of the tutors' background work (precomputed hint ladders)
+        under the session lock on loop, so they are saved like any other
+        mutation. None detaches.
+        """
+        self._loop = loop
+        set_background_publisher(self._publish_background if loop is not None else None)
+
+    def _publish_background(self, tutor: ApiGeometryTutor, apply: Callable[[], None]) -> None:
+        # Runs in the background thread; the session binding is carried over from the request
+        session_id = get_session_id()
+        loop = self._loop
+        if session_id is None or loop is None or loop.is_closed():
+            apply()
+            return
+        asyncio.run_coroutine_threadsafe(self._apply_background(session_id, tutor, apply), loop)
+
+    async def _apply_background(self, session_id: str, tutor: ApiGeometryTutor, apply: Callable[[], None]) -> None:
+        try:
+            async with self.lock_session(session_id):
+                # Skip sessions that were deleted, hibernated or reloaded meanwhile
+                if await self.load_session(session_id) is tutor:
+                    apply()
+        except SessionBusyError as e:
+            logger.info("Dropped background update of session %s: %s", session_id, e)
+        except Exception as e:
+            logger.warning("Background update of session %s failed: %s", session_id, e)
+
     def delete_session(self, session_id: str) -> Dict[str, Any]:
         """
         Delete a session.
@@ -216,6 +838,24 @@ class SessionService:
     def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions and return count."""
         return self.repository.cleanup_expired_sessions()
+
+    def hibernate_idle_sessions(self) -> int:
+        """
+        Spill sessions idle beyond SESSION_HIBERNATE_AFTER_SECONDS out of
+        memory; sessions a request is working on are left alone.
+        """
+        return self.repository.hibernate_idle_sessions(busy=self.locks.busy_sessions())
+
+    async def run_maintenance(self, interval: float = 60.0) -> None:
+        """Expire and hibernate idle sessions every interval seconds (runs until cancelled)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.cleanup_expired_sessions()
+                # Serializing and writing snapshots is slow: keep it off the event loop
+                await run_in_threadpool(self.repository.hibernate_idle_sessions, self.locks.busy_sessions())
+            except Exception as e:
+                logger.warning("Session maintenance failed: %s", e)
     
     def list_active_sessions(self) -> Dict[str, Any]:
         """List all active sessions."""
@@ -225,6 +865,80 @@ class SessionService:
             "sessions": sessions
         }
     
+    def get_cost_report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Aggregate the cost ledgers of all active sessions.
+
+        Args:
+            top: Number of most expensive sessions and problems to list
+
+        Returns:
+            Totals, per-node wall time, and the sessions and problems with the
+            highest token usage
+        """
+        costs = []
+        for session in self.repository.list_active_sessions():
+            metadata = self.repository.get_session_metadata(session["session_id"])
+            if metadata:
+                costs.append(metadata)
+
+        totals: Dict[str, Any] = {}
+        node_seconds: Dict[str, float] = {}
+        problems: Dict[str, Dict[str, Any]] = {}
+        for metadata in costs:
+            cost = metadata["cost"]
+            for key, value in cost.items():
+                if key != "node_seconds":
+                    totals[key] = totals.get(key, 0) + value
+            for node, seconds in cost["node_seconds"].items():
+                node_seconds[node] = node_seconds.get(node, 0.0) + seconds
+
+            problem = problems.setdefault(
+                metadata["problem_text"], {"sessions": 0, "total_tokens": 0, "llm_calls": 0, "llm_seconds": 0.0}
+            )
+            problem["sessions"] += 1
+            problem["total_tokens"] += cost["prompt_tokens"] + cost["completion_tokens"]
+            problem["llm_calls"] += cost["llm_calls"]
+            problem["llm_seconds"] += cost["llm_seconds"]
+
+        def _total_tokens(metadata: Dict[str, Any]) -> int:
+            return metadata["cost"]["prompt_tokens"] + metadata["cost"]["completion_tokens"]
+
+        top_sessions = sorted(costs, key=_total_tokens, reverse=True)[:top]
+        top_problems = sorted(
+            problems.items(), key=lambda item: item[1]["total_tokens"] / item[1]["sessions"], reverse=True
+        )[:top]
+
+        return {
+            "sessions": len(costs),
+            "totals": {key: round(value, 3) for key, value in totals.items()},
+            "node_seconds": {
+                node: round(seconds, 3)
+                for node, seconds in sorted(node_seconds.items(), key=lambda item: -item[1])
+            },
+            "top_sessions": [
+                {
+                    "session_id": metadata["session_id"],
+                    "problem": metadata["problem_text"][:120],
+                    "total_tokens": _total_tokens(metadata),
+                    "llm_calls": metadata["cost"]["llm_calls"],
+                    "llm_seconds": metadata["cost"]["llm_seconds"],
+                    "render_jobs": metadata["cost"]["render_jobs"],
+                }
+                for metadata in top_sessions
+            ],
+            "top_problems": [
+                {
+                    "problem": problem_text[:120],
+                    "sessions": stats["sessions"],
+                    "avg_tokens": round(stats["total_tokens"] / stats["sessions"]),
+                    "avg_llm_calls": round(stats["llm_calls"] / stats["sessions"], 1),
+                    "avg_llm_seconds": round(stats["llm_seconds"] / stats["sessions"], 3),
+                }
+                for problem_text, stats in top_problems
+            ],
+        }
+
     def session_exists(self, session_id: str) -> bool:
         """Check if a session exists and is active."""
         return self.get_session(session_id) is not None
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Session affinity for multi-worker deployments.
+
+scripts/run_api_server.py --workers N starts each worker on its own port behind
+a small front router (src/api/affinity_router.py). The router sends every
+request that names a session or job to the worker owning that ID on a
+consistent-hash ring, so a session stays on one worker with its tutor warm in
+memory. Workers create session and job IDs that hash to themselves, which keeps
+a new session on the worker that created it. When a worker is down its IDs
+move to the next worker on the ring, which loads the sessions from the shared
+session store.
+"""
+
+import re
+import json
+import uuid
+import bisect
+import hashlib
+from functools import lru_cache
+from typing import Collection, List, Optional
+from urllib.parse import parse_qs
+
+from .config import get_settings
+
+# Points per worker on the ring; more points spread IDs more evenly
+RING_REPLICAS = 256
+
+_ID_PATH = re.compile(r"^/(?:sessions|jobs)/([^/]+)")
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring over workers 0..nodes-1."""
+
+    def __init__(self, nodes: int, replicas: int = RING_REPLICAS):
+        self.nodes = nodes
+        points = sorted(
+            (_hash(f"worker-{node}-{replica}"), node) for node in range(nodes) for replica in range(replicas)
+        )
+        self._points: List[int] = [point for point, _ in points]
+        self._owners: List[int] = [node for _, node in points]
+
+    def node_for(self, key: str, down: Collection[int] = ()) -> Optional[int]:
+        """Worker owning key, skipping workers that are down; None if all are."""
+        start = bisect.bisect(self._points, _hash(key))
+        for offset in range(len(self._points)):
+            node = self._owners[(start + offset) % len(self._points)]
+            if node not in down:
+                return node
+        return None
+
+
+@lru_cache()
+def get_ring(nodes: int) -> HashRing:
+    """Shared ring for a worker count (identical in the router and every worker)."""
+    return HashRing(nodes)
+
+
+def new_affinity_id() -> str:
+    """
+    New random session or job ID. Behind the affinity router the ID is drawn
+    until it hashes to this worker (about AFFINITY_WORKER_COUNT draws).
+    """
+    try:
+        settings = get_settings()
+        count, index = settings.affinity_worker_count, settings.affinity_worker_index
+    except Exception:
+        count, index = 0, 0
+    if count <= 1:
+        return str(uuid.uuid4())
+
+    ring = get_ring(count)
+    while True:
+        candidate = str(uuid.uuid4())
+        if ring.node_for(candidate) == index:
+            return candidate
+
+
+def affinity_key(
+    path: str, query_string: str, body: bytes, idempotency_key: Optional[str] = None
+) -> Optional[str]:
+    """
+    Session or job ID a request is about: from the path (/sessions/{id},
+    /jobs/{id}/...), the session_id query parameter, or a JSON body's
+    session_id field. Requests not tied to a session are keyed by their
+    Idempotency-Key, so a retried POST /sessions reaches the worker that
+    remembers the first attempt. None for other requests.
+    """
+    match = _ID_PATH.match(path)
+    if match:
+        return match.group(1)
+
+    session_id = parse_qs(query_string).get("session_id")
+    if session_id:
+        return session_id[0]
+
+    if body[:1] == b"{":
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("session_id"), str):
+            return data["session_id"]
+    if idempotency_key:
+        return f"idempotency:{idempotency_key}"
+    return None
@@ -5,7 +5,7 @@ Centralized configuration management using Pydantic Settings.
 import os
 from typing import Optional
 from functools import lru_cache
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -20,19 +20,73 @@ class Settings(BaseSettings):
     port: int = Field(default=8000, validation_alias="PORT")
     
     # LLM Configuration
-    google_api_key: str = Field(..., validation_alias="GOOGLE_API_KEY")
+    google_api_key: Optional[str] = Field(default=None, validation_alias="GOOGLE_API_KEY")
     llm_model: str = Field(default="gemini-2.0-flash-exp", validation_alias="LLM_MODEL")
     llm_temperature: float = Field(default=0.1, validation_alias="LLM_TEMPERATURE")
     max_output_tokens: int = Field(default=2048, validation_alias="MAX_OUTPUT_TOKENS")
+    # Client-side cap on LLM requests per minute per process (0 = unlimited)
+    llm_max_rpm: int = Field(default=0, validation_alias="LLM_MAX_RPM")
+
+    # Offline Stub LLM Configuration (used when LLM_MODEL starts with "stub")
+    stub_llm_latency_ms: float = Field(default=200.0, validation_alias="STUB_LLM_LATENCY_MS")
+    stub_llm_latency_jitter_ms: float = Field(default=50.0, validation_alias="STUB_LLM_LATENCY_JITTER_MS")
+    stub_llm_latency_distribution: str = Field(default="normal", validation_alias="STUB_LLM_LATENCY_DISTRIBUTION")
+    stub_llm_failure_rate: float = Field(default=0.0, validation_alias="STUB_LLM_FAILURE_RATE")
+    stub_llm_malformed_rate: float = Field(default=0.0, validation_alias="STUB_LLM_MALFORMED_RATE")
+    stub_llm_reasoning_steps: int = Field(default=3, validation_alias="STUB_LLM_REASONING_STEPS")
+    stub_llm_seed: Optional[int] = Field(default=None, validation_alias="STUB_LLM_SEED")
     
     # Session Configuration
     session_timeout_hours: int = Field(default=2, validation_alias="SESSION_TIMEOUT_HOURS")
     max_sessions: int = Field(default=100, validation_alias="MAX_SESSIONS")
+    # Overlapping mutating requests on one session: "queue" (wait) or "reject" (409)
+    session_lock_mode: str = Field(default="queue", validation_alias="SESSION_LOCK_MODE")
+    session_lock_timeout: float = Field(default=30.0, validation_alias="SESSION_LOCK_TIMEOUT")
+    # Responses replayed for retries sent with the same Idempotency-Key header
+    idempotency_ttl_seconds: float = Field(default=600.0, validation_alias="IDEMPOTENCY_TTL_SECONDS")
+    idempotency_max_keys: int = Field(default=10000, validation_alias="IDEMPOTENCY_MAX_KEYS")
+    # Background session creation (POST /sessions with async_mode)
+    job_max_concurrent: int = Field(default=4, validation_alias="JOB_MAX_CONCURRENT")
+    job_ttl_seconds: float = Field(default=3600.0, validation_alias="JOB_TTL_SECONDS")
+    # SQLite file shared by all API workers (sessions are per-process if unset)
+    session_store_path: Optional[str] = Field(default=None, validation_alias="SESSION_STORE_PATH")
+    # Idle sessions are written to disk and dropped from memory (0 = never)
+    session_hibernate_after_seconds: float = Field(default=1800.0, validation_alias="SESSION_HIBERNATE_AFTER_SECONDS")
+    session_hibernate_dir: Optional[str] = Field(default=None, validation_alias="SESSION_HIBERNATE_DIR")
+    # Position of this worker behind the affinity router (set by run_api_server.py)
+    affinity_worker_count: int = Field(default=0, validation_alias="AFFINITY_WORKER_COUNT")
+    affinity_worker_index: int = Field(default=0, validation_alias="AFFINITY_WORKER_INDEX")
+
+    # Problem Index Configuration (near-duplicate problem reuse)
+    problem_index_enabled: bool = Field(default=True, validation_alias="PROBLEM_INDEX_ENABLED")
+    problem_index_threshold: float = Field(default=0.85, validation_alias="PROBLEM_INDEX_THRESHOLD")
+    problem_index_path: Optional[str] = Field(default=None, validation_alias="PROBLEM_INDEX_PATH")
+    problem_index_max_entries: int = Field(default=5000, validation_alias="PROBLEM_INDEX_MAX_ENTRIES")
+
+    # Input Classification Configuration
+    local_classifier_enabled: bool = Field(default=True, validation_alias="LOCAL_CLASSIFIER_ENABLED")
+    local_classifier_min_confidence: int = Field(default=80, validation_alias="LOCAL_CLASSIFIER_MIN_CONFIDENCE")
+    validation_mode: str = Field(default="two_call", validation_alias="VALIDATION_MODE")
+
+    # Hint Configuration
+    hint_ladder_mode: str = Field(default="background", validation_alias="HINT_LADDER_MODE")
+
+    # Solver Configuration
+    solver_max_iterations: int = Field(default=10, validation_alias="SOLVER_MAX_ITERATIONS")
+    
+    # Prompt Context Configuration (0 disables fact-list trimming)
+    prompt_fact_token_budget: int = Field(default=800, validation_alias="PROMPT_FACT_TOKEN_BUDGET")
     
     # Asymptote Configuration
     asymptote_texpath: str = Field(default="/usr/bin", validation_alias="ASYMPTOTE_TEXPATH")
     asymptote_magickpath: str = Field(default="/usr/bin", validation_alias="ASYMPTOTE_MAGICKPATH")
     
+    # Response Compression (brotli needs the optional "brotli" package)
+    compression_enabled: bool = Field(default=True, validation_alias="COMPRESSION_ENABLED")
+    compression_min_size: int = Field(default=1024, validation_alias="COMPRESSION_MIN_SIZE")
+    compression_gzip_level: int = Field(default=6, validation_alias="COMPRESSION_GZIP_LEVEL")
+    compression_brotli_quality: int = Field(default=5, validation_alias="COMPRESSION_BROTLI_QUALITY")
+    
     # CORS Configuration
     allowed_origins: list = Field(default=["*"], validation_alias="ALLOWED_ORIGINS")
     allow_credentials: bool = Field(default=True, validation_alias="ALLOW_CREDENTIALS")
@@ -43,13 +97,26 @@ class Settings(BaseSettings):
         default="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         validation_alias="LOG_FORMAT"
     )
+    log_json: bool = Field(default=False, validation_alias="LOG_JSON")
+    log_sample_rate: float = Field(default=0.1, validation_alias="LOG_SAMPLE_RATE")
+    log_queue_size: int = Field(default=10000, validation_alias="LOG_QUEUE_SIZE")
+    log_module_levels: str = Field(default="", validation_alias="LOG_MODULE_LEVELS")
     
-    @field_validator("google_api_key")
-    def validate_api_key(cls, v):
-        """Validate that API key is provided."""
-        if not v or len(v) < 10:
+    # Session Capture (JSONL file recording sessions for scripts/replay_sessions.py)
+    session_capture_path: Optional[str] = Field(default=None, validation_alias="SESSION_CAPTURE_PATH")
+    
+    # Admin Configuration (admin endpoints are disabled while ADMIN_TOKEN is unset)
+    admin_token: Optional[str] = Field(default=None, validation_alias="ADMIN_TOKEN")
+    profiler_max_seconds: float = Field(default=60.0, validation_alias="PROFILER_MAX_SECONDS")
+    
+    @model_validator(mode="after")
+    def validate_api_key(self):
+        """Validate that API key is provided (not needed for the offline stub model)."""
+        if self.llm_model.lower().startswith("stub"):
+            return self
+        if not self.google_api_key or len(self.google_api_key) < 10:
             raise ValueError("GOOGLE_API_KEY must be provided and valid")
-        return v
+        return self
     
     @field_validator("llm_temperature")
     def validate_temperature(cls, v):
@@ -58,6 +125,23 @@ class Settings(BaseSettings):
             raise ValueError("LLM temperature must be between 0.0 and 2.0")
         return v
     
+    @field_validator("stub_llm_latency_distribution")
+    def validate_stub_llm_latency_distribution(cls, v):
+        """Validate the stub latency distribution is supported."""
+        valid_distributions = ["fixed", "uniform", "normal", "lognormal", "exponential"]
+        if v.lower() not in valid_distributions:
+            raise ValueError(
+                f"Stub LLM latency distribution must be one of: {', '.join(valid_distributions)}"
+            )
+        return v.lower()
+
+    @field_validator("stub_llm_failure_rate", "stub_llm_malformed_rate")
+    def validate_stub_llm_rate(cls, v):
+        """Validate injected failure rates are probabilities."""
+        if not 0.0 <= v <= 1.0:
+            raise ValueError("Stub LLM failure rates must be between 0.0 and 1.0")
+        return v
+
     @field_validator("session_timeout_hours")
     def validate_session_timeout(cls, v):
         """Validate session timeout is reasonable."""
@@ -65,6 +149,142 @@ class Settings(BaseSettings):
             raise ValueError("Session timeout must be between 1 and 24 hours")
         return v
     
+    @field_validator("problem_index_threshold")
+    def validate_problem_index_threshold(cls, v):
+        """Validate similarity threshold is a Jaccard ratio."""
+        if not 0.0 < v <= 1.0:
+            raise ValueError("Problem index threshold must be in (0.0, 1.0]")
+        return v
+
+    @field_validator("validation_mode")
+    def validate_validation_mode(cls, v):
+        """Validate the validation mode is supported."""
+        valid_modes = ["two_call", "combined"]
+        if v.lower() not in valid_modes:
+            raise ValueError(f"Validation mode must be one of: {', '.join(valid_modes)}")
+        return v.lower()
+
+    @field_validator("hint_ladder_mode")
+    def validate_hint_ladder_mode(cls, v):
+        """Validate the hint ladder mode is supported."""
+        valid_modes = ["off", "eager", "background"]
+        if v.lower() not in valid_modes:
+            raise ValueError(f"Hint ladder mode must be one of: {', '.join(valid_modes)}")
+        return v.lower()
+
+    @field_validator("session_lock_mode")
+    def validate_session_lock_mode(cls, v):
+        """Validate the session lock mode is supported."""
+        valid_modes = ["queue", "reject"]
+        if v.lower() not in valid_modes:
+            raise ValueError(f"Session lock mode must be one of: {', '.join(valid_modes)}")
+        return v.lower()
+
+    @field_validator("session_lock_timeout")
+    def validate_session_lock_timeout(cls, v):
+        """Validate the session lock wait limit is positive."""
+        if v <= 0:
+            raise ValueError("Session lock timeout must be > 0")
+        return v
+
+    @field_validator("idempotency_ttl_seconds")
+    def validate_idempotency_ttl_seconds(cls, v):
+        """Validate the idempotency window is positive."""
+        if v <= 0:
+            raise ValueError("Idempotency TTL seconds must be > 0")
+        return v
+
+    @field_validator("idempotency_max_keys")
+    def validate_idempotency_max_keys(cls, v):
+        """Validate the idempotency store holds at least one key."""
+        if v < 1:
+            raise ValueError("Idempotency max keys must be >= 1")
+        return v
+
+    @field_validator("job_max_concurrent")
+    def validate_job_max_concurrent(cls, v):
+        """Validate at least one background job can run."""
+        if v < 1:
+            raise ValueError("Job max concurrent must be >= 1")
+        return v
+
+    @field_validator("job_ttl_seconds")
+    def validate_job_ttl_seconds(cls, v):
+        """Validate finished jobs are kept for a positive time."""
+        if v <= 0:
+            raise ValueError("Job TTL seconds must be > 0")
+        return v
+
+    @field_validator("session_hibernate_after_seconds")
+    def validate_session_hibernate_after_seconds(cls, v):
+        """Validate the hibernation threshold is non-negative."""
+        if v < 0:
+            raise ValueError("Session hibernate after seconds must be >= 0")
+        return v
+
+    @field_validator("affinity_worker_count", "affinity_worker_index")
+    def validate_affinity_worker(cls, v):
+        """Validate the affinity worker count and index are not negative."""
+        if v < 0:
+            raise ValueError("Affinity worker count and index must be >= 0")
+        return v
+
+    @model_validator(mode="after")
+    def validate_affinity_worker_index(self):
+        """Validate this worker is one of the affinity workers."""
+        if self.affinity_worker_count and self.affinity_worker_index >= self.affinity_worker_count:
+            raise ValueError("AFFINITY_WORKER_INDEX must be lower than AFFINITY_WORKER_COUNT")
+        return self
+
+    @field_validator("compression_min_size")
+    def validate_compression_min_size(cls, v):
+        """Validate the compression threshold is non-negative."""
+        if v < 0:
+            raise ValueError("Compression min size must be >= 0")
+        return v
+
+    @field_validator("compression_gzip_level")
+    def validate_compression_gzip_level(cls, v):
+        """Validate the gzip level is one zlib accepts."""
+        if not 1 <= v <= 9:
+            raise ValueError("Compression gzip level must be between 1 and 9")
+        return v
+
+    @field_validator("compression_brotli_quality")
+    def validate_compression_brotli_quality(cls, v):
+        """Validate the brotli quality (0 disables brotli)."""
+        if not 0 <= v <= 11:
+            raise ValueError("Compression brotli quality must be between 0 and 11")
+        return v
+
+    @field_validator("solver_max_iterations")
+    def validate_solver_max_iterations(cls, v):
+        """Validate the solver step limit is positive."""
+        if v < 1:
+            raise ValueError("Solver max iterations must be >= 1")
+        return v
+
+    @field_validator("prompt_fact_token_budget")
+    def validate_prompt_fact_token_budget(cls, v):
+        """Validate the fact token budget is non-negative."""
+        if v < 0:
+            raise ValueError("Prompt fact token budget must be >= 0")
+        return v
+
+    @field_validator("llm_max_rpm")
+    def validate_llm_max_rpm(cls, v):
+        """Validate the LLM request rate cap is non-negative."""
+        if v < 0:
+            raise ValueError("LLM max RPM must be >= 0")
+        return v
+
+    @field_validator("profiler_max_seconds")
+    def validate_profiler_max_seconds(cls, v):
+        """Validate the profile duration cap is positive."""
+        if v <= 0:
+            raise ValueError("Profiler max seconds must be > 0")
+        return v
+
     @field_validator("log_level")
     def validate_log_level(cls, v):
         """Validate log level is valid."""
@@ -73,6 +293,25 @@ class Settings(BaseSettings):
             raise ValueError(f"Log level must be one of: {', '.join(valid_levels)}")
         return v.upper()
 
+    @field_validator("log_sample_rate")
+    def validate_log_sample_rate(cls, v):
+        """Validate the verbose payload sample rate is a probability."""
+        if not 0.0 <= v <= 1.0:
+            raise ValueError("Log sample rate must be between 0.0 and 1.0")
+        return v
+
+    @field_validator("log_module_levels")
+    def validate_log_module_levels(cls, v):
+        """Validate per-module levels look like "module=LEVEL,module=LEVEL"."""
+        valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+        for item in filter(None, (part.strip() for part in v.split(","))):
+            name, _, level = item.partition("=")
+            if not name.strip() or level.strip().upper() not in valid_levels:
+                raise ValueError(
+                    f"Invalid LOG_MODULE_LEVELS entry '{item}', expected module=LEVEL"
+                )
+        return v
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
@@ -26,6 +26,13 @@ class SessionError(TutorError):
         super().__init__(message, "SESSION_ERROR")
 
 
+class SessionBusyError(TutorError):
+    """Exception for a request overlapping another mutation of the same session."""
+    
+    def __init__(self, message: str):
+        super().__init__(message, "SESSION_BUSY")
+
+
 class LLMError(TutorError):
     """Exception for LLM-related errors."""
     
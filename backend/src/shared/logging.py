@@ -1,59 +1,210 @@
 """
 Centralized logging configuration.
+
+setup_logging() routes every record through a bounded in-memory queue that a
+background listener thread drains to stdout, so log I/O never runs on the
+request path. Records can be emitted as JSON, verbose payloads (reasoning
+steps, generated Asymptote programs) are sampled, and levels can be set per
+module. Records are stamped with the current session and tutor node.
 """
 
-import logging
 import sys
-from typing import Optional
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
 
 from .config import get_settings
+from .tracing import get_current_node, get_session_id
+
+# Logger for user-facing tutor output (hint banners, solutions, CLI menus)
+CONSOLE_LOGGER = "geometry_tutor.console"
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the session and node of the emitting context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = get_session_id()
+        record.node = get_current_node() or None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records marked with extra={"sampled": True}."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False):
+            return random.random() < self.rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("session_id", "node"):
+            value = getattr(record, key, None)
+            if value:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Resolve the message arguments now (they may change before the listener
+        runs) but leave formatting, including exc_info, to the listener's
+        handler so each record is formatted exactly once.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _stop_listener() -> None:
+    """Flush and stop the current listener thread (registered once with atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def _parse_module_levels(spec: str) -> Dict[str, int]:
+    """Parse "module=LEVEL,module=LEVEL" into logger levels."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = getattr(logging, level.strip().upper())
+    return levels
 
 
 def setup_logging(
     level: Optional[str] = None,
-    format_str: Optional[str] = None
+    format_str: Optional[str] = None,
+    json_output: Optional[bool] = None,
 ) -> logging.Logger:
     """
     Setup centralized logging configuration.
-    
+
     Args:
         level: Log level override
         format_str: Log format override
-        
+        json_output: Emit JSON lines instead of the text format
+
     Returns:
         Configured logger instance
     """
+    global _listener, _queue_handler
     settings = get_settings()
-    
+
     # Use provided values or fallback to settings
     log_level = level or settings.log_level
     log_format = format_str or settings.log_format
-    
+    use_json = settings.log_json if json_output is None else json_output
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if use_json else logging.Formatter(log_format))
+
+    # Replace a previous pipeline (setup_logging may be called again)
+    _stop_listener()
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(settings.log_sample_rate))
+    _queue_handler.addFilter(ContextFilter())
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
     # Configure root logger
     logging.basicConfig(
         level=getattr(logging, log_level),
-        format=log_format,
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ],
+        handlers=[_queue_handler],
         force=True  # Override any existing configuration
     )
-    
+
     # Get application logger
     logger = logging.getLogger("geometry_tutor")
     logger.setLevel(getattr(logging, log_level))
-    
+
+    # User-facing tutor output (hint banners, solutions) goes through the same
+    # non-blocking pipeline; on a server it is only useful when debugging
+    console = logging.getLogger(CONSOLE_LOGGER)
+    console.handlers = [_queue_handler]
+    console.propagate = False
+    console.setLevel(logging.DEBUG if settings.debug else logging.WARNING)
+
     # Suppress noisy third-party loggers in production
     if not settings.debug:
         logging.getLogger("httpx").setLevel(logging.WARNING)
         logging.getLogger("httpcore").setLevel(logging.WARNING)
         logging.getLogger("langchain").setLevel(logging.WARNING)
         logging.getLogger("urllib3").setLevel(logging.WARNING)
-    
+
+    for name, module_level in _parse_module_levels(settings.log_module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
     logger.info(f"Logging configured with level: {log_level}")
     return logger
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a named logger instance."""
-    return logging.getLogger(f"geometry_tutor.{name}")
\ No newline at end of file
+    return logging.getLogger(f"geometry_tutor.{name}")
+
+
+def get_console_logger() -> logging.Logger:
+    """
+    Logger for user-facing tutor output. Until setup_logging() runs (e.g. in
+    the interactive CLI) it writes plain messages straight to stdout.
+    """
+    console = logging.getLogger(CONSOLE_LOGGER)
+    if not console.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        console.addHandler(handler)
+        console.setLevel(logging.INFO)
+        console.propagate = False
+    return console
+
+
+def get_dropped_count() -> int:
+    """Number of records dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler else 0
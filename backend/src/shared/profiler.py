@@ -0,0 +1,113 @@
+"""
+Statistical stack sampler for diagnosing a live process.
+
+A daemon thread snapshots the stacks of every other thread with
+sys._current_frames() at a fixed interval and aggregates them into the
+collapsed-stack format understood by flamegraph.pl, speedscope and inferno.
+Sampling never touches the event loop, and only one profile may run per
+process at a time, so it is safe to trigger on a loaded server.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Stack depth kept per sample; deeper frames are cut at the root side
+MAX_STACK_DEPTH = 128
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame, current_line: bool = True) -> str:
+    code = frame.f_code
+    line = frame.f_lineno if current_line else code.co_firstlineno
+    return f"{code.co_name} ({code.co_filename}:{line})"
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        # Label by function, not current line, so samples merge per function
+        labels.append(_frame_label(frame, current_line=False))
+        frame = frame.f_back
+    labels.append(thread_name)
+    # Collapsed stacks are root first, separated by semicolons
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Sample all thread stacks for a fixed duration."""
+
+    def __init__(self, duration: float, interval: float):
+        self.duration = duration
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+
+    def _thread_names(self) -> Dict[int, str]:
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def run(self) -> "StackSampler":
+        """Sample until the duration elapses (blocks the calling thread)."""
+        own_ident = threading.get_ident()
+        names = self._thread_names()
+        start = time.perf_counter()
+        deadline = start + self.duration
+        while time.perf_counter() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                if ident not in names:
+                    names = self._thread_names()
+                name = names.get(ident, f"thread-{ident}").replace(";", ":")
+                self.stacks[_collapse(frame, name)] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+        self.elapsed = time.perf_counter() - start
+        return self
+
+    def collapsed(self) -> str:
+        """Render samples as "frame;frame;frame count" lines."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def run_profile(duration: float, interval: float) -> StackSampler:
+    """
+    Run one sampling profile on the current thread.
+
+    Raises:
+        ProfilerBusyError: if another profile is already running
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        return StackSampler(duration, interval).run()
+    finally:
+        _profile_lock.release()
+
+
+def dump_asyncio_tasks(loop: Optional[asyncio.AbstractEventLoop] = None, limit: int = 32) -> List[Dict[str, Any]]:
+    """
+    Describe the pending tasks of an event loop with their current stacks.
+
+    Must be called from the loop's own thread (e.g. inside an async endpoint).
+    """
+    loop = loop or asyncio.get_running_loop()
+    tasks = []
+    for task in asyncio.all_tasks(loop):
+        coro = task.get_coro()
+        tasks.append({
+            "name": task.get_name(),
+            "coro": getattr(coro, "__qualname__", repr(coro)),
+            "done": task.done(),
+            "stack": [_frame_label(frame) for frame in task.get_stack(limit=limit)],
+        })
+    return sorted(tasks, key=lambda task: task["name"])
@@ -0,0 +1,344 @@
+"""
+Lightweight request tracing for the tutor.
+
+Spans time agent nodes, LLM calls and rendering, feed the Prometheus metrics in
+metrics.py and accumulate into the current request's RequestTrace, which the
+API turns into Server-Timing headers. The session and node being worked on are
+carried in context variables so nested LLM calls are attributed correctly, and
+the same events are added to the bound session's SessionLedger, which keeps a
+running cost total for the whole session. Long-running work reports its stage
+through report_progress to whatever callback the context has bound (e.g. a
+background session-creation job).
+"""
+
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from . import metrics
+
+_current_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar(
+    "tutor_request_trace", default=None
+)
+_current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "tutor_session_id", default=None
+)
+_current_node: contextvars.ContextVar[str] = contextvars.ContextVar("tutor_node", default="")
+_current_ledger: contextvars.ContextVar[Optional["SessionLedger"]] = contextvars.ContextVar(
+    "tutor_session_ledger", default=None
+)
+_current_progress: contextvars.ContextVar[Optional[Callable[[str, int, int], None]]] = contextvars.ContextVar(
+    "tutor_progress", default=None
+)
+
+
+class RequestTrace:
+    """Timing and token totals collected while serving one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.session_id: Optional[str] = None
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+
+    def add_span(self, name: str, duration: float) -> None:
+        with self._lock:
+            span = self.spans.setdefault(name, {"duration": 0.0, "count": 0})
+            span["duration"] += duration
+            span["count"] += 1
+
+    def add_llm_call(self, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def add_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def server_timing(self) -> str:
+        """Format the collected spans as a Server-Timing header value."""
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1]["duration"])
+            tokens = f'tokens;desc="prompt={self.prompt_tokens} completion={self.completion_tokens}"'
+        entries = [
+            f'{name.replace(".", "-")};dur={span["duration"] * 1000:.1f};desc="{int(span["count"])}x"'
+            for name, span in spans
+        ]
+        if self.llm_calls:
+            entries.append(tokens)
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "session_id": self.session_id,
+                "spans": {name: dict(span) for name, span in self.spans.items()},
+                "llm_calls": self.llm_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cache_hits": self.cache_hits,
+                "retries": self.retries,
+            }
+
+
+class SessionLedger:
+    """Cumulative LLM usage, cache hits, renders and node wall time of one session."""
+
+    __slots__ = (
+        "_lock", "llm_calls", "llm_errors", "retries", "prompt_tokens", "completion_tokens",
+        "llm_seconds", "cache_hits", "cache_misses", "render_jobs", "render_seconds", "node_seconds",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.llm_errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_jobs = 0
+        self.render_seconds = 0.0
+        self.node_seconds: Dict[str, float] = {}
+
+    def add_llm_call(self, duration: float, prompt_tokens: int, completion_tokens: int, failed: bool) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_errors += failed
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.llm_seconds += duration
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def add_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def add_render(self, duration: float) -> None:
+        with self._lock:
+            self.render_jobs += 1
+            self.render_seconds += duration
+
+    def add_node(self, name: str, duration: float) -> None:
+        with self._lock:
+            self.node_seconds[name] = self.node_seconds.get(name, 0.0) + duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "llm_errors": self.llm_errors,
+                "retries": self.retries,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "llm_seconds": round(self.llm_seconds, 3),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "render_jobs": self.render_jobs,
+                "render_seconds": round(self.render_seconds, 3),
+                "node_seconds": {name: round(value, 3) for name, value in self.node_seconds.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionLedger":
+        """Rebuild a ledger from to_dict() output (e.g. a stored session)."""
+        ledger = cls()
+        for name, value in data.items():
+            if name == "node_seconds":
+                ledger.node_seconds = dict(value)
+            elif name in cls.__slots__:
+                setattr(ledger, name, value)
+        return ledger
+
+
+def start_request_trace() -> RequestTrace:
+    """Start collecting spans for the current request context."""
+    trace = RequestTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def get_request_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def bind_session(session_id: Optional[str], ledger: Optional[SessionLedger] = None) -> None:
+    """
+    Tag subsequent work in this context (and the current request trace) with a
+    session ID, and charge its LLM calls, cache lookups and renders to ledger.
+    """
+    _current_session.set(session_id)
+    _current_ledger.set(ledger)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.session_id = session_id
+
+
+def get_session_id() -> Optional[str]:
+    return _current_session.get()
+
+
+def get_current_node() -> str:
+    return _current_node.get()
+
+
+def detached_context() -> contextvars.Context:
+    """
+    Copy of the current context for work that outlives the request (background
+    threads): keeps the session binding and ledger but stops adding to the
+    request trace.
+    """
+    context = contextvars.copy_context()
+    context.run(_current_trace.set, None)
+    context.run(_current_progress.set, None)
+    return context
+
+
+def bind_progress(callback: Optional[Callable[[str, int, int], None]]) -> None:
+    """Send this context's progress reports to callback(stage, step, total)."""
+    _current_progress.set(callback)
+
+
+def report_progress(stage: str, step: int = 0, total: int = 0) -> None:
+    """Report the current stage (and step k of total) to the bound progress callback."""
+    callback = _current_progress.get()
+    if callback is not None:
+        callback(stage, step, total)
+
+
+@contextmanager
+def trace_span(name: str) -> Iterator[None]:
+    """Time a block as an agent node: records node metrics and the request span."""
+    token = _current_node.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.node_errors.inc(node=name)
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _current_node.reset(token)
+        metrics.node_duration.observe(duration, node=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(name, duration)
+        ledger = _current_ledger.get()
+        if ledger is not None:
+            ledger.add_node(name, duration)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator tracing every call of a function as a node span. Nodes that
+    return a state with error_message set are counted as errors too.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(span_name):
+                result = func(*args, **kwargs)
+            if isinstance(result, dict) and result.get("error_message"):
+                metrics.node_errors.inc(node=span_name)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def record_llm_call(
+    model: str,
+    duration: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    failed: bool = False,
+) -> None:
+    """Record one LLM call against the current node and request."""
+    node = _current_node.get() or "unknown"
+    metrics.llm_call_duration.observe(duration, node=node, model=model)
+    if failed:
+        metrics.llm_errors.inc(node=node)
+    metrics.llm_tokens.inc(prompt_tokens, node=node, kind="prompt")
+    metrics.llm_tokens.inc(completion_tokens, node=node, kind="completion")
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span("llm", duration)
+        trace.add_llm_call(prompt_tokens, completion_tokens)
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.add_llm_call(duration, prompt_tokens, completion_tokens, failed)
+
+
+def record_retry() -> None:
+    node = _current_node.get() or "unknown"
+    metrics.llm_retries.inc(node=node)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_retry()
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.add_retry()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Record a cache lookup (problem index, local classifier, hint ladder...)."""
+    metrics.cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+    trace = _current_trace.get()
+    if trace is not None and hit:
+        trace.add_cache_hit()
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.add_cache(hit)
+
+
+def record_queue_wait(queue: str, seconds: float) -> None:
+    metrics.queue_wait.observe(seconds, queue=queue)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(f"{queue}_wait", seconds)
+
+
+@contextmanager
+def render_span() -> Iterator[Dict[str, str]]:
+    """Time an Asymptote render. Set outcome["outcome"] to report failures."""
+    outcome = {"outcome": "success"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except Exception:
+        outcome["outcome"] = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        metrics.render_duration.observe(duration, outcome=outcome["outcome"])
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span("asy_render", duration)
+        ledger = _current_ledger.get()
+        if ledger is not None:
+            ledger.add_render(duration)